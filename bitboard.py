@@ -0,0 +1,216 @@
+"""
+Bitboard breadth-first search.
+
+A board is packed into a Python integer where square (row, col) is bit
+row * cols + col. A whole BFS layer is expanded with one shift-and-mask per
+movement offset, so the work per layer depends on the number of offsets
+rather than on the number of squares in the frontier.
+
+The same layout works for boards of any dimension: with row-major strides,
+square (x0, x1, ..., xn) is bit x0 * strides[0] + ... + xn, and an offset is a
+shift by its dot product with the strides. The 2-D functions are the
+two-axis case of the N-D ones.
+"""
+
+from functools import lru_cache
+from math import prod
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+def full_board(rows: int, cols: int) -> int:
+    """Bitboard with every square of a rows x cols board set."""
+    return (1 << (rows * cols)) - 1
+
+
+def square_bit(cols: int, row: int, col: int) -> int:
+    """Bitboard with only (row, col) set."""
+    return 1 << (row * cols + col)
+
+
+def board_strides(shape: Sequence[int]) -> Tuple[int, ...]:
+    """Row-major strides: the bit distance between neighbours along each axis."""
+    strides = [1] * len(shape)
+    for axis in range(len(shape) - 2, -1, -1):
+        strides[axis] = strides[axis + 1] * shape[axis + 1]
+    return tuple(strides)
+
+
+def box_bits(shape: Sequence[int], bounds: Sequence[Tuple[int, int]]) -> int:
+    """Bitboard of the squares whose coordinate on each axis lies in [start, stop)."""
+    start, stop = bounds[-1]
+    if stop <= start:
+        return 0
+    bits = ((1 << (stop - start)) - 1) << start
+    width = shape[-1]
+    for axis in range(len(shape) - 2, -1, -1):
+        start, stop = bounds[axis]
+        if stop <= start:
+            return 0
+        # Repeat the inner block once per index in [start, stop) along this axis
+        repunit = ((1 << ((stop - start) * width)) - 1) // ((1 << width) - 1)
+        bits = (bits * repunit) << (start * width)
+        width *= shape[axis]
+    return bits
+
+
+@lru_cache(maxsize=1024)
+def nd_shift_table(shape: Tuple[int, ...], piece_movements: Tuple[Tuple[int, ...], ...]) -> Tuple[Tuple[int, int], ...]:
+    """
+    Precompute (shift, source_mask) pairs for each distinct usable N-D offset.
+
+    source_mask holds the squares from which the offset stays on the board, so
+    a move is (frontier & source_mask) shifted by the offset's dot product with
+    the board strides.
+    """
+    strides = board_strides(shape)
+    table = []
+    seen = set()
+    for offset in piece_movements:
+        if len(offset) != len(shape):
+            raise ValueError(f"Offset {offset} does not match the {len(shape)}-D board")
+        if not any(offset) or offset in seen or any(abs(d) >= n for d, n in zip(offset, shape)):
+            continue
+        seen.add(offset)
+        source_mask = box_bits(shape, [(max(0, -d), min(n, n - d)) for d, n in zip(offset, shape)])
+        table.append((sum(d * stride for d, stride in zip(offset, strides)), source_mask))
+    return tuple(table)
+
+
+def shift_table(rows: int, cols: int, piece_movements: Tuple[Tuple[int, int], ...]) -> Tuple[Tuple[int, int], ...]:
+    """
+    Precompute (shift, source_mask) pairs for each distinct usable offset.
+
+    source_mask holds the squares from which the offset stays on the board, so
+    a move is (frontier & source_mask) shifted by row_offset * cols + col_offset.
+    """
+    return nd_shift_table((rows, cols), piece_movements)
+
+
+def expand(frontier: int, table: Sequence[Tuple[int, int]]) -> int:
+    """Squares reachable in one move from any square in frontier."""
+    reached = 0
+    for shift, source_mask in table:
+        sources = frontier & source_mask
+        if sources:
+            reached |= sources << shift if shift >= 0 else sources >> -shift
+    return reached
+
+
+# Maps byte 0 to ASCII '0' and any other byte to ASCII '1'
+_FLAG_DIGITS = bytes([48] + [49] * 255)
+# '0'/'1' digits back to 0/1 bytes, for flags_from_bits
+_BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def bits_from_flags(flags: bytes) -> int:
+    """Pack a byte-per-square flag buffer (non-zero = set) into a bitboard."""
+    if not flags:
+        return 0
+    return int(flags.translate(_FLAG_DIGITS)[::-1], 2)
+
+
+def flags_from_bits(bits: int, size: int) -> bytearray:
+    """Unpack a bitboard into a byte-per-square flag buffer of `size` squares (inverse of bits_from_flags)."""
+    if size <= 0:
+        return bytearray()
+    return bytearray(format(bits & ((1 << size) - 1), f"0{size}b")[::-1].encode("ascii").translate(_BIT_FLAGS))
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the indices of the set bits, lowest first."""
+    digits = bin(bits)[:1:-1]  # binary digits, least significant first
+    index = digits.find("1")
+    while index >= 0:
+        yield index
+        index = digits.find("1", index + 1)
+
+
+def iter_bitboard_layers(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    open_bits: Optional[int] = None,
+    max_moves: Optional[int] = None
+) -> Iterator[int]:
+    """
+    Yield BFS layers as bitboards: layer d holds the squares first reached in d moves.
+
+    Args:
+        rows, cols: Board dimensions
+        piece_movements: List of (row_offset, col_offset) tuples
+        start_coord: Starting position as (row, col) tuple
+        open_bits: Squares the piece may stand on (default: the whole board)
+        max_moves: Stop after this many moves (default: explore everything)
+    """
+    yield from iter_nd_layers((rows, cols), piece_movements, start_coord, open_bits, max_moves)
+
+
+def iter_nd_layers(
+    shape: Sequence[int],
+    piece_movements: Sequence[Sequence[int]],
+    start_coord: Sequence[int],
+    open_bits: Optional[int] = None,
+    max_moves: Optional[int] = None
+) -> Iterator[int]:
+    """
+    Yield BFS layers of an N-dimensional board as bitboards.
+
+    Args:
+        shape: Board size along each axis, e.g. (5, 5, 5)
+        piece_movements: Offsets as N-tuples
+        start_coord: Starting position as an N-tuple
+        open_bits: Squares the piece may stand on (default: the whole board)
+        max_moves: Stop after this many moves (default: explore everything)
+    """
+    shape = tuple(shape)
+    if open_bits is None:
+        open_bits = (1 << prod(shape)) - 1
+    table = nd_shift_table(shape, tuple(tuple(m) for m in piece_movements))
+
+    frontier = 1 << sum(x * stride for x, stride in zip(start_coord, board_strides(shape)))
+    unvisited = open_bits & ~frontier
+    yield frontier
+
+    moves = 0
+    while max_moves is None or moves < max_moves:
+        frontier = expand(frontier, table) & unvisited
+        if not frontier:
+            break
+        unvisited ^= frontier
+        moves += 1
+        yield frontier
+
+
+def check_start(rows: int, cols: int, start_coord: Tuple[int, int], open_bits: Optional[int]) -> None:
+    """Raise ValueError unless the start square is on the board and open."""
+    row, col = start_coord
+    if not (0 <= row < rows and 0 <= col < cols):
+        raise ValueError(f"Starting position {start_coord} is outside the {rows}x{cols} board")
+    if open_bits is not None and not open_bits >> (row * cols + col) & 1:
+        raise ValueError("Starting position is on an obstacle!")
+
+
+def bitboard_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    open_bits: Optional[int] = None
+) -> List[List[int]]:
+    """
+    Generate a heatmap with the bitboard engine.
+
+    Returns:
+        Heatmap where each cell contains the minimum moves to reach it
+        (-1 if unreachable, -2 if the square is not open)
+    """
+    check_start(rows, cols, start_coord, open_bits)
+    flat = [-1] * (rows * cols)
+    if open_bits is not None:
+        for index in iter_bits(full_board(rows, cols) & ~open_bits):
+            flat[index] = -2
+    for distance, layer in enumerate(iter_bitboard_layers(rows, cols, piece_movements, start_coord, open_bits)):
+        for index in iter_bits(layer):
+            flat[index] = distance
+    return [flat[r * cols:(r + 1) * cols] for r in range(rows)]
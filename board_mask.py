@@ -0,0 +1,191 @@
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from bitboard import bitboard_heatmap, bits_from_flags, flags_from_bits, full_board, iter_bits
+
+# Characters accepted by BoardMask.from_strings
+OPEN_CHARS = ".o"
+HOLE_CHARS = "#xX"
+_OPEN_FLAGS = str.maketrans({**{c: "\x01" for c in OPEN_CHARS}, **{c: "\x00" for c in HOLE_CHARS}})
+
+
+class BoardMask:
+    """
+    Board geometry as a bit-packed set of playable squares.
+
+    Square (row, col) is playable when bit row * cols + col of `bits` is set,
+    so irregular boards (palaces, holes, non-rectangular outlines) cost one
+    integer instead of a list of obstacle tuples.
+    """
+
+    __slots__ = ("rows", "cols", "bits")
+
+    def __init__(self, rows: int, cols: int, bits: Optional[int] = None):
+        if rows <= 0 or cols <= 0:
+            raise ValueError(f"Invalid board size: {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.bits = full_board(rows, cols) if bits is None else bits & full_board(rows, cols)
+
+    @classmethod
+    def full(cls, rows: int, cols: int) -> "BoardMask":
+        """Plain rectangular board."""
+        return cls(rows, cols)
+
+    @classmethod
+    def from_strings(cls, lines: Sequence[str]) -> "BoardMask":
+        """
+        Build a mask from text rows, '.' or 'o' for playable squares and
+        '#' or 'x' for holes. Row 0 is the first line.
+        """
+        lines = [line.strip() for line in lines if line.strip()]
+        if not lines:
+            raise ValueError("Board mask is empty")
+        cols = len(lines[0])
+        for row, line in enumerate(lines):
+            if len(line) != cols:
+                raise ValueError(f"Board mask row {row} has {len(line)} squares, expected {cols}")
+            invalid = line.strip(OPEN_CHARS + HOLE_CHARS)
+            if invalid:
+                raise ValueError(f"Invalid board mask character {invalid[0]!r} at row {row}")
+        flags = "".join(lines).translate(_OPEN_FLAGS).encode("latin1")
+        return cls(len(lines), cols, bits_from_flags(flags))
+
+    @classmethod
+    def from_obstacles(cls, rows: int, cols: int, obstacles: Iterable[Tuple[int, int]]) -> "BoardMask":
+        """Rectangular board with the given squares removed."""
+        return cls(rows, cols).without(obstacles)
+
+    @classmethod
+    def from_bytes(cls, rows: int, cols: int, data: bytes) -> "BoardMask":
+        """Inverse of to_bytes()."""
+        return cls(rows, cols, int.from_bytes(data, "little"))
+
+    @classmethod
+    def load(cls, path: str) -> "BoardMask":
+        """Read a text mask file (see from_strings); lines starting with ';' are comments."""
+        with open(path) as f:
+            return cls.from_strings([line for line in f if not line.lstrip().startswith(";")])
+
+    def to_bytes(self) -> bytes:
+        """Little-endian bit-packed representation, ceil(rows * cols / 8) bytes."""
+        return self.bits.to_bytes((self.rows * self.cols + 7) // 8, "little")
+
+    def to_strings(self) -> List[str]:
+        return ["".join("." if self.is_open(r, c) else "#" for c in range(self.cols))
+                for r in range(self.rows)]
+
+    def is_open(self, row: int, col: int) -> bool:
+        return (0 <= row < self.rows and 0 <= col < self.cols
+                and bool(self.bits >> (row * self.cols + col) & 1))
+
+    def without(self, squares: Iterable[Tuple[int, int]]) -> "BoardMask":
+        """Copy of this mask with the given squares blocked (off-board squares are ignored)."""
+        flags = bytearray(self.rows * self.cols)
+        for row, col in squares:
+            if 0 <= row < self.rows and 0 <= col < self.cols:
+                flags[row * self.cols + col] = 1
+        return BoardMask(self.rows, self.cols, self.bits & ~bits_from_flags(flags))
+
+    def count(self) -> int:
+        """Number of playable squares."""
+        return bin(self.bits).count("1")
+
+    def check_size(self, rows: int, cols: int) -> None:
+        """Raise ValueError unless the mask covers a rows x cols board."""
+        if (self.rows, self.cols) != (rows, cols):
+            raise ValueError(f"The board mask is {self.rows}x{self.cols}, but the board is {rows}x{cols}")
+
+    def blocked_flags(self, obstacles: Optional[Iterable[Tuple[int, int]]] = None) -> bytearray:
+        """
+        Byte-per-square buffer, 1 for holes and the given obstacles, for searches
+        over flat indices (off-board obstacles are ignored).
+        """
+        flags = flags_from_bits(~self.bits, self.rows * self.cols)
+        for row, col in obstacles or ():
+            if 0 <= row < self.rows and 0 <= col < self.cols:
+                flags[row * self.cols + col] = 1
+        return flags
+
+    def holes(self) -> List[Tuple[int, int]]:
+        """Blocked squares as (row, col) tuples."""
+        return [divmod(i, self.cols) for i in iter_bits(full_board(self.rows, self.cols) & ~self.bits)]
+
+    def nearest_open(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        """Playable square closest (Manhattan distance, then row-major) to (row, col)."""
+        squares = [divmod(i, self.cols) for i in iter_bits(self.bits)]
+        if not squares:
+            return None
+        return min(squares, key=lambda sq: (abs(sq[0] - row) + abs(sq[1] - col), sq))
+
+    def __and__(self, other: "BoardMask") -> "BoardMask":
+        if (self.rows, self.cols) != (other.rows, other.cols):
+            raise ValueError("Cannot combine masks of different sizes")
+        return BoardMask(self.rows, self.cols, self.bits & other.bits)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, BoardMask) and
+                (self.rows, self.cols, self.bits) == (other.rows, other.cols, other.bits))
+
+    def __repr__(self) -> str:
+        return f"BoardMask({self.rows}x{self.cols}, {self.count()} playable)"
+
+
+def xiangqi_palace_mask(rows: int = 10, cols: int = 9) -> BoardMask:
+    """The two 3x3 xiangqi palaces (first and last three ranks, middle three files)."""
+    lines = []
+    for row in range(rows):
+        in_palace_rank = row < 3 or row >= rows - 3
+        lines.append("".join(
+            "." if in_palace_rank and cols // 2 - 1 <= col <= cols // 2 + 1 else "#"
+            for col in range(cols)
+        ))
+    return BoardMask.from_strings(lines)
+
+
+# Named shapes for the CLI --board option; each factory takes (rows, cols)
+BOARD_SHAPES: Dict[str, Callable[..., BoardMask]] = {
+    "xiangqi-palace": xiangqi_palace_mask,
+}
+
+
+def generate_heatmap_masked(
+    mask: BoardMask,
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None
+) -> List[List[int]]:
+    """
+    Generate a heatmap on an irregular board.
+
+    The BFS runs directly on the mask bits; obstacles, if given, are removed
+    from the mask first.
+
+    Returns:
+        Heatmap where each cell contains the minimum moves to reach it
+        (-1 if unreachable, -2 if the square is a hole or obstacle)
+    """
+    if obstacles:
+        mask = mask.without(obstacles)
+    return bitboard_heatmap(mask.rows, mask.cols, piece_movements, start_coord, mask.bits)
+
+
+# Example usage
+if __name__ == "__main__":
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+
+    general = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+    print("Xiangqi general confined to the palace, from (0, 4):")
+    print_heatmap_with_obstacles(generate_heatmap_masked(xiangqi_palace_mask(), general, (0, 4)))
+
+    ring = BoardMask.from_strings([
+        "........",
+        "........",
+        "..####..",
+        "..####..",
+        "..####..",
+        "..####..",
+        "........",
+        "........",
+    ])
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    print("\nKnight on a board with a 4x4 hole, from (0, 0):")
+    print_heatmap_with_obstacles(generate_heatmap_masked(ring, knight, (0, 0)))
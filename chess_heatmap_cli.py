@@ -7,20 +7,32 @@ including standard chess, fairy chess, xiangqi, and shogi variants.
 """
 
 import argparse
+import os
 import sys
 from typing import List, Tuple, Optional
-from heatmap import generate_heatmap, print_heatmap
-from heatmap_with_obstacles import generate_heatmap_with_obstacles, print_heatmap_with_obstacles
-from exotic_pieces import get_piece_movements
-from fairy_chess_pieces import fairy_chess_pieces
-
-# Combine all piece dictionaries
-ALL_PIECES = {}
-ALL_PIECES.update(get_piece_movements())
-ALL_PIECES.update(fairy_chess_pieces)
-
-# Normalize piece names for case-insensitive lookup
-NORMALIZED_PIECES = {name.lower().replace(" ", "-"): name for name in ALL_PIECES.keys()}
+from heatmap import iter_heatmap_layers, print_heatmap, use_tablebase
+from heatmap_with_obstacles import (generate_heatmap_with_obstacles, print_heatmap_with_obstacles,
+                                    reverse_movements)
+from hopper_pieces import HOPPER_PIECES, HopperMovement
+from heatmap_array import Heatmap, compute_heatmap
+from parallel_bfs import parallel_heatmap
+from engine_dispatch import ENGINES, calibrate_and_save, cost_model, default_cost_model_path, last_choice, use_engine
+from heatmap_export import EXPORT_FORMATS, export_heatmap
+from board_mask import BOARD_SHAPES, BoardMask
+from obstacle_files import load_obstacle_mask
+from nd_board import nd_heatmap, parse_coord, parse_shape, print_nd_heatmap
+from exotic_pieces import get_nd_piece_movements
+from timed_obstacles import generate_timed_heatmap, patrol_schedule
+from weighted_heatmap import generate_weighted_heatmap, slide_distance_cost
+from tablebase import STANDARD_BOARDS, TABLEBASE_ENV, TableBase, build_tablebase
+from rendezvous import find_rendezvous
+from pursuit import solve_pursuit
+from route_planner import RoutePlanner
+from position_maps import Position, position_maps, print_count_map
+from obstacle_study import obstacle_study, parse_densities, print_study_table
+from mobility_analysis import (MOBILITY_COLUMNS, mobility_report, parse_board_sizes,
+                               piece_mobility, print_mobility_table, write_mobility_csv)
+from piece_catalogue import ALL_PIECES, canonical_movements, equivalent_pieces, match_pieces
 
 
 def list_pieces(category: Optional[str] = None):
@@ -101,6 +113,231 @@ def parse_size(size_str: str) -> Tuple[int, int]:
             raise ValueError(f"Invalid size format: {size_str}")
 
 
+def screen_movement(piece_name: str, obstacles, mask) -> Optional[HopperMovement]:
+    """
+    The screen rules of a hopper or cannon, if the board has screens for it.
+
+    Obstacles and mask holes both act as screens, as in
+    generate_heatmap_with_obstacles; on an open board the plain offsets are used.
+    """
+    has_screens = bool(obstacles) or (mask is not None and mask.count() < mask.rows * mask.cols)
+    return HOPPER_PIECES.get(piece_name) if has_screens else None
+
+
+def run_mobility(args, pieces) -> None:
+    """Print (and optionally save) the mobility table for the given pieces."""
+    try:
+        sizes = parse_board_sizes(args.mobility)
+        if not sizes:
+            raise ValueError("No board sizes given")
+        report = mobility_report(pieces, sizes, args.sort, args.desc)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    boards = ", ".join(f"{rows}x{cols}" for rows, cols in sizes)
+    plural = "s" if len(pieces) != 1 else ""
+    print(f"\nMOBILITY REPORT ({len(pieces)} piece{plural}, boards: {boards})")
+    print()
+    print_mobility_table(report)
+    
+    # For a single piece also show how far each square is from its farthest target
+    if len(pieces) == 1:
+        movements = next(iter(pieces.values()))
+        for rows, cols in sizes:
+            print(f"\nEccentricity on {rows}x{cols} (max moves from each square):")
+            print_heatmap(piece_mobility(rows, cols, movements)["eccentricity"], args.width)
+    
+    if args.csv:
+        try:
+            write_mobility_csv(report, args.csv)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"\nMobility report written to {args.csv}")
+
+
+def run_rendezvous(args, piece_name, movements, rows, cols, start_pos, obstacles, mask):
+    """Print where the piece and the --meet piece can meet soonest."""
+    other_query, _, other_position = args.meet.rpartition("@")
+    matches = match_pieces(other_query) if other_query else []
+    if len(matches) != 1:
+        print(f"Error: --meet needs exactly one piece and a position, like 'knight@h8' "
+              f"({len(matches)} pieces match '{other_query}')")
+        sys.exit(1)
+    try:
+        other_pos = parse_position(other_position)
+        result = find_rendezvous(rows, cols, movements, start_pos,
+                                 ALL_PIECES[matches[0]], other_pos, obstacles, mask)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    print(f"\nRENDEZVOUS: {piece_name} at {start_pos}, {matches[0]} at {other_pos}")
+    if result is None:
+        print("The pieces can never meet")
+        return
+    print(f"Meeting square: {result['square']} after {result['time']} moves")
+    for name, path in ((piece_name, result["path_a"]), (matches[0], result["path_b"])):
+        waits = result["time"] - (len(path) - 1)
+        print(f"  {name}: " + " -> ".join(f"({r},{c})" for r, c in path)
+              + (f" (waits {waits})" if waits else ""))
+
+
+def run_route(args, piece_name, movements, rows, cols, start_pos, obstacles, mask):
+    """Print the shortest route from the start through every --route square."""
+    try:
+        waypoints = [parse_position(square) for square in args.route.split(";") if square.strip()]
+        if not waypoints:
+            raise ValueError("--route needs at least one square")
+        route = RoutePlanner(rows, cols, movements, obstacles, mask).plan(start_pos, waypoints, args.round_trip)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    title = f"{piece_name.upper()} ROUTE"
+    print(f"\n{title}")
+    print("=" * len(title))
+    print(f"Board: {rows}x{cols}, start {start_pos}, {len(waypoints)} waypoint{'s' if len(waypoints) != 1 else ''}"
+          + (", returning to start" if args.round_trip else ""))
+    if route is None:
+        print("No route visits every waypoint")
+        return
+    method = "optimal order" if route.exact else "order from nearest neighbour + 2-opt"
+    print(f"Total: {route.moves} moves ({method})")
+    for leg in route.legs:
+        print(f"  {len(leg) - 1:>3}: " + " -> ".join(f"({r},{c})" for r, c in leg))
+
+
+def run_pursuit(args, piece_name, movements, rows, cols, obstacles, mask):
+    """Print how many moves the piece needs to catch the --hunt piece from every square."""
+    target_query, _, target_position = args.hunt.rpartition("@")
+    matches = match_pieces(target_query) if target_query else []
+    if len(matches) != 1:
+        print(f"Error: --hunt needs exactly one piece and a position, like 'king@e4' "
+              f"({len(matches)} pieces match '{target_query}')")
+        sys.exit(1)
+    try:
+        target_pos = parse_position(target_position)
+        if not (0 <= target_pos[0] < rows and 0 <= target_pos[1] < cols):
+            raise ValueError(f"Position {target_pos} is outside the {rows}x{cols} board")
+        if target_pos in (obstacles or []) or (mask is not None and not mask.is_open(*target_pos)):
+            raise ValueError(f"Position {target_pos} is blocked")
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    table = solve_pursuit(rows, cols, movements, ALL_PIECES[matches[0]], obstacles, mask=mask)
+    
+    title = f"{piece_name.upper()} HUNTING {matches[0].upper()}"
+    print(f"\n{title}")
+    print("=" * len(title))
+    print(f"Board: {rows}x{cols}, {matches[0]} on {target_pos}, {piece_name} moves first")
+    print()
+    print_heatmap_with_obstacles(table.pursuer_heatmap(target_pos), args.width)
+    if not args.no_legend:
+        print(f"\nLegend:")
+        print(f"  0 = Square of the {matches[0]}")
+        print(f"  N = Captures in N moves against the best defence (the pieces move alternately)")
+        print(f"  - = The {matches[0]} escapes forever")
+        if obstacles or mask is not None:
+            print(f"  X = Obstacle")
+    longest = table.longest_chase()
+    if longest:
+        moves, hunter, target = longest
+        print(f"\nLongest chase on this board: {moves} moves, {piece_name} on {hunter}, "
+              f"{matches[0]} on {target}")
+
+
+def run_setup(args) -> None:
+    """Print how many pieces of a whole position reach every square (--setup)."""
+    try:
+        if args.max_moves is not None and args.max_moves < 1:
+            raise ValueError("--max-moves must be at least 1 with --setup")
+        position = Position.load(args.setup)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    max_moves = args.max_moves or 1
+    maps = position_maps(position, max_moves)
+    
+    title = "POSITION ATTACK MAP"
+    print(f"\n{title}")
+    print("=" * len(title))
+    print(f"Board: {position.rows}x{position.cols}, {len(position.pieces)} pieces")
+    grids = maps["one_move"] if max_moves == 1 else maps["within"]
+    for side in ("white", "black", "all"):
+        label = "one move" if max_moves == 1 else f"{max_moves} moves"
+        print(f"\n{side.capitalize()} pieces reaching each square within {label}:")
+        print_count_map(grids[side], args.width)
+    if not args.no_legend:
+        print(f"\nLegend:")
+        print(f"  N = Number of pieces that reach the square (pieces block sliders and stay put)")
+        print(f"  . = No piece reaches the square")
+        if position.obstacles:
+            print(f"  X = Obstacle")
+    print("\nMobility:")
+    for name, side, square, moves, within in maps["mobility"]:
+        line = f"  {side:<5} {name:<24} {str(square):<9} {moves:>3} moves"
+        if max_moves > 1:
+            line += f", {within} squares within {max_moves}"
+        print(line)
+
+
+def run_nd(args) -> None:
+    """Heatmap on a 3-D (or higher) board given by --size like 5x5x5."""
+    unsupported = [flag for flag, value in (("--board", args.board), ("--obstacle-file", args.obstacle_file),
+                                            ("--reverse", args.reverse), ("--meet", args.meet), ("--hunt", args.hunt),
+                                            ("--study", args.study), ("--patrol", args.patrol),
+                                            ("--export", args.export), ("--mobility", args.mobility))
+                   if value]
+    if args.move_cost != "moves":
+        unsupported.append("--move-cost")
+    try:
+        if unsupported:
+            raise ValueError(f"{', '.join(unsupported)} only supported on 2-D boards")
+        shape = parse_shape(args.size)
+        pieces = get_nd_piece_movements(len(shape), reach=max(shape) - 1)
+        query = args.piece.lower().strip()
+        matches = [query] if query in pieces else [name for name in sorted(pieces) if query in name]
+        if len(matches) != 1:
+            raise ValueError(f"'{args.piece}' matches {len(matches)} of the {len(shape)}-D pieces: "
+                             f"{', '.join(matches or sorted(pieces))}")
+        piece_name = matches[0]
+        movements = pieces[piece_name]
+        start_pos = (parse_coord(args.position, len(shape)) if args.position
+                     else tuple(n // 2 for n in shape))
+        obstacles = [parse_coord(pos, len(shape)) for pos in args.obstacles.split(";")
+                     if pos.strip()] if args.obstacles else None
+        if args.max_moves is not None and args.max_moves < 0:
+            raise ValueError("--max-moves must not be negative")
+        heatmap = nd_heatmap(shape, movements, start_pos, obstacles, args.max_moves)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    title = f"{len(shape)}-D {piece_name.upper()} MOVEMENT HEATMAP"
+    print(f"\n{title}")
+    print("=" * len(title))
+    print(f"Board: {'x'.join(map(str, shape))}")
+    print(f"Starting position: {start_pos}")
+    if obstacles:
+        print(f"Obstacles: {obstacles}")
+    print()
+    print_nd_heatmap(heatmap, shape, args.width)
+    
+    if not args.no_legend:
+        print(f"Legend:")
+        print(f"  Each slice fixes the leading coordinates; rows and columns are the last two axes")
+        print(f"  N = Reachable in N moves")
+        print(f"  - = Unreachable" + (f" within {args.max_moves} moves" if args.max_moves is not None else ""))
+        if obstacles:
+            print(f"  X = Obstacle")
+        print(f"\nTotal movement options: {len(set(movements))}")
+        reachable = sum(1 for cell in heatmap if cell >= 0)
+        total = len(heatmap) - heatmap.count(-2)
+        print(f"Reachable squares: {reachable}/{total} ({reachable/total*100:.1f}%)")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate movement heatmaps for chess pieces",
@@ -110,9 +347,21 @@ Examples:
   %(prog)s knight --size 8 --position e4
   %(prog)s "flying ox" --size 12 --position 6,6
   %(prog)s rook --size 10 --position 5,5 --obstacles "3,5;7,5"
+  %(prog)s king --size 8 --position 0,0 --patrol "4,0;4,1;4,2;4,3"
+  %(prog)s knight --size 5x5x5 --position 2,2,2
+  %(prog)s chancellor --size 10 --hunt king@e5
+  %(prog)s xiangqi_general --board xiangqi-palace --position 0,4
+  %(prog)s amazon --size 16 --export amazon.npy
   %(prog)s --list
   %(prog)s --list fairy
   %(prog)s --search dragon
+  %(prog)s --mobility 8,9,12 --sort mean_moves --csv mobility.csv
+  %(prog)s knight -p b1 --route "h8;a8;e4" --round-trip
+  %(prog)s --setup "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR" -k 2
+  %(prog)s --serve 127.0.0.1:8765
+  %(prog)s --build-tablebase pieces.chtb
+  %(prog)s --calibrate-engines
+  %(prog)s knight --size 16 --tablebase pieces.chtb
         """
     )
     
@@ -120,12 +369,43 @@ Examples:
     parser.add_argument("piece", nargs="?", help="Name of the chess piece")
     
     # Board configuration
-    parser.add_argument("-s", "--size", type=str, default="8",
-                        help="Board size (e.g., 8 or 10x6) (default: 8)")
+    parser.add_argument("-s", "--size", type=str, default=None,
+                        help="Board size (e.g., 8, 10x6, or 5x5x5 for a 3-D board) (default: 8)")
+    parser.add_argument("-b", "--board", default=None, metavar="SHAPE",
+                        help="Irregular board: a named shape (%s) or a text mask file "
+                             "('.' playable, '#' hole)" % ", ".join(sorted(BOARD_SHAPES)))
     parser.add_argument("-p", "--position", default=None,
                         help="Starting position (e.g., 'e4' or '4,4'). Default: center")
     parser.add_argument("-o", "--obstacles", default=None,
                         help="Obstacle positions separated by semicolons (e.g., '3,5;7,5')")
+    parser.add_argument("--obstacle-file", metavar="PATH", default=None,
+                        help="Obstacle map: PBM/PGM bitmap, .npy array, or packed bit file")
+    parser.add_argument("--patrol", action="append", metavar="ROUTE", default=None,
+                        help="Moving blocker that cycles through squares like '4,0;4,1;4,2' "
+                             "(repeatable); shows the earliest turn each square can be reached")
+    parser.add_argument("-k", "--max-moves", type=int, default=None, metavar="K",
+                        help="Only explore squares reachable within K moves")
+    parser.add_argument("-r", "--reverse", action="store_true",
+                        help="Treat the position as a target and show moves needed from every square")
+    parser.add_argument("--meet", metavar="PIECE@POS", default=None,
+                        help="Find the earliest meeting square with another piece (e.g. 'flying ox@h8')")
+    parser.add_argument("--hunt", metavar="PIECE@POS", default=None,
+                        help="Moves needed to catch another piece that flees, from every square (e.g. 'king@e4')")
+    parser.add_argument("--setup", metavar="FEN_OR_JSON", default=None,
+                        help="Attack map of a whole position: a FEN-like string or a JSON file "
+                             "(counts per square, within --max-moves moves)")
+    parser.add_argument("--route", metavar="SQUARES", default=None,
+                        help="Shortest route from the position through squares like 'h8;a8;e4' in any order")
+    parser.add_argument("--round-trip", action="store_true",
+                        help="With --route, finish back on the starting square")
+    parser.add_argument("--study", metavar="DENSITIES", default=None,
+                        help="Monte Carlo study of mobility under random obstacles at densities like '0.1,0.2,0.3'")
+    parser.add_argument("--trials", type=int, default=1000,
+                        help="Random obstacle fields per density for --study (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Random seed for --study (default: 0)")
+    parser.add_argument("--move-cost", choices=["moves", "squares"], default="moves",
+                        help="Count moves, or squares travelled per move (default: moves)")
     
     # Display options
     parser.add_argument("-w", "--width", type=int, default=3,
@@ -133,6 +413,12 @@ Examples:
     parser.add_argument("--no-legend", action="store_true",
                         help="Don't show movement count legend")
     
+    # Export options
+    parser.add_argument("-e", "--export", metavar="PATH", default=None,
+                        help="Also write the heatmap to PATH (.npy, .csv, or raw binary)")
+    parser.add_argument("--export-format", choices=sorted(EXPORT_FORMATS), default=None,
+                        help="Export format (default: inferred from the file extension)")
+    
     # Information commands
     parser.add_argument("-l", "--list", nargs="?", const="all", metavar="CATEGORY",
                         help="List available pieces (optionally by category)")
@@ -141,8 +427,84 @@ Examples:
     parser.add_argument("-i", "--info", action="store_true",
                         help="Show detailed information about the piece")
     
+    # Mobility analytics
+    parser.add_argument("-m", "--mobility", metavar="SIZES", default=None,
+                        help="Mobility report for the piece (or all pieces) on board sizes like '8,9,12x12'")
+    parser.add_argument("--sort", choices=MOBILITY_COLUMNS, default="piece",
+                        help="Column to sort the mobility report by (default: piece)")
+    parser.add_argument("--desc", action="store_true",
+                        help="Sort the mobility report in descending order")
+    parser.add_argument("--csv", metavar="PATH", default=None,
+                        help="Also write the mobility report to a CSV file")
+    
+    # Tablebases
+    parser.add_argument("--tablebase", metavar="PATH", default=os.environ.get(TABLEBASE_ENV),
+                        help=f"Answer obstacle-free queries from a tablebase file (default: ${TABLEBASE_ENV})")
+    parser.add_argument("--build-tablebase", metavar="PATH", default=None,
+                        help="Precompute all-starts distances for every catalogue piece into PATH")
+    parser.add_argument("--tablebase-sizes", metavar="SIZES",
+                        default=",".join(f"{r}x{c}" for r, c in STANDARD_BOARDS),
+                        help="Board sizes for --build-tablebase (default: %(default)s)")
+    
+    # Service mode
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", metavar="HOST:PORT",
+                        help="Run the HTTP heatmap service (default: 127.0.0.1:8765)")
+    parser.add_argument("--engine", choices=("auto",) + ENGINES, default="auto",
+                        help="BFS engine for plain and obstacle heatmaps (default: auto, picked by a "
+                             "cost model; see --calibrate-engines)")
+    parser.add_argument("--explain-engine", action="store_true",
+                        help="Report which engine ran and why")
+    parser.add_argument("--calibrate-engines", action="store_true",
+                        help="Benchmark the BFS engines and store the cost model used by --engine auto")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --serve and --study (default: CPU count); "
+                             "N > 1 also splits a single heatmap across N processes")
+    
     args = parser.parse_args()
     
+    # Handle service mode
+    if args.serve:
+        # Imported here because the server module reuses this module's parsers
+        from heatmap_server import parse_address, serve
+        try:
+            host, port = parse_address(args.serve)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        serve(host, port, args.workers)
+        return
+    
+    # Calibrate the engine cost model
+    if args.calibrate_engines:
+        path = default_cost_model_path()
+        print("Calibrating engine cost model...")
+        try:
+            calibrate_and_save(path, verbose=True)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Wrote {path}")
+        return
+    
+    # Build a tablebase
+    if args.build_tablebase:
+        try:
+            sizes = parse_board_sizes(args.tablebase_sizes)
+            print(f"Building tablebase {args.build_tablebase}...")
+            count = build_tablebase(args.build_tablebase, sizes, verbose=True)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Wrote {count} entries")
+        return
+    
+    if args.tablebase:
+        try:
+            use_tablebase(TableBase(args.tablebase))
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
     # Handle list command
     if args.list:
         list_pieces(args.list if args.list != "all" else None)
@@ -162,46 +524,55 @@ Examples:
             print(f"No pieces found matching '{args.search}'")
         return
     
+    # Mobility report over the whole catalogue
+    if args.mobility and not args.piece:
+        run_mobility(args, ALL_PIECES)
+        return
+    
+    # Attack map of a whole position
+    if args.setup:
+        run_setup(args)
+        return
+    
     # Require piece name for other operations
     if not args.piece:
         parser.error("piece name is required (use --list to see available pieces)")
     
-    # Normalize piece name
-    piece_input = args.piece.lower().replace("-", " ").replace("_", " ")
+    # Boards with three or more axes use the N-D catalogue and engine
+    if args.size and len(args.size.lower().split("x")) > 2:
+        run_nd(args)
+        return
     
-    # Try to find exact match first
-    piece_name = None
-    if piece_input in ALL_PIECES:
-        piece_name = piece_input
+    # Look up the piece (exact, normalized, then partial match)
+    matches = match_pieces(args.piece)
+    if len(matches) == 1:
+        piece_name = matches[0]
+    elif len(matches) > 1:
+        print(f"Multiple pieces match '{args.piece}':")
+        for match in matches:
+            print(f"  {match}")
+        print("\nPlease be more specific.")
+        sys.exit(1)
     else:
-        # Try normalized lookup
-        normalized_input = piece_input.replace(" ", "-")
-        if normalized_input in NORMALIZED_PIECES:
-            piece_name = NORMALIZED_PIECES[normalized_input]
-        else:
-            # Try partial match
-            matches = [name for name in ALL_PIECES.keys() if piece_input in name.lower()]
-            if len(matches) == 1:
-                piece_name = matches[0]
-            elif len(matches) > 1:
-                print(f"Multiple pieces match '{args.piece}':")
-                for match in sorted(matches):
-                    print(f"  {match}")
-                print("\nPlease be more specific.")
-                sys.exit(1)
-            else:
-                print(f"Unknown piece: '{args.piece}'")
-                print("Use --list to see available pieces or --search to find pieces")
-                sys.exit(1)
+        print(f"Unknown piece: '{args.piece}'")
+        print("Use --list to see available pieces or --search to find pieces")
+        sys.exit(1)
     
     # Get piece movements
     movements = ALL_PIECES[piece_name]
     
+    if args.mobility:
+        run_mobility(args, {piece_name: movements})
+        return
+    
     # Show info if requested
     if args.info:
         print(f"\nPIECE: {piece_name}")
         print("=" * (len(piece_name) + 7))
         print(f"Movement patterns: {len(movements)}")
+        distinct = len(canonical_movements(movements))
+        if distinct != len(movements):
+            print(f"Distinct offsets: {distinct} (duplicates and (0, 0) ignored)")
         print(f"Maximum range: {max(max(abs(r), abs(c)) for r, c in movements) if movements else 0}")
         print("\nMovement offsets:")
         for i, (row, col) in enumerate(movements):
@@ -209,12 +580,36 @@ Examples:
                 print()
             print(f"  ({row:2},{col:2})", end="")
         print("\n")
+        equivalents = equivalent_pieces(piece_name)
+        if equivalents:
+            print(f"Equivalent pieces (same movement set): {', '.join(equivalents)}")
+        else:
+            print("Equivalent pieces (same movement set): none")
+        print()
         return
     
     # Set up board
+    mask = None
     try:
-        rows, cols = parse_size(args.size)
-    except ValueError as e:
+        if args.board:
+            shape = BOARD_SHAPES.get(args.board.lower())
+            if shape:
+                mask = shape(*parse_size(args.size)) if args.size else shape()
+            else:
+                mask = BoardMask.load(args.board)
+            rows, cols = mask.rows, mask.cols
+        else:
+            rows, cols = parse_size(args.size or "8")
+        if args.obstacle_file:
+            # Bulk-loaded obstacle map, used as a board mask without per-square tuples
+            size = (rows, cols) if args.size or args.board else (None, None)
+            file_mask = load_obstacle_mask(args.obstacle_file, rows=size[0], cols=size[1])
+            if (args.size or args.board) and (file_mask.rows, file_mask.cols) != (rows, cols):
+                raise ValueError(f"{args.obstacle_file} is {file_mask.rows}x{file_mask.cols}, "
+                                 f"but the board is {rows}x{cols}")
+            mask = file_mask if mask is None else mask & file_mask
+            rows, cols = mask.rows, mask.cols
+    except (OSError, ValueError) as e:
         print(f"Error: {e}")
         sys.exit(1)
     
@@ -225,11 +620,19 @@ Examples:
             if not (0 <= start_pos[0] < rows and 0 <= start_pos[1] < cols):
                 print(f"Error: Position {start_pos} is outside the {rows}x{cols} board")
                 sys.exit(1)
+            if mask and not mask.is_open(*start_pos):
+                print(f"Error: Position {start_pos} is not a playable square of the board")
+                sys.exit(1)
         except ValueError as e:
             print(f"Error: {e}")
             sys.exit(1)
     else:
         start_pos = (rows // 2, cols // 2)
+        if mask and not mask.is_open(*start_pos):
+            start_pos = mask.nearest_open(*start_pos)
+            if start_pos is None:
+                print("Error: The board has no playable squares")
+                sys.exit(1)
     
     # Parse obstacles if provided
     obstacles = None
@@ -248,38 +651,171 @@ Examples:
             print(f"Error: {e}")
             sys.exit(1)
     
+    if args.max_moves is not None and args.max_moves < 0:
+        print("Error: --max-moves must not be negative")
+        sys.exit(1)
+    if args.max_moves is not None and args.move_cost == "squares":
+        # --max-moves counts moves, not squares travelled
+        print("Error: --max-moves cannot be combined with --move-cost squares")
+        sys.exit(1)
+    
+    if args.study:
+        open_bits = mask.bits if mask else None
+        if obstacles:
+            open_bits = (mask or BoardMask.full(rows, cols)).without(obstacles).bits
+        try:
+            report = obstacle_study(rows, cols, movements, parse_densities(args.study), args.trials,
+                                    start_pos, args.seed, args.workers, open_bits=open_bits)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"\nOBSTACLE STUDY: {piece_name} on {rows}x{cols} from {start_pos}, seed {args.seed}\n")
+        print_study_table(report)
+        return
+    
+    patrols = None
+    if args.patrol:
+        try:
+            patrols = [parse_obstacles(route) for route in args.patrol]
+            for square in (square for route in patrols for square in route):
+                if not (0 <= square[0] < rows and 0 <= square[1] < cols):
+                    raise ValueError(f"Patrol square {square} is outside the board")
+            if args.reverse or args.max_moves is not None or args.move_cost == "squares":
+                raise ValueError("--patrol cannot be combined with --reverse, --max-moves or --move-cost squares")
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
+    if args.hunt:
+        run_pursuit(args, piece_name, movements, rows, cols,
+                    obstacles, mask)
+        return
+    
+    if args.route:
+        run_route(args, piece_name, movements, rows, cols, start_pos, obstacles, mask)
+        return
+    
+    if args.meet:
+        run_rendezvous(args, piece_name, movements, rows, cols, start_pos, obstacles, mask)
+        return
+    
     # Generate and display heatmap
     grid = [[0] * cols for _ in range(rows)]
     
     print(f"\n{piece_name.upper()} MOVEMENT HEATMAP")
     print("=" * (len(piece_name) + 17))
-    print(f"Board: {rows}x{cols}")
-    print(f"Starting position: {start_pos}")
+    print(f"Board: {rows}x{cols}" + (f" ({mask.count()} playable squares)" if mask else ""))
+    print(f"{'Target' if args.reverse else 'Starting'} position: {start_pos}")
+    # Hoppers and cannons follow screen rules once there are obstacles or holes to act as screens
+    hopper = screen_movement(piece_name, obstacles, mask) if not patrols else None
+    if hopper and (args.reverse or args.move_cost == "squares"):
+        print(f"Note: screen rules are not supported with --reverse or --move-cost squares; "
+              f"using the plain offsets of {piece_name}")
+        hopper = None
+    elif hopper:
+        print(f"Movement: {hopper.kind} rules, obstacles and holes act as screens")
+    if args.reverse:
+        # One BFS from the target over negated offsets gives distance-to-target everywhere
+        movements = reverse_movements(movements)
     if obstacles:
         print(f"Obstacles: {obstacles}")
+    if patrols:
+        print(f"Patrols: {'; '.join(' -> '.join(f'({r},{c})' for r, c in route) for route in patrols)}")
     print()
     
-    if obstacles:
-        heatmap = generate_heatmap_with_obstacles(grid, movements, start_pos, obstacles)
+    if patrols:
+        # Space-time search: blockers move every turn and the piece may wait
+        schedule = patrol_schedule(rows, cols, patrols, obstacles, mask)
+        try:
+            heatmap = generate_timed_heatmap(rows, cols, movements, start_pos, schedule)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print_heatmap_with_obstacles(heatmap, args.width)
+    elif hopper:
+        heatmap = generate_heatmap_with_obstacles(grid, hopper, start_pos, obstacles, mask=mask)
+        if args.max_moves is not None:
+            heatmap = [[-1 if cell > args.max_moves else cell for cell in row] for row in heatmap]
+        print_heatmap_with_obstacles(heatmap, args.width)
+    elif args.max_moves is not None:
+        # Depth-limited search: stream BFS layers and stop after K moves
+        flags = (mask or BoardMask.full(rows, cols)).blocked_flags(obstacles)
+        heatmap = [[-2 if flags[r * cols + c] else -1 for c in range(cols)] for r in range(rows)]
+        for distance, squares in iter_heatmap_layers(grid, movements, start_pos, obstacles, args.max_moves, mask=mask):
+            for row, col in squares:
+                heatmap[row][col] = distance
+        print_heatmap_with_obstacles(heatmap, args.width)
+    elif args.move_cost == "squares":
+        heatmap = generate_weighted_heatmap(grid, movements, start_pos, obstacles, mask=mask,
+                                            move_cost=slide_distance_cost)
+        print_heatmap_with_obstacles(heatmap, args.width)
+    elif args.workers and args.workers > 1 and not mask:
+        # Split this one heatmap across worker processes by row stripes
+        heatmap = parallel_heatmap(rows, cols, movements, start_pos, obstacles, args.workers)
+        print_heatmap_with_obstacles(heatmap, args.width)
+    elif mask:
+        heatmap = compute_heatmap(rows, cols, movements, start_pos, obstacles, mask=mask)
         print_heatmap_with_obstacles(heatmap, args.width)
     else:
-        heatmap = generate_heatmap(grid, movements, start_pos)
-        print_heatmap(heatmap, args.width)
+        # Engine picked per query by the cost model (or forced with --engine)
+        try:
+            use_engine(args.engine)
+            heatmap = generate_heatmap_with_obstacles(grid, movements, start_pos, obstacles)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if obstacles:
+            print_heatmap_with_obstacles(heatmap, args.width)
+        else:
+            print_heatmap(heatmap, args.width)
+        if args.explain_engine:
+            print(f"\nEngine: {last_choice().engine} ({last_choice().reason})")
+            if args.engine == "auto" and not cost_model().calibrated:
+                print("Cost model: uncalibrated built-in defaults; run --calibrate-engines to measure this machine")
+    if not isinstance(heatmap, Heatmap):
+        heatmap = Heatmap.from_rows(heatmap)
+    
+    if args.export:
+        try:
+            export_heatmap(heatmap, args.export, args.export_format)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"\nHeatmap written to {args.export}")
     
     if not args.no_legend:
         print(f"\nLegend:")
-        print(f"  0 = Starting position")
-        print(f"  N = Reachable in N moves")
-        print(f"  - = Unreachable")
-        if obstacles:
-            print(f"  X = Obstacle")
+        if args.reverse:
+            print(f"  0 = Target position")
+            if args.move_cost == "squares":
+                print(f"  N = Reaches the target by travelling N squares")
+            else:
+                print(f"  N = Reaches the target in N moves")
+        else:
+            print(f"  0 = Starting position")
+            if args.move_cost == "squares":
+                print(f"  N = Reachable by travelling N squares")
+            elif patrols:
+                print(f"  N = Earliest turn the square can be reached (waiting allowed)")
+            else:
+                print(f"  N = Reachable in N moves")
+        if args.max_moves is not None:
+            print(f"  - = Unreachable within {args.max_moves} moves")
+        else:
+            print(f"  - = Unreachable")
+        if obstacles or mask or patrols:
+            print(f"  X = Obstacle" + (" or off-board square" if mask else "")
+                  + (" (blocked on every turn)" if patrols else ""))
         print(f"\nTotal movement options: {len(movements)}")
         
         # Calculate reachable squares
-        reachable = sum(1 for row in heatmap for cell in row if cell >= 0)
-        total = rows * cols
-        if obstacles:
-            total -= len(obstacles)
+        reachable = heatmap.reachable_count()
+        if mask or patrols:
+            total = rows * cols - heatmap.count(-2)
+        else:
+            total = rows * cols
+            if obstacles:
+                total -= len(obstacles)
         print(f"Reachable squares: {reachable}/{total} ({reachable/total*100:.1f}%)")
 
 
@@ -0,0 +1,420 @@
+"""
+Pick the fastest heatmap engine for each query.
+
+All engines return the same distances; they differ in what their cost
+scales with:
+
+  lookup    copy from the tablebase installed with heatmap.use_tablebase
+            (obstacle-free queries only): proportional to the board area
+  deque     queue of (row, col, distance) tuples: open squares x offsets
+  frontier  flat-index layer lists (heatmap_array): open squares x offsets,
+            with a smaller constant
+  bitboard  shift-and-mask per offset per layer (bitboard.py): layers x
+            offsets x board words, plus one write per reached square
+
+Each engine's running time is modelled as a linear function of features
+derived from the board area, the number and range of the offsets and the
+obstacle density. The coefficients come from a micro-benchmark run on request
+(calibrate_and_save, or the CLI's --calibrate-engines) and stored as JSON
+(CHESS_HEATMAP_COST_MODEL, or ~/.cache/chess_heatmap/cost_model.json); until
+then queries use built-in defaults. The dispatcher runs the engine with
+the lowest estimate. Set CHESS_HEATMAP_ENGINE_DEBUG=1 (or call
+set_engine_debug) to have every choice and its estimates printed to stderr.
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import heatmap
+from bitboard import bitboard_heatmap, full_board
+from heatmap_array import frontier_heatmap
+
+ENGINES = ("lookup", "deque", "frontier", "bitboard")
+SEARCH_ENGINES = ("deque", "frontier", "bitboard")
+COST_MODEL_ENV = "CHESS_HEATMAP_COST_MODEL"
+DEBUG_ENV = "CHESS_HEATMAP_ENGINE_DEBUG"
+COST_MODEL_VERSION = 1
+
+# Uncalibrated coefficients (seconds), used until a calibrated model is stored
+DEFAULT_COEFFICIENTS = {
+    "lookup": [2e-6, 2e-8],
+    "deque": [5e-6, 2.5e-7],
+    "frontier": [8e-6, 1.5e-7],
+    "bitboard": [1e-5, 2e-7, 1.5e-7],
+}
+
+# State of the dispatcher: cost model, forced engine, debug flag, last choice
+_model = None
+_forced_engine: Optional[str] = None
+_debug = os.environ.get(DEBUG_ENV, "") not in ("", "0")
+_last_choice = None
+
+
+class QueryShape:
+    """The features of a heatmap query that drive engine costs."""
+
+    __slots__ = ("rows", "cols", "offsets", "reach", "obstacles")
+
+    def __init__(self, rows: int, cols: int, piece_movements: Sequence[Tuple[int, int]],
+                 obstacles: Optional[Sequence[Tuple[int, int]]] = None):
+        usable = {tuple(move) for move in piece_movements
+                  if tuple(move) != (0, 0) and abs(move[0]) < rows and abs(move[1]) < cols}
+        self.rows = rows
+        self.cols = cols
+        self.offsets = len(usable)
+        self.reach = max((max(abs(dr), abs(dc)) for dr, dc in usable), default=1)
+        self.obstacles = len(set(map(tuple, obstacles))) if obstacles else 0
+
+    @property
+    def cells(self) -> int:
+        return self.rows * self.cols
+
+    @property
+    def density(self) -> float:
+        return self.obstacles / self.cells
+
+    def features(self, engine: str) -> List[float]:
+        """Feature vector of this query for engine's linear cost model."""
+        open_squares = self.cells - self.obstacles
+        if engine == "lookup":
+            return [1.0, float(self.cells)]
+        if engine in ("deque", "frontier"):
+            return [1.0, float(open_squares * self.offsets)]
+        # Layers: roughly the board span over the longest offset
+        layers = max(self.rows, self.cols) / self.reach + 1
+        words = self.cells / 64 + 1
+        return [1.0, layers * self.offsets * words, float(open_squares)]
+
+    def __repr__(self) -> str:
+        return (f"{self.rows}x{self.cols}, {self.offsets} offsets, reach {self.reach}, "
+                f"{self.density:.0%} obstacles")
+
+
+class CostModel:
+    """Linear cost model per engine: estimated seconds = coefficients . features."""
+
+    __slots__ = ("coefficients", "calibrated")
+
+    def __init__(self, coefficients: Optional[Dict[str, List[float]]] = None, calibrated: bool = False):
+        self.coefficients = {engine: list(values) for engine, values
+                             in (coefficients or DEFAULT_COEFFICIENTS).items()}
+        self.calibrated = calibrated
+
+    def estimate(self, engine: str, query: QueryShape) -> float:
+        return sum(c * f for c, f in zip(self.coefficients[engine], query.features(engine)))
+
+    def to_dict(self) -> dict:
+        return {
+            "version": COST_MODEL_VERSION,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "coefficients": self.coefficients,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CostModel":
+        if data.get("version") != COST_MODEL_VERSION or data.get("python") != platform.python_version():
+            raise ValueError("Cost model was calibrated for another version")
+        coefficients = data["coefficients"]
+        for engine, values in DEFAULT_COEFFICIENTS.items():
+            if len(coefficients.get(engine, ())) != len(values):
+                raise ValueError(f"Cost model has no valid coefficients for {engine}")
+        return cls(coefficients, calibrated=True)
+
+    def save(self, path: str) -> None:
+        """Write the model as JSON, atomically so concurrent processes never see half a file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CostModel":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+class EngineChoice:
+    """Which engine a query ran on, why, and the estimates behind the choice."""
+
+    __slots__ = ("engine", "reason", "estimates", "query")
+
+    def __init__(self, engine: str, reason: str, estimates: Dict[str, float], query: QueryShape):
+        self.engine = engine
+        self.reason = reason
+        self.estimates = estimates
+        self.query = query
+
+    def __repr__(self) -> str:
+        return f"EngineChoice({self.engine!r}, {self.reason!r})"
+
+
+def default_cost_model_path() -> str:
+    return os.environ.get(COST_MODEL_ENV) or os.path.join(
+        os.path.expanduser("~"), ".cache", "chess_heatmap", "cost_model.json")
+
+
+def _least_squares(samples: List[List[float]], times: List[float]) -> List[float]:
+    """Non-negative least squares fit, dropping features whose weight comes out negative."""
+    active = list(range(len(samples[0])))
+    while True:
+        n = len(active)
+        # Normal equations, scaled per feature to keep them well conditioned
+        scale = [max(abs(row[j]) for row in samples) or 1.0 for j in active]
+        a = [[sum(row[i] / si * row[j] / sj for row in samples) for j, sj in zip(active, scale)]
+             for i, si in zip(active, scale)]
+        b = [sum(row[i] / si * t for row, t in zip(samples, times)) for i, si in zip(active, scale)]
+        for col in range(n):
+            pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+            a[col], a[pivot] = a[pivot], a[col]
+            b[col], b[pivot] = b[pivot], b[col]
+            if abs(a[col][col]) < 1e-12:
+                a[col][col] = 1e-12
+            for r in range(n):
+                if r != col:
+                    factor = a[r][col] / a[col][col]
+                    for k in range(col, n):
+                        a[r][k] -= factor * a[col][k]
+                    b[r] -= factor * b[col]
+        weights = [b[i] / a[i][i] / scale[i] for i in range(n)]
+        negative = [i for i, w in enumerate(weights) if w < 0]
+        if not negative or n == 1:
+            coefficients = [0.0] * len(samples[0])
+            for i, w in zip(active, weights):
+                coefficients[i] = max(w, 0.0)
+            return coefficients
+        del active[negative[0]]
+
+
+def calibrate(repeats: int = 2, verbose: bool = False) -> CostModel:
+    """
+    Time every engine on a small grid of boards and fit the cost model.
+
+    Boards of 12x12 to 48x48 with a stepper, a leaper and a slider, with and
+    without obstacles; takes well under a second on a typical machine.
+    """
+    king = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    rook = [(i, 0) for i in range(-7, 8) if i] + [(0, i) for i in range(-7, 8) if i]
+    rng = random.Random(0)
+    samples: Dict[str, List[List[float]]] = {engine: [] for engine in ENGINES}
+    times: Dict[str, List[float]] = {engine: [] for engine in ENGINES}
+
+    def timed(engine: str, query: QueryShape, run) -> None:
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        samples[engine].append(query.features(engine))
+        times[engine].append(best)
+
+    for size in (12, 24, 48):
+        squares = [(r, c) for r in range(size) for c in range(size) if (r, c) != (0, 0)]
+        for density in (0.0, 0.3):
+            obstacles = rng.sample(squares, int(density * size * size))
+            for movements in (king, knight, rook):
+                query = QueryShape(size, size, movements, obstacles)
+                for engine in SEARCH_ENGINES:
+                    timed(engine, query, lambda: run_engine(engine, size, size, movements, (0, 0), obstacles))
+        # A lookup is a copy of a stored byte table into a fresh list of lists
+        table = bytes(size * size)
+        timed("lookup", QueryShape(size, size, king),
+              lambda: [list(table[r * size:(r + 1) * size]) for r in range(size)])
+        timed("lookup", QueryShape(size, 1, king), lambda: [list(table[:1])])
+
+    # Fit relative rather than absolute error, so small boards count as much as large ones
+    model = CostModel({engine: _least_squares([[f / t for f in row] for row, t in zip(samples[engine], times[engine])],
+                                              [1.0] * len(times[engine]))
+                       for engine in ENGINES}, calibrated=True)
+    if verbose:
+        for engine in ENGINES:
+            print(f"{engine:>9}: " + ", ".join(f"{c:.3g}" for c in model.coefficients[engine]))
+    return model
+
+
+def load_cost_model(path: Optional[str] = None, calibrate_missing: bool = False) -> CostModel:
+    """
+    The stored cost model, or the uncalibrated defaults if there is none.
+
+    With calibrate_missing a missing model is calibrated and saved first;
+    a model that cannot be saved is still used for this process.
+    """
+    path = path or default_cost_model_path()
+    try:
+        return CostModel.load(path)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    if not calibrate_missing:
+        return CostModel()
+    model = calibrate()
+    try:
+        model.save(path)
+    except OSError:
+        pass
+    return model
+
+
+def calibrate_and_save(path: Optional[str] = None, repeats: int = 2, verbose: bool = False) -> CostModel:
+    """Calibrate, store the model at path (default: the cache path) and use it from now on."""
+    model = calibrate(repeats, verbose)
+    model.save(path or default_cost_model_path())
+    set_cost_model(model)
+    return model
+
+
+def set_cost_model(model: Optional[CostModel]) -> None:
+    """Use model for dispatching; None reloads the stored one on the next query."""
+    global _model
+    _model = model
+
+
+def use_engine(engine: Optional[str]) -> None:
+    """Force every query onto one engine ('auto' or None restores dispatching)."""
+    global _forced_engine
+    if engine not in (None, "auto") and engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+    _forced_engine = None if engine == "auto" else engine
+
+
+def set_engine_debug(enabled: bool) -> None:
+    """Print each engine choice and the estimates behind it to stderr."""
+    global _debug
+    _debug = enabled
+
+
+def last_choice() -> Optional[EngineChoice]:
+    """The EngineChoice of the most recent dispatched query."""
+    return _last_choice
+
+
+def _cost_model() -> CostModel:
+    global _model
+    if _model is None:
+        # Never benchmark implicitly: without a stored model, use the defaults
+        _model = load_cost_model(calibrate_missing=False)
+    return _model
+
+
+def cost_model() -> CostModel:
+    """The cost model dispatching uses; check .calibrated for whether it was measured here."""
+    return _cost_model()
+
+
+def choose_engine(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    obstacles: Optional[Sequence[Tuple[int, int]]] = None,
+    lookup_available: bool = False
+) -> EngineChoice:
+    """
+    Rank the engines for one query by estimated cost.
+
+    Args:
+        rows, cols: Board size
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+        lookup_available: Whether a tablebase could answer the query
+
+    Returns:
+        EngineChoice for the cheapest engine; estimates covers every candidate
+    """
+    query = QueryShape(rows, cols, piece_movements, obstacles)
+    candidates = list(SEARCH_ENGINES)
+    if lookup_available and not obstacles:
+        candidates.insert(0, "lookup")
+    if _forced_engine is not None:
+        if _forced_engine not in candidates:
+            raise ValueError(f"Engine {_forced_engine} cannot answer this query")
+        return EngineChoice(_forced_engine, "forced with use_engine", {}, query)
+    model = _cost_model()
+    estimates = {engine: model.estimate(engine, query) for engine in candidates}
+    engine = min(candidates, key=estimates.get)
+    runner_up = min((e for e in candidates if e != engine), key=estimates.get)
+    source = "calibrated" if model.calibrated else "uncalibrated default"
+    reason = (f"lowest {source} estimate for {query}: {estimates[engine] * 1e3:.3g} ms "
+              f"vs {runner_up} {estimates[runner_up] * 1e3:.3g} ms")
+    return EngineChoice(engine, reason, estimates, query)
+
+
+def run_engine(
+    engine: str,
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[Sequence[Tuple[int, int]]] = None
+) -> Optional[List[List[int]]]:
+    """Run one engine; 'lookup' returns None when the tablebase lacks the entry."""
+    if engine == "lookup":
+        if heatmap._tablebase is None or obstacles:
+            return None
+        return heatmap._tablebase.lookup(piece_movements, rows, cols, start_coord)
+    if engine == "deque":
+        return heatmap.deque_heatmap(rows, cols, piece_movements, start_coord, obstacles)
+    if engine == "frontier":
+        return frontier_heatmap(rows, cols, piece_movements, start_coord, obstacles).tolist()
+    if engine == "bitboard":
+        open_bits = None
+        if obstacles:
+            blocked = 0
+            for obs_row, obs_col in obstacles:
+                if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                    blocked |= 1 << (obs_row * cols + obs_col)
+            open_bits = full_board(rows, cols) & ~blocked
+        return bitboard_heatmap(rows, cols, piece_movements, start_coord, open_bits)
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def dispatch_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[Sequence[Tuple[int, int]]] = None
+) -> List[List[int]]:
+    """
+    Generate a heatmap on the engine with the lowest estimated cost.
+
+    Returns:
+        Heatmap where each cell contains the minimum moves to reach it
+        (-1 if unreachable, -2 if obstacle)
+    """
+    global _last_choice
+    choice = choose_engine(rows, cols, piece_movements, obstacles,
+                           lookup_available=heatmap._tablebase is not None)
+    result = run_engine(choice.engine, rows, cols, piece_movements, start_coord, obstacles)
+    if result is None:
+        # Tablebase miss: fall back to the cheapest search engine
+        engine = min(SEARCH_ENGINES, key=choice.estimates.get) if choice.estimates else "frontier"
+        choice = EngineChoice(engine, "tablebase has no entry; next lowest estimate", choice.estimates,
+                              choice.query)
+        result = run_engine(engine, rows, cols, piece_movements, start_coord, obstacles)
+    _last_choice = choice
+    if _debug:
+        print(f"[engine] {choice.engine}: {choice.reason}", file=sys.stderr)
+    return result
+
+
+# Example usage
+if __name__ == "__main__":
+    print("Calibrating...")
+    model = calibrate(verbose=True)
+    set_cost_model(model)
+    set_engine_debug(True)
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    queen = [(i * dr, i * dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc for i in range(1, 200)]
+    rng = random.Random(1)
+    for rows, movements, density in ((8, knight, 0), (200, knight, 0), (200, queen, 0), (200, knight, 0.4)):
+        squares = [(r, c) for r in range(rows) for c in range(rows) if (r, c) != (0, 0)]
+        obstacles = rng.sample(squares, int(density * len(squares)))
+        started = time.perf_counter()
+        dispatch_heatmap(rows, rows, movements, (0, 0), obstacles)
+        print(f"  took {(time.perf_counter() - started) * 1e3:.1f} ms")
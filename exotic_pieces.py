@@ -1,4 +1,5 @@
 from heatmap import generate_heatmap, print_heatmap
+from itertools import permutations, product
 from typing import List, Tuple, Dict
 
 def get_piece_movements() -> Dict[str, List[Tuple[int, int]]]:
@@ -66,6 +67,64 @@ def get_piece_movements() -> Dict[str, List[Tuple[int, int]]]:
     return pieces
 
 
+def _directions(dims: int, axes: int) -> List[Tuple[int, ...]]:
+    """Unit steps that move along exactly `axes` of the `dims` axes."""
+    return [step for step in product((-1, 0, 1), repeat=dims) if sum(map(abs, step)) == axes]
+
+
+def _leaper(a: int, b: int, dims: int) -> List[Tuple[int, ...]]:
+    """The (a, b) leaper in `dims` dimensions: a along one axis and b along another."""
+    moves = set()
+    for i, j in permutations(range(dims), 2):
+        for sa, sb in product((-1, 1), repeat=2):
+            move = [0] * dims
+            move[i], move[j] = sa * a, sb * b
+            moves.add(tuple(move))
+    return sorted(moves)
+
+
+def _rider(directions: List[Tuple[int, ...]], reach: int) -> List[Tuple[int, ...]]:
+    """Repeat each step up to `reach` times, like the slider lists above."""
+    return [tuple(i * d for d in step) for step in directions for i in range(1, reach + 1)]
+
+
+def get_nd_piece_movements(dims: int = 3, reach: int = 7) -> Dict[str, List[Tuple[int, ...]]]:
+    """
+    Returns N-dimensional versions of the leapers and sliders above, as in Raumschach.
+
+    An (a, b) leaper moves a squares along one axis and b along another, so the
+    3-D knight has 24 moves. Sliders follow Raumschach: the rook moves along one
+    axis, the bishop along two at once, the unicorn along three, and the queen
+    along any line of unit steps. Direction-dependent pieces (shogi, xiangqi
+    soldiers) have no natural N-D version and are left out.
+    """
+    rook = _rider(_directions(dims, 1), reach)
+    bishop = _rider(_directions(dims, 2), reach)
+    queen = _rider([step for axes in range(1, dims + 1) for step in _directions(dims, axes)], reach)
+    knight = _leaper(2, 1, dims)
+    pieces = {
+        "king": [step for axes in range(1, dims + 1) for step in _directions(dims, axes)],
+        "knight": knight,
+        "camel": _leaper(3, 1, dims),
+        "zebra": _leaper(3, 2, dims),
+        "giraffe": _leaper(4, 1, dims),
+        "nightrider": _rider(knight, reach),
+        "dabbaba": _leaper(2, 0, dims),
+        "alfil": _leaper(2, 2, dims),
+        "wazir": _leaper(1, 0, dims),
+        "ferz": _leaper(1, 1, dims),
+        "rook": rook,
+        "bishop": bishop,
+        "queen": queen,
+        "amazon": knight + queen,
+        "archbishop": knight + bishop,
+        "chancellor": knight + rook,
+    }
+    if dims >= 3:
+        pieces["unicorn"] = _rider(_directions(dims, 3), reach)
+    return pieces
+
+
 def demonstrate_piece(grid_size: int, piece_name: str, movements: List[Tuple[int, int]], 
                      start_pos: Tuple[int, int] = None):
     """Demonstrate a single piece's movement heatmap."""
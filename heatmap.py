@@ -1,11 +1,30 @@
 from collections import deque
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
+
+from bitboard import check_start, iter_bitboard_layers, iter_bits
+from board_mask import BoardMask
+
+# Optional precomputed tablebase (see tablebase.py) consulted before searching
+_tablebase = None
+
+
+def use_tablebase(tablebase) -> None:
+    """
+    Answer generate_heatmap from a tablebase whenever it holds the piece and
+    board size; pass None to always search.
+    """
+    global _tablebase
+    _tablebase = tablebase
+
 
 def generate_heatmap(grid: List[List[int]], piece_movements: List[Tuple[int, int]], start_coord: Tuple[int, int]) -> List[List[int]]:
     """
     Generate a heatmap showing the minimum number of moves required to reach each cell
     from the starting coordinate using the given piece's movement set.
     
+    The search engine (tablebase lookup, deque, frontier or bitboard BFS) is
+    picked per query by engine_dispatch; every engine gives the same result.
+    
     Args:
         grid: NxM grid (list of lists)
         piece_movements: List of (row_offset, col_offset) tuples representing valid moves
@@ -14,8 +33,37 @@ def generate_heatmap(grid: List[List[int]], piece_movements: List[Tuple[int, int
     Returns:
         Heatmap where each cell contains the minimum moves to reach it (-1 if unreachable)
     """
-    rows, cols = len(grid), len(grid[0])
+    # Imported here: engine_dispatch imports this module for the deque engine
+    from engine_dispatch import dispatch_heatmap
+    return dispatch_heatmap(len(grid), len(grid[0]), piece_movements, start_coord)
+
+
+def deque_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None
+) -> List[List[int]]:
+    """
+    Plain queue-based BFS over (row, col) pairs; the reference engine.
+    
+    Returns:
+        Heatmap where each cell contains the minimum moves to reach it
+        (-1 if unreachable, -2 if obstacle)
+    """
     heatmap = [[-1 for _ in range(cols)] for _ in range(rows)]
+    
+    # Mark obstacles
+    if obstacles:
+        for obs_row, obs_col in obstacles:
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                heatmap[obs_row][obs_col] = -2
+    
+    # Check if start position is valid
+    if heatmap[start_coord[0]][start_coord[1]] == -2:
+        raise ValueError("Starting position is on an obstacle!")
+    
     queue = deque([(start_coord[0], start_coord[1], 0)])  # (row, col, distance)
     heatmap[start_coord[0]][start_coord[1]] = 0
     
@@ -30,6 +78,71 @@ def generate_heatmap(grid: List[List[int]], piece_movements: List[Tuple[int, int
     return heatmap
 
 
+def iter_heatmap_layers(
+    grid: List[List[int]],
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    max_moves: Optional[int] = None,
+    mask: Optional[BoardMask] = None
+) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+    """
+    Yield the BFS one layer at a time, as soon as each layer is complete.
+    
+    The search stops after max_moves, or earlier if the caller stops iterating,
+    so "reachable within k moves" queries never explore the rest of the board.
+    
+    Args:
+        grid: NxM grid (list of lists)
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        start_coord: Starting position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+        max_moves: Optional limit on the number of moves explored
+        mask: Optional board geometry; the board size comes from the mask, its
+              holes are treated like obstacles and the layers are expanded on
+              the bit-packed mask directly
+        
+    Yields:
+        (distance, squares) tuples, where squares lists the (row, col) positions
+        first reached in exactly `distance` moves; distance 0 is the start
+    """
+    if mask is not None:
+        open_bits = mask.without(obstacles).bits if obstacles else mask.bits
+        check_start(mask.rows, mask.cols, start_coord, open_bits)
+        for distance, layer in enumerate(iter_bitboard_layers(mask.rows, mask.cols, piece_movements,
+                                                               start_coord, open_bits, max_moves)):
+            yield distance, [divmod(index, mask.cols) for index in iter_bits(layer)]
+        return
+    
+    rows, cols = len(grid), len(grid[0])
+    visited = [[False] * cols for _ in range(rows)]
+    if obstacles:
+        for obs_row, obs_col in obstacles:
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                visited[obs_row][obs_col] = True
+    if visited[start_coord[0]][start_coord[1]]:
+        raise ValueError("Starting position is on an obstacle!")
+    
+    visited[start_coord[0]][start_coord[1]] = True
+    frontier = [tuple(start_coord)]
+    distance = 0
+    yield distance, frontier
+    
+    while max_moves is None or distance < max_moves:
+        layer = []
+        for x, y in frontier:
+            for dx, dy in piece_movements:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < rows and 0 <= ny < cols and not visited[nx][ny]:
+                    visited[nx][ny] = True
+                    layer.append((nx, ny))
+        if not layer:
+            return
+        distance += 1
+        yield distance, layer
+        frontier = layer
+
+
 def print_heatmap(heatmap: List[List[int]], width: int = 3) -> None:
     """Pretty print the heatmap with aligned columns."""
     for row in heatmap:
@@ -0,0 +1,248 @@
+import sys
+from array import array
+from collections import Counter
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+# int32 typecode; 'i' is four bytes on every platform CPython supports
+HEATMAP_TYPECODE = "i"
+
+
+class Heatmap(array):
+    """
+    Heatmap stored as one flat, row-major int32 array.
+
+    Being an array.array, a Heatmap supports the buffer protocol: memoryview(h)
+    and numpy.frombuffer(h, dtype=numpy.int32) wrap it without copying, and
+    view2d() gives a (rows, cols) memoryview. For backward compatibility it
+    also behaves like the List[List[int]] results of generate_heatmap:
+    len(h) is the row count, h[row] is a lazy row view and h[row][col] a cell.
+    Cell values follow the usual convention: distance, -1 if unreachable,
+    -2 if obstacle.
+    """
+
+    __slots__ = ("rows", "cols")
+
+    def __new__(cls, rows: int, cols: int, fill: int = -1):
+        self = super().__new__(cls, HEATMAP_TYPECODE)
+        self.extend(array(HEATMAP_TYPECODE, [fill]) * (rows * cols))
+        self.rows = rows
+        self.cols = cols
+        return self
+
+    def __init__(self, rows: int, cols: int, fill: int = -1):
+        pass  # Everything happens in __new__; array.__init__ takes no arguments
+
+    @classmethod
+    def from_rows(cls, rows_list: Sequence[Sequence[int]]) -> "Heatmap":
+        """Build a Heatmap from a list-of-lists heatmap."""
+        rows = len(rows_list)
+        cols = len(rows_list[0]) if rows else 0
+        heatmap = cls(0, 0)
+        for row in rows_list:
+            if len(row) != cols:
+                raise ValueError("All heatmap rows must have the same length")
+            heatmap.extend(row)
+        heatmap.rows, heatmap.cols = rows, cols
+        return heatmap
+
+    @classmethod
+    def from_flat(cls, rows: int, cols: int, values: Union[Sequence[int], bytes, memoryview]) -> "Heatmap":
+        """
+        Build a Heatmap from rows * cols row-major values (a list, an array, or
+        a buffer of native int32 values).
+        """
+        heatmap = cls(0, 0)
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            heatmap.frombytes(values)
+        else:
+            heatmap.extend(values)
+        if array.__len__(heatmap) != rows * cols:
+            raise ValueError(f"Expected {rows * cols} values for a {rows}x{cols} heatmap")
+        heatmap.rows, heatmap.cols = rows, cols
+        return heatmap
+
+    def __reduce_ex__(self, protocol):
+        return (_rebuild_heatmap, (self.rows, self.cols, self.tobytes(), sys.byteorder))
+
+    # Sequence-of-rows behaviour, as with List[List[int]]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[memoryview]:
+        for row in range(self.rows):
+            yield self.row(row)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            row, col = key
+            return array.__getitem__(self, self._index(row, col))
+        if isinstance(key, slice):
+            return [self.row(row) for row in range(*key.indices(self.rows))]
+        return self.row(key)
+
+    def __setitem__(self, key, value) -> None:
+        if not isinstance(key, tuple):
+            raise TypeError("Assign cells with heatmap[row, col] = value")
+        array.__setitem__(self, self._index(*key), value)
+
+    def _index(self, row: int, col: int) -> int:
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Cell {(row, col)} is outside the {self.rows}x{self.cols} heatmap")
+        return row * self.cols + col
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Heatmap):
+            return self.shape == other.shape and array.__eq__(self, other)
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Heatmap({self.rows}x{self.cols}, reachable={self.reachable_count()})"
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.rows, self.cols
+
+    def row(self, row: int) -> memoryview:
+        """Zero-copy, writable view of one row."""
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError(f"Row {row} is outside the {self.rows}x{self.cols} heatmap")
+        return memoryview(self)[row * self.cols:(row + 1) * self.cols]
+
+    def view2d(self) -> memoryview:
+        """Zero-copy (rows, cols) memoryview, e.g. for numpy.asarray()."""
+        return memoryview(self).cast("B").cast(HEATMAP_TYPECODE, (self.rows, self.cols))
+
+    def tolist(self) -> List[List[int]]:
+        """Plain list-of-lists copy, as returned by generate_heatmap."""
+        return [self.row(row).tolist() for row in range(self.rows)]
+
+    def cells(self) -> Iterator[int]:
+        """Iterate over all cell values in row-major order."""
+        return array.__iter__(self)
+
+    # Aggregates, computed by C-level loops over the flat buffer
+
+    def reachable_count(self) -> int:
+        """Number of cells reached (distance >= 0), including the start."""
+        return array.__len__(self) - self.count(-1) - self.count(-2)
+
+    def max_distance(self) -> int:
+        """Largest distance on the board (-1 if nothing is reachable)."""
+        return max(self.cells(), default=-1)
+
+    def histogram(self) -> List[int]:
+        """counts[d] is the number of cells reached in exactly d moves."""
+        counts = Counter(self.cells())
+        return [counts.get(d, 0) for d in range(max((k for k in counts if k >= 0), default=-1) + 1)]
+
+
+def _rebuild_heatmap(rows: int, cols: int, data: bytes, byteorder: str) -> Heatmap:
+    heatmap = Heatmap.from_flat(rows, cols, data)
+    if byteorder != sys.byteorder:
+        heatmap.byteswap()
+    return heatmap
+
+
+def compute_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    mask=None
+) -> Heatmap:
+    """
+    Generate a heatmap straight into a flat Heatmap buffer.
+
+    Frontier BFS over flat square indices, with the same results as
+    generate_heatmap / generate_heatmap_with_obstacles. Obstacle-free queries
+    are answered from the tablebase installed with heatmap.use_tablebase, and
+    irregular boards (a BoardMask) use the bitboard engine.
+
+    Args:
+        rows, cols: Board size (ignored when a mask is given)
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        start_coord: Starting position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+        mask: Optional BoardMask of playable squares
+
+    Returns:
+        Heatmap where each cell contains the minimum moves to reach it
+        (-1 if unreachable, -2 if obstacle or hole)
+    """
+    if mask is not None:
+        from board_mask import generate_heatmap_masked
+        return Heatmap.from_rows(generate_heatmap_masked(mask, piece_movements, start_coord, obstacles))
+    if not obstacles:
+        from heatmap import _tablebase
+        if _tablebase is not None:
+            heatmap = _tablebase.lookup_heatmap(piece_movements, rows, cols, start_coord)
+            if heatmap is not None:
+                return heatmap
+
+    return frontier_heatmap(rows, cols, piece_movements, start_coord, obstacles)
+
+
+def frontier_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None
+) -> Heatmap:
+    """Frontier BFS over flat square indices, without tablebase or mask handling."""
+    size = rows * cols
+    dist = [-1] * size
+    if obstacles:
+        for obs_row, obs_col in obstacles:
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                dist[obs_row * cols + obs_col] = -2
+    if not (0 <= start_coord[0] < rows and 0 <= start_coord[1] < cols):
+        raise ValueError(f"Starting position {start_coord} is outside the {rows}x{cols} board")
+    start = start_coord[0] * cols + start_coord[1]
+    if dist[start] == -2:
+        raise ValueError("Starting position is on an obstacle!")
+
+    moves = [(dr, dc, dr * cols + dc) for dr, dc in set(map(tuple, piece_movements))
+             if (dr, dc) != (0, 0) and abs(dr) < rows and abs(dc) < cols]
+    dist[start] = 0
+    frontier = [start]
+    distance = 0
+    while frontier:
+        distance += 1
+        layer = []
+        for square in frontier:
+            row, col = divmod(square, cols)
+            for dr, dc, delta in moves:
+                if 0 <= row + dr < rows and 0 <= col + dc < cols:
+                    target = square + delta
+                    if dist[target] == -1:
+                        dist[target] = distance
+                        layer.append(target)
+        frontier = layer
+
+    return Heatmap.from_flat(rows, cols, dist)
+
+
+# Example usage
+if __name__ == "__main__":
+    from heatmap import print_heatmap
+
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    heatmap = compute_heatmap(8, 8, knight, (0, 0))
+    print("Knight from (0, 0):")
+    print_heatmap(heatmap)
+    print(f"\n{heatmap!r}, max distance {heatmap.max_distance()}")
+    print(f"Squares per distance: {heatmap.histogram()}")
+    print(f"Buffer: {memoryview(heatmap).nbytes} bytes, 2D view shape {heatmap.view2d().shape}")
@@ -0,0 +1,172 @@
+import csv
+import json
+import sys
+from array import array
+from typing import List, Optional, Tuple
+from heatmap_array import Heatmap
+
+# NumPy-style dtype names mapped to (array typecode, .npy descriptor)
+EXPORT_DTYPES = {
+    "int8": ("b", "<i1"),
+    "int16": ("h", "<i2"),
+    "int32": ("i", "<i4"),
+    "int64": ("q", "<i8"),
+}
+
+NPY_MAGIC = b"\x93NUMPY"
+
+
+def _heatmap_shape(heatmap: List[List[int]]) -> Tuple[int, int]:
+    return len(heatmap), len(heatmap[0]) if heatmap else 0
+
+
+def _write_rows(f, heatmap: List[List[int]], typecode: str) -> None:
+    """Write heatmap rows to a binary file as little-endian values, one row at a time."""
+    swap = sys.byteorder != "little"
+    if isinstance(heatmap, Heatmap) and heatmap.typecode == typecode and not swap:
+        # Flat buffer already in the target layout: one write, no copies
+        heatmap.tofile(f)
+        return
+    for row in heatmap:
+        values = array(typecode, row)
+        if swap:
+            values.byteswap()
+        values.tofile(f)
+
+
+def _read_values(f, typecode: str, count: int) -> array:
+    values = array(typecode)
+    values.fromfile(f, count)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _to_rows(values: array, rows: int, cols: int) -> List[List[int]]:
+    return [values[r * cols:(r + 1) * cols].tolist() for r in range(rows)]
+
+
+def export_npy(heatmap: List[List[int]], path: str, dtype: str = "int32") -> None:
+    """
+    Write the heatmap as a NumPy .npy file (format version 1.0).
+
+    Args:
+        heatmap: Heatmap as returned by generate_heatmap
+        path: Output file path
+        dtype: One of 'int8', 'int16', 'int32' or 'int64'
+    """
+    typecode, descr = EXPORT_DTYPES[dtype]
+    rows, cols = _heatmap_shape(heatmap)
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({rows}, {cols}), }}"
+    # Pad so that the data starts on a 64-byte boundary, as numpy does
+    padding = 64 - (len(NPY_MAGIC) + 4 + len(header) + 1) % 64
+    header = header + " " * (padding % 64) + "\n"
+
+    with open(path, "wb") as f:
+        f.write(NPY_MAGIC + b"\x01\x00")
+        f.write(len(header).to_bytes(2, "little"))
+        f.write(header.encode("latin1"))
+        _write_rows(f, heatmap, typecode)
+
+
+def load_npy(path: str) -> List[List[int]]:
+    """Read a 2-D integer .npy file written by export_npy (or numpy.save)."""
+    with open(path, "rb") as f:
+        descr, dims = read_npy_header(f, path)
+        typecode = _typecode_for_descr(descr)
+        values = _read_values(f, typecode, dims[0] * dims[1])
+    return _to_rows(values, dims[0], dims[1])
+
+
+def read_npy_header(f, path: str) -> Tuple[str, Tuple[int, int]]:
+    """
+    Read a .npy header, leaving f positioned at the start of the data.
+
+    Returns:
+        (dtype descriptor such as '<i4' or '|b1', (rows, cols))
+
+    Raises ValueError unless the file holds a C-ordered 2-D array.
+    """
+    if f.read(6) != NPY_MAGIC:
+        raise ValueError(f"{path} is not a .npy file")
+    major = f.read(2)[0]
+    header_len = int.from_bytes(f.read(2 if major == 1 else 4), "little")
+    header = f.read(header_len).decode("latin1")
+    descr = header.split("'descr':")[1].split("'")[1]
+    shape = header.split("'shape':")[1].split("(")[1].split(")")[0]
+    dims = [int(d) for d in shape.split(",") if d.strip()]
+    if len(dims) != 2 or "'fortran_order': False" not in header:
+        raise ValueError(f"{path} does not contain a C-ordered 2-D array")
+    return descr, (dims[0], dims[1])
+
+
+def _typecode_for_descr(descr: str) -> str:
+    for typecode, known in EXPORT_DTYPES.values():
+        if known == descr or (known[1:] == descr[1:] and descr[0] == "|"):
+            return typecode
+    raise ValueError(f"Unsupported dtype: {descr}")
+
+
+def export_raw(heatmap: List[List[int]], path: str, dtype: str = "int32") -> str:
+    """
+    Write the heatmap as raw little-endian binary plus a JSON sidecar describing it.
+
+    Returns:
+        Path of the sidecar file (path + '.json')
+    """
+    typecode, descr = EXPORT_DTYPES[dtype]
+    rows, cols = _heatmap_shape(heatmap)
+    with open(path, "wb") as f:
+        _write_rows(f, heatmap, typecode)
+
+    sidecar = path + ".json"
+    with open(sidecar, "w") as f:
+        json.dump({
+            "dtype": descr,
+            "shape": [rows, cols],
+            "order": "C",
+            "unreachable": -1,
+            "obstacle": -2,
+        }, f, indent=2)
+    return sidecar
+
+
+def load_raw(path: str, sidecar: Optional[str] = None) -> List[List[int]]:
+    """Read a raw heatmap written by export_raw using its JSON sidecar."""
+    with open(sidecar or path + ".json") as f:
+        meta = json.load(f)
+    rows, cols = meta["shape"]
+    with open(path, "rb") as f:
+        values = _read_values(f, _typecode_for_descr(meta["dtype"]), rows * cols)
+    return _to_rows(values, rows, cols)
+
+
+def export_csv(heatmap: List[List[int]], path: str) -> None:
+    """Stream the heatmap to a CSV file, one board row per line."""
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(heatmap)
+
+
+EXPORT_FORMATS = {
+    "npy": export_npy,
+    "raw": export_raw,
+    "csv": export_csv,
+}
+
+
+def infer_export_format(path: str) -> str:
+    """Guess the export format from a file extension ('.npy', '.csv', anything else is raw)."""
+    lowered = path.lower()
+    if lowered.endswith(".npy"):
+        return "npy"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return "raw"
+
+
+def export_heatmap(heatmap: List[List[int]], path: str, fmt: Optional[str] = None) -> None:
+    """Export a heatmap in the given format, inferring it from the path if omitted."""
+    fmt = fmt or infer_export_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    EXPORT_FORMATS[fmt](heatmap, path)
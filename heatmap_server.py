@@ -0,0 +1,307 @@
+"""
+Asyncio HTTP service for chess movement heatmaps.
+
+Endpoints (all GET, JSON responses):
+  /pieces                      List catalogue pieces (optional ?search=term)
+  /heatmap?piece=knight        Heatmap (size, position, obstacles as in the CLI)
+  /path?piece=knight&start=a1&target=h8
+                               Shortest path (size, obstacles as in the CLI)
+  /metrics                     Request counters and latency histograms
+
+BFS work runs in a worker pool. Identical requests that arrive while a
+computation is still running share its result instead of starting a new one.
+"""
+
+import asyncio
+import bisect
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from chess_heatmap_cli import parse_obstacles, parse_position, parse_size
+from heatmap import generate_heatmap
+from heatmap_with_obstacles import generate_heatmap_with_obstacles, visualize_path
+from piece_catalogue import ALL_PIECES, match_pieces, movement_key
+
+# Upper bounds (in milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """Error that is reported to the client with the given HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed millisecond buckets (counts are per bucket, not cumulative)."""
+
+    __slots__ = ("counts", "total", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> Dict:
+        buckets = {f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.total,
+            "mean_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets,
+        }
+
+
+def compute_heatmap_job(movements: List[Tuple[int, int]], rows: int, cols: int,
+                        start: Tuple[int, int],
+                        obstacles: Optional[List[Tuple[int, int]]]) -> List[List[int]]:
+    """Worker-side heatmap computation (module level so process pools can pickle it)."""
+    grid = [[0] * cols for _ in range(rows)]
+    if obstacles:
+        return generate_heatmap_with_obstacles(grid, movements, start, obstacles)
+    return generate_heatmap(grid, movements, start)
+
+
+def compute_path_job(movements: List[Tuple[int, int]], rows: int, cols: int,
+                     start: Tuple[int, int], target: Tuple[int, int],
+                     obstacles: Optional[List[Tuple[int, int]]]) -> Optional[List[Tuple[int, int]]]:
+    """Worker-side shortest path computation."""
+    grid = [[0] * cols for _ in range(rows)]
+    return visualize_path(grid, movements, start, target, obstacles)
+
+
+class HeatmapServer:
+    """
+    HTTP/1.1 server exposing piece listing, heatmap and path endpoints.
+
+    Args:
+        host: Interface to bind (default: localhost only)
+        port: TCP port; 0 picks a free port (see .port after start())
+        executor: Pool used for BFS work (default: a ProcessPoolExecutor)
+        max_workers: Worker count for the default process pool
+    """
+
+    ROUTES = ("/pieces", "/heatmap", "/path", "/metrics")
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 executor: Optional[Executor] = None, max_workers: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self._owns_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=max_workers)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.stats = {"requests": 0, "errors": 0, "computations": 0, "coalesced": 0}
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+    async def _coalesced(self, key: Tuple, func, *args):
+        """Run func(*args) in the worker pool, sharing the result with identical in-flight calls."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, func, *args)
+        self._inflight[key] = future
+        self.stats["computations"] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        started = time.perf_counter()
+        route = None
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            self.stats["requests"] += 1
+            route = "other"
+            request_line = head.split(b"\r\n", 1)[0].decode("latin1")
+            try:
+                method, target, _ = request_line.split(" ", 2)
+                url = urlsplit(target)
+                route = url.path
+                if method != "GET":
+                    raise HTTPError(405, f"Method {method} not allowed")
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                status, body = 200, await self._dispatch(route, params)
+            except HTTPError as e:
+                status, body = e.status, {"error": str(e)}
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            except Exception as e:  # Keep serving if a worker fails
+                status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+            if status != 200:
+                self.stats["errors"] += 1
+
+            payload = json.dumps(body).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin1") + payload
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+            if route is not None:
+                label = route if route in self.ROUTES else "other"
+                self.latency.setdefault(label, LatencyHistogram()).observe(time.perf_counter() - started)
+
+    async def _dispatch(self, route: str, params: Dict[str, str]) -> Dict:
+        if route == "/pieces":
+            return self._pieces(params)
+        if route == "/heatmap":
+            return await self._heatmap(params)
+        if route == "/path":
+            return await self._path(params)
+        if route == "/metrics":
+            return self.metrics()
+        raise HTTPError(404, f"Unknown endpoint: {route}")
+
+    def metrics(self) -> Dict:
+        return {
+            "stats": dict(self.stats, inflight=len(self._inflight)),
+            "latency": {route: hist.snapshot() for route, hist in sorted(self.latency.items())},
+        }
+
+    def _pieces(self, params: Dict[str, str]) -> Dict:
+        term = params.get("search", "").lower()
+        names = sorted(name for name in ALL_PIECES if term in name.lower())
+        return {"pieces": names, "count": len(names)}
+
+    def _board(self, params: Dict[str, str]):
+        if "piece" not in params:
+            raise HTTPError(400, "Missing required parameter: piece")
+        matches = match_pieces(params["piece"])
+        if not matches:
+            raise HTTPError(404, f"Unknown piece: '{params['piece']}'")
+        if len(matches) > 1:
+            raise HTTPError(400, f"Multiple pieces match '{params['piece']}': {', '.join(matches)}")
+        rows, cols = parse_size(params.get("size", "8"))
+        if rows <= 0 or cols <= 0:
+            raise ValueError(f"Invalid board size: {rows}x{cols}")
+        obstacles = parse_obstacles(params["obstacles"]) if params.get("obstacles") else None
+        if obstacles:
+            obstacles = sorted(set(obstacles))
+        return matches[0], rows, cols, obstacles
+
+    @staticmethod
+    def _square(params: Dict[str, str], name: str, rows: int, cols: int,
+                default: Optional[Tuple[int, int]] = None) -> Tuple[int, int]:
+        if name not in params:
+            if default is None:
+                raise HTTPError(400, f"Missing required parameter: {name}")
+            return default
+        square = parse_position(params[name])
+        if not (0 <= square[0] < rows and 0 <= square[1] < cols):
+            raise ValueError(f"Position {square} is outside the {rows}x{cols} board")
+        return square
+
+    async def _heatmap(self, params: Dict[str, str]) -> Dict:
+        piece_name, rows, cols, obstacles = self._board(params)
+        start = self._square(params, "position", rows, cols, (rows // 2, cols // 2))
+        if obstacles and start in obstacles:
+            raise ValueError(f"Cannot place obstacle at starting position {start}")
+
+        # Keyed by movement set, so equivalent pieces (e.g. knight and xiangqi_horse) coalesce too
+        key = ("heatmap", movement_key(ALL_PIECES[piece_name], rows, cols), rows, cols, start,
+               tuple(obstacles or ()))
+        heatmap = await self._coalesced(key, compute_heatmap_job, ALL_PIECES[piece_name],
+                                        rows, cols, start, obstacles)
+        return {
+            "piece": piece_name,
+            "size": [rows, cols],
+            "start": list(start),
+            "obstacles": [list(o) for o in obstacles or ()],
+            "heatmap": heatmap,
+            "reachable": sum(1 for row in heatmap for cell in row if cell >= 0),
+        }
+
+    async def _path(self, params: Dict[str, str]) -> Dict:
+        piece_name, rows, cols, obstacles = self._board(params)
+        start = self._square(params, "start", rows, cols)
+        target = self._square(params, "target", rows, cols)
+
+        key = ("path", movement_key(ALL_PIECES[piece_name], rows, cols), rows, cols, start, target,
+               tuple(obstacles or ()))
+        path = await self._coalesced(key, compute_path_job, ALL_PIECES[piece_name],
+                                     rows, cols, start, target, obstacles)
+        return {
+            "piece": piece_name,
+            "size": [rows, cols],
+            "start": list(start),
+            "target": list(target),
+            "path": [list(square) for square in path] if path else None,
+            "moves": len(path) - 1 if path else None,
+        }
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parse 'host:port', ':port' or 'port' into a (host, port) tuple."""
+    host, _, port = address.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise ValueError(f"Invalid server address: {address}")
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, max_workers: Optional[int] = None) -> None:
+    """Run the heatmap service until interrupted."""
+    async def run():
+        server = HeatmapServer(host, port, max_workers=max_workers)
+        await server.start()
+        print(f"Serving chess heatmaps on http://{server.host}:{server.port}/ (Ctrl+C to stop)")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,11 +1,15 @@
 from collections import deque
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
+from board_mask import BoardMask, generate_heatmap_masked
+from engine_dispatch import dispatch_heatmap
+from hopper_pieces import HopperMovement, generate_hopper_heatmap
 
 def generate_heatmap_with_obstacles(
     grid: List[List[int]], 
-    piece_movements: List[Tuple[int, int]], 
+    piece_movements: Union[List[Tuple[int, int]], HopperMovement], 
     start_coord: Tuple[int, int],
-    obstacles: Optional[List[Tuple[int, int]]] = None
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    mask: Optional[BoardMask] = None
 ) -> List[List[int]]:
     """
     Generate a heatmap showing the minimum number of moves required to reach each cell
@@ -13,40 +17,71 @@ def generate_heatmap_with_obstacles(
     
     Args:
         grid: NxM grid (list of lists)
-        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves,
+                         or a HopperMovement for pieces that need screens (obstacles
+                         then also act as screens; see hopper_pieces.py)
         start_coord: Starting position as (row, col) tuple
         obstacles: Optional list of (row, col) tuples representing blocked cells
+        mask: Optional board geometry; when given, the board size comes from the
+              mask, its holes are treated like obstacles and the BFS runs on the
+              bit-packed mask directly
+    
+    Without a mask or screen rules, the engine is picked by engine_dispatch.
         
     Returns:
         Heatmap where each cell contains the minimum moves to reach it 
         (-1 if unreachable, -2 if obstacle)
     """
-    rows, cols = len(grid), len(grid[0])
-    heatmap = [[-1 for _ in range(cols)] for _ in range(rows)]
-    
-    # Mark obstacles
-    if obstacles:
-        for obs_row, obs_col in obstacles:
-            if 0 <= obs_row < rows and 0 <= obs_col < cols:
-                heatmap[obs_row][obs_col] = -2
-    
-    # Check if start position is valid
-    if heatmap[start_coord[0]][start_coord[1]] == -2:
-        raise ValueError("Starting position is on an obstacle!")
-    
-    queue = deque([(start_coord[0], start_coord[1], 0)])
-    heatmap[start_coord[0]][start_coord[1]] = 0
+    if isinstance(piece_movements, HopperMovement):
+        if mask is not None:
+            return generate_hopper_heatmap(mask.rows, mask.cols, piece_movements, start_coord,
+                                           (obstacles or []) + mask.holes())
+        return generate_hopper_heatmap(len(grid), len(grid[0]), piece_movements, start_coord, obstacles)
+    if mask is not None:
+        return generate_heatmap_masked(mask, piece_movements, start_coord, obstacles)
+    
+    return dispatch_heatmap(len(grid), len(grid[0]), piece_movements, start_coord, obstacles)
+
+
+def reverse_movements(piece_movements: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Negate every offset: the moves that lead *into* a square instead of out of it."""
+    return [(-dx, -dy) for dx, dy in piece_movements]
+
+
+def generate_reverse_heatmap(
+    grid: List[List[int]],
+    piece_movements: List[Tuple[int, int]],
+    target_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    mask: Optional[BoardMask] = None
+) -> List[List[int]]:
+    """
+    Generate a distance-to-target heatmap: the minimum number of moves needed
+    to reach target_coord from each cell.
     
-    while queue:
-        x, y, dist = queue.popleft()
-        for dx, dy in piece_movements:
-            nx, ny = x + dx, y + dy
-            if (0 <= nx < rows and 0 <= ny < cols and 
-                heatmap[nx][ny] == -1):  # Not visited and not obstacle
-                heatmap[nx][ny] = dist + 1
-                queue.append((nx, ny, dist + 1))
+    For asymmetric pieces (lances, shogi knights, soldiers, ...) this differs
+    from the forward heatmap. A single BFS from the target over the negated
+    offsets gives the same result as one forward search per start square,
+    since obstacles only block the square a move lands on.
     
-    return heatmap
+    Args:
+        grid: NxM grid (list of lists)
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        target_coord: Target position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+        mask: Optional board geometry, as for generate_heatmap_with_obstacles
+        
+    Returns:
+        Heatmap where each cell contains the minimum moves from it to the target
+        (-1 if the target cannot be reached from it, -2 if obstacle)
+    """
+    if isinstance(piece_movements, HopperMovement):
+        raise ValueError("Reverse heatmaps need an offset list; screen moves are not reversible")
+    if (obstacles and tuple(target_coord) in set(map(tuple, obstacles))) or \
+            (mask is not None and not mask.is_open(*target_coord)):
+        raise ValueError("Target position is on an obstacle!")
+    return generate_heatmap_with_obstacles(grid, reverse_movements(piece_movements),
+                                           target_coord, obstacles, mask)
 
 
 def print_heatmap_with_obstacles(heatmap: List[List[int]], width: int = 3) -> None:
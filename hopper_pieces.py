@@ -0,0 +1,185 @@
+"""
+Hoppers and cannons: pieces whose moves depend on screens (blocking squares).
+
+Offset lists cannot express these pieces, because a move depends on what lies
+between the start and the landing square:
+
+  grasshopper  moves along a queen line and lands on the square directly
+               behind the first blocker it meets; without a screen it cannot move
+  cannon       (xiangqi) slides like a rook up to the first blocker; it captures
+               by jumping exactly one screen onto the next blocker behind it
+
+Obstacles play the role of pieces the mover may not capture, so heatmaps never
+land on them; capture_squares() lists the blockers a cannon could take.
+
+For each obstacle set, screen tables hold the first and second blocker along
+every ray from every square. They are built with one sweep per direction, so the
+BFS looks up screens instead of walking rays square by square.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOK_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+HOPPER_KINDS = ("grasshopper", "cannon")
+
+
+class HopperMovement:
+    """Movement spec for a screen-dependent piece: its kind and ray directions."""
+
+    __slots__ = ("kind", "directions")
+
+    def __init__(self, kind: str, directions: Sequence[Tuple[int, int]]):
+        if kind not in HOPPER_KINDS:
+            raise ValueError(f"Unknown hopper kind: {kind}")
+        self.kind = kind
+        self.directions = tuple(tuple(direction) for direction in directions)
+
+    def __repr__(self) -> str:
+        return f"HopperMovement({self.kind!r}, {self.directions})"
+
+
+# Catalogue pieces whose offset lists only approximate their real movement
+HOPPER_PIECES: Dict[str, HopperMovement] = {
+    "grasshopper": HopperMovement("grasshopper", QUEEN_DIRECTIONS),
+    "xiangqi_cannon": HopperMovement("cannon", ROOK_DIRECTIONS),
+}
+
+
+class ScreenTables:
+    """
+    First and second blocker along each ray, for one board and obstacle set.
+
+    first[d][s] is the flat index of the nearest blocked square strictly beyond
+    square s in direction d (-1 if none); second[d][s] is the next one after it.
+    steps[d][s] is the number of squares from s to the board edge in direction d.
+    """
+
+    __slots__ = ("rows", "cols", "directions", "blocked", "first", "second", "steps")
+
+    def __init__(self, rows: int, cols: int, directions: Sequence[Tuple[int, int]], blocked: bytearray):
+        self.rows = rows
+        self.cols = cols
+        self.directions = tuple(directions)
+        self.blocked = blocked
+        self.first = []
+        self.second = []
+        self.steps = []
+        for dr, dc in self.directions:
+            first = [-1] * (rows * cols)
+            steps = [0] * (rows * cols)
+            delta = dr * cols + dc
+            # Visit the square one step along the ray before the square itself
+            row_order = range(rows - 1, -1, -1) if dr > 0 else range(rows)
+            col_order = range(cols - 1, -1, -1) if dc > 0 else range(cols)
+            for row in row_order:
+                for col in col_order:
+                    next_row, next_col = row + dr, col + dc
+                    if 0 <= next_row < rows and 0 <= next_col < cols:
+                        square = row * cols + col
+                        ahead = square + delta
+                        first[square] = ahead if blocked[ahead] else first[ahead]
+                        steps[square] = steps[ahead] + 1
+            self.first.append(first)
+            self.second.append([first[b] if b != -1 else -1 for b in first])
+            self.steps.append(steps)
+
+    @classmethod
+    def build(cls, rows: int, cols: int, directions: Sequence[Tuple[int, int]],
+              obstacles: Optional[Sequence[Tuple[int, int]]] = None) -> "ScreenTables":
+        blocked = bytearray(rows * cols)
+        for obs_row, obs_col in obstacles or ():
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                blocked[obs_row * cols + obs_col] = 1
+        return cls(rows, cols, directions, blocked)
+
+    def moves(self, kind: str, square: int) -> List[int]:
+        """Landing squares of a non-capturing move from square."""
+        cols = self.cols
+        targets = []
+        for d, (dr, dc) in enumerate(self.directions):
+            delta = dr * cols + dc
+            screen = self.first[d][square]
+            if kind == "grasshopper":
+                if screen != -1 and self.steps[d][screen]:
+                    landing = screen + delta
+                    if not self.blocked[landing]:
+                        targets.append(landing)
+            else:
+                # Quiet cannon move: every square before the first blocker
+                reach = self.steps[d][square] if screen == -1 else self.steps[d][square] - self.steps[d][screen] - 1
+                targets.extend(range(square + delta, square + delta * (reach + 1), delta))
+        return targets
+
+    def captures(self, kind: str, square: int) -> List[int]:
+        """Blocked squares a move from square could capture."""
+        if kind != "cannon":
+            return []  # A grasshopper never lands on a blocker
+        return [second[square] for second in self.second if second[square] != -1]
+
+
+def generate_hopper_heatmap(
+    rows: int,
+    cols: int,
+    movement: HopperMovement,
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None
+) -> List[List[int]]:
+    """
+    Generate a heatmap for a screen-dependent piece.
+
+    Args:
+        rows, cols: Board size
+        movement: HopperMovement describing the piece
+        start_coord: Starting position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples; they act as screens and
+                   can never be landed on
+
+    Returns:
+        Heatmap where each cell contains the minimum moves to reach it
+        (-1 if unreachable, -2 if obstacle)
+    """
+    tables = ScreenTables.build(rows, cols, movement.directions, obstacles)
+    start = start_coord[0] * cols + start_coord[1]
+    if tables.blocked[start]:
+        raise ValueError("Starting position is on an obstacle!")
+    dist = [-2 if flag else -1 for flag in tables.blocked]
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        square = queue.popleft()
+        for target in tables.moves(movement.kind, square):
+            if dist[target] == -1:
+                dist[target] = dist[square] + 1
+                queue.append(target)
+    return [dist[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+def capture_squares(
+    rows: int,
+    cols: int,
+    movement: HopperMovement,
+    square: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None
+) -> List[Tuple[int, int]]:
+    """Blocked squares the piece on square could capture in one move."""
+    tables = ScreenTables.build(rows, cols, movement.directions, obstacles)
+    return sorted(divmod(target, cols) for target in
+                  tables.captures(movement.kind, square[0] * cols + square[1]))
+
+
+# Example usage
+if __name__ == "__main__":
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+
+    screens = [(2, 2), (2, 5), (5, 2), (4, 4)]
+    print("Grasshopper from (0, 2), screens marked 'X':")
+    print_heatmap_with_obstacles(generate_hopper_heatmap(8, 8, HOPPER_PIECES["grasshopper"], (0, 2), screens))
+
+    cannon = HOPPER_PIECES["xiangqi_cannon"]
+    print("\nXiangqi cannon from (2, 0):")
+    print_heatmap_with_obstacles(generate_hopper_heatmap(10, 9, cannon, (2, 0), screens))
+    print(f"Captures from (2, 0): {capture_squares(10, 9, cannon, (2, 0), screens)}")
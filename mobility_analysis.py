@@ -0,0 +1,162 @@
+"""
+Mobility metrics for catalogue pieces.
+
+For a piece on a rows x cols board, a BFS is run from every start square with
+the bitboard engine. Each BFS layer is a bitboard, so per-start statistics are
+aggregated from layer population counts instead of walking heatmap cells.
+"""
+
+import csv
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from bitboard import iter_bitboard_layers
+from piece_catalogue import canonical_movements, movement_key
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+# Columns of the mobility table, in display order
+MOBILITY_COLUMNS = ["piece", "board", "offsets", "mean_moves", "max_moves",
+                    "diameter", "mean_eccentricity", "reachable_fraction"]
+
+
+def piece_mobility(rows: int, cols: int, piece_movements: Sequence[Tuple[int, int]]) -> Dict:
+    """
+    Compute mobility metrics of one movement set on an empty rows x cols board.
+
+    Returns:
+        Dict with
+          mean_moves: mean moves-to-reach over all reachable (start, target) pairs, start != target
+          max_moves: largest finite moves-to-reach over all pairs
+          diameter: max_moves if every square reaches every other square, else None
+          reachable_fraction: share of (start, target) pairs, start != target, that are reachable
+          mean_eccentricity: mean of the per-square eccentricities
+          eccentricity: rows x cols grid, largest finite distance from each start square
+    """
+    squares = rows * cols
+    total_moves = 0
+    reachable_pairs = 0
+    eccentricity = []
+    for row in range(rows):
+        for col in range(cols):
+            depth = 0
+            for depth, layer in enumerate(iter_bitboard_layers(rows, cols, piece_movements, (row, col))):
+                if depth:
+                    count = _popcount(layer)
+                    reachable_pairs += count
+                    total_moves += depth * count
+            eccentricity.append(depth)
+
+    pairs = squares * (squares - 1)
+    max_moves = max(eccentricity)
+    return {
+        "mean_moves": total_moves / reachable_pairs if reachable_pairs else 0.0,
+        "max_moves": max_moves,
+        "diameter": max_moves if reachable_pairs == pairs else None,
+        "reachable_fraction": reachable_pairs / pairs if pairs else 1.0,
+        "mean_eccentricity": sum(eccentricity) / squares,
+        "eccentricity": [eccentricity[r * cols:(r + 1) * cols] for r in range(rows)],
+    }
+
+
+def mobility_report(
+    pieces: Dict[str, List[Tuple[int, int]]],
+    board_sizes: Iterable[Tuple[int, int]],
+    sort_by: str = "piece",
+    descending: bool = False
+) -> List[Dict]:
+    """
+    Mobility table rows for every piece on every board size.
+
+    Args:
+        pieces: Mapping of piece name to movement list (e.g. ALL_PIECES)
+        board_sizes: (rows, cols) tuples
+        sort_by: Column to sort by (see MOBILITY_COLUMNS)
+        descending: Sort in descending order
+
+    Returns:
+        One dict per (piece, board) with the MOBILITY_COLUMNS keys
+
+    Pieces with the same movement set on a board are computed once.
+    """
+    if sort_by not in MOBILITY_COLUMNS:
+        raise ValueError(f"Unknown sort column: {sort_by}")
+    report = []
+    for rows, cols in board_sizes:
+        computed: Dict[str, Dict] = {}
+        for name, movements in pieces.items():
+            key = movement_key(movements, rows, cols)
+            if key not in computed:
+                computed[key] = piece_mobility(rows, cols, canonical_movements(movements, rows, cols))
+            metrics = computed[key]
+            report.append({
+                "piece": name,
+                "board": f"{rows}x{cols}",
+                "offsets": len(canonical_movements(movements)),
+                "mean_moves": round(metrics["mean_moves"], 3),
+                "max_moves": metrics["max_moves"],
+                "diameter": metrics["diameter"],
+                "mean_eccentricity": round(metrics["mean_eccentricity"], 3),
+                "reachable_fraction": round(metrics["reachable_fraction"], 4),
+            })
+
+    def sort_key(entry):
+        value = entry[sort_by]
+        # Missing diameters (disconnected boards) sort as infinitely large
+        return (value is None, value if value is not None else 0, entry["piece"], entry["board"])
+
+    report.sort(key=sort_key, reverse=descending)
+    return report
+
+
+def print_mobility_table(report: List[Dict]) -> None:
+    """Print the mobility report as an aligned table."""
+    name_width = max([len("piece")] + [len(entry["piece"]) for entry in report])
+    header = f"{'piece':<{name_width}}  {'board':>7}  {'offsets':>7}  {'mean':>7}  {'max':>4}  " \
+             f"{'diam':>4}  {'ecc':>7}  {'reach':>7}"
+    print(header)
+    print("-" * len(header))
+    for entry in report:
+        diameter = "inf" if entry["diameter"] is None else entry["diameter"]
+        print(f"{entry['piece']:<{name_width}}  {entry['board']:>7}  {entry['offsets']:>7}  "
+              f"{entry['mean_moves']:>7.3f}  {entry['max_moves']:>4}  {diameter:>4}  "
+              f"{entry['mean_eccentricity']:>7.3f}  {entry['reachable_fraction'] * 100:>6.1f}%")
+
+
+def write_mobility_csv(report: List[Dict], path: str) -> None:
+    """Write the mobility report as CSV (empty diameter means disconnected)."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MOBILITY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(report)
+
+
+def parse_board_sizes(sizes: str) -> List[Tuple[int, int]]:
+    """Parse a comma-separated size list like '8,9,12x12'."""
+    result = []
+    for size in sizes.split(","):
+        size = size.strip().lower()
+        if not size:
+            continue
+        try:
+            rows, cols = map(int, size.split("x")) if "x" in size else (int(size), int(size))
+        except ValueError:
+            raise ValueError(f"Invalid size format: {size}")
+        if rows <= 0 or cols <= 0:
+            raise ValueError(f"Invalid size format: {size}")
+        result.append((rows, cols))
+    return result
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from piece_catalogue import ALL_PIECES
+
+    started = time.perf_counter()
+    report = mobility_report(ALL_PIECES, [(8, 8), (9, 9), (12, 12)], sort_by="mean_moves")
+    elapsed = time.perf_counter() - started
+    print_mobility_table(report[:20])
+    print(f"\n{len(report)} piece/board combinations in {elapsed:.1f}s")
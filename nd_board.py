@@ -0,0 +1,133 @@
+"""
+Heatmaps on N-dimensional boards (Raumschach-style 3-D chess and beyond).
+
+Squares, offsets and starts are N-tuples. The board is one flat row-major
+array: square (x0, ..., xn) sits at index x0 * strides[0] + ... + xn, and the
+BFS runs on bitboards of that layout (see bitboard.iter_nd_layers), so each
+layer costs one shift-and-mask per offset however many squares it holds.
+"""
+
+from array import array
+from math import prod
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from bitboard import board_strides, iter_bits, iter_nd_layers
+from heatmap_array import HEATMAP_TYPECODE
+
+
+def parse_shape(text: str) -> Tuple[int, ...]:
+    """Parse a board size like '5x5x5' into a shape tuple."""
+    try:
+        shape = tuple(int(part) for part in text.strip().lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid size format: {text}")
+    if any(n <= 0 for n in shape):
+        raise ValueError(f"Invalid size format: {text}")
+    return shape
+
+
+def parse_coord(text: str, dims: int) -> Tuple[int, ...]:
+    """Parse a position like '2,2,2' into an N-tuple with `dims` coordinates."""
+    try:
+        coord = tuple(int(part) for part in text.split(","))
+    except ValueError:
+        raise ValueError(f"Invalid position format: {text}")
+    if len(coord) != dims:
+        raise ValueError(f"Position {text} needs {dims} coordinates")
+    return coord
+
+
+def flat_index(shape: Sequence[int], coord: Sequence[int]) -> int:
+    """Row-major flat index of coord, checking that it lies on the board."""
+    if len(coord) != len(shape) or not all(0 <= x < n for x, n in zip(coord, shape)):
+        raise ValueError(f"Position {tuple(coord)} is outside the {'x'.join(map(str, shape))} board")
+    return sum(x * stride for x, stride in zip(coord, board_strides(shape)))
+
+
+def unflatten(shape: Sequence[int], index: int) -> Tuple[int, ...]:
+    """Coordinates of flat index on a board of the given shape."""
+    coord = []
+    for stride in board_strides(shape):
+        x, index = divmod(index, stride)
+        coord.append(x)
+    return tuple(coord)
+
+
+def nd_heatmap(
+    shape: Sequence[int],
+    piece_movements: Sequence[Sequence[int]],
+    start_coord: Sequence[int],
+    obstacles: Optional[Sequence[Sequence[int]]] = None,
+    max_moves: Optional[int] = None
+) -> array:
+    """
+    Generate a heatmap on an N-dimensional board.
+
+    Args:
+        shape: Board size along each axis, e.g. (5, 5, 5)
+        piece_movements: Offsets as N-tuples
+        start_coord: Starting position as an N-tuple
+        obstacles: Optional blocked squares as N-tuples
+        max_moves: Only explore squares reachable within this many moves
+
+    Returns:
+        Flat row-major array('i') of minimum moves to each square
+        (-1 if unreachable, -2 if obstacle)
+    """
+    shape = tuple(shape)
+    size = prod(shape)
+    heatmap = array(HEATMAP_TYPECODE, [-1]) * size
+    open_bits = None
+    if obstacles:
+        blocked = 0
+        for obstacle in obstacles:
+            if len(obstacle) == len(shape) and all(0 <= x < n for x, n in zip(obstacle, shape)):
+                blocked |= 1 << flat_index(shape, obstacle)
+        for index in iter_bits(blocked):
+            heatmap[index] = -2
+        open_bits = ((1 << size) - 1) & ~blocked
+    if heatmap[flat_index(shape, start_coord)] == -2:
+        raise ValueError("Starting position is on an obstacle!")
+    for distance, layer in enumerate(iter_nd_layers(shape, piece_movements, start_coord, open_bits, max_moves)):
+        for index in iter_bits(layer):
+            heatmap[index] = distance
+    return heatmap
+
+
+def iter_slices(heatmap: Sequence[int], shape: Sequence[int]) -> Iterator[Tuple[Tuple[int, ...], List[List[int]]]]:
+    """Yield (leading coordinates, 2-D heatmap) for every 2-D slice of the last two axes."""
+    shape = tuple(shape)
+    rows, cols = shape[-2:]
+    plane = rows * cols
+    for start in range(0, prod(shape), plane):
+        cells = list(heatmap[start:start + plane])
+        yield unflatten(shape, start)[:-2], [cells[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+def print_nd_heatmap(heatmap: Sequence[int], shape: Sequence[int], width: int = 3):
+    """Print an N-D heatmap as one 2-D slice per combination of the leading axes."""
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+
+    if len(shape) < 2:
+        shape = (1,) + tuple(shape)
+    for leading, grid in iter_slices(heatmap, shape):
+        if leading:
+            print(f"Slice {', '.join(str(x) for x in leading)}:")
+        print_heatmap_with_obstacles(grid, width)
+        print()
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from exotic_pieces import get_nd_piece_movements
+
+    pieces = get_nd_piece_movements(3)
+    print("Raumschach knight on 5x5x5 from (2, 2, 2):\n")
+    print_nd_heatmap(nd_heatmap((5, 5, 5), pieces["knight"], (2, 2, 2)), (5, 5, 5))
+
+    pieces4 = get_nd_piece_movements(4)
+    started = time.perf_counter()
+    heatmap = nd_heatmap((16, 16, 16, 16), pieces4["knight"], (0, 0, 0, 0))
+    print(f"4-D knight on 16^4 ({len(heatmap)} squares): max distance {max(heatmap)} "
+          f"in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,214 @@
+"""
+Load large obstacle maps straight into a BoardMask.
+
+Supported inputs, where a set pixel or non-zero element is a blocked square:
+  .pbm   PBM bitmap, binary (P4) or ASCII (P1); black (1) is blocked
+  .pgm   PGM greymap, binary (P5) or ASCII (P2); pixels darker than half of
+         maxval are blocked
+  .npy   2-D C-ordered bool or integer array; non-zero is blocked
+  other  packed bit file: bit row * cols + col, least significant bit first
+         (BoardMask.to_bytes layout), set = blocked; the board size comes from a
+         JSON sidecar path + '.json' holding {"shape": [rows, cols]}
+
+Binary payloads are memory-mapped and converted with bytes.translate and
+int.from_bytes, so no per-obstacle tuples are ever built.
+"""
+
+import json
+import mmap
+import os
+import re
+from typing import List, Optional, Tuple
+
+from bitboard import bits_from_flags, full_board
+from board_mask import BoardMask
+from heatmap_export import read_npy_header
+
+# Byte with its bit order reversed (PBM packs the first pixel in the high bit)
+_REVERSE_BITS = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+OBSTACLE_FORMATS = ("pbm", "pgm", "npy", "bits")
+
+_PNM_HEADER_FIELDS = {b"P1": 2, b"P4": 2, b"P2": 3, b"P5": 3}
+_PNM_FIELD = re.compile(rb"(?:\s|#[^\n]*\n?)*(\d+)")
+
+
+def infer_obstacle_format(path: str) -> str:
+    """Obstacle file format from the file extension (packed bits if unknown)."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in ("pbm", "pgm", "npy") else "bits"
+
+
+def _join_rows(row_bits: List[int], cols: int) -> int:
+    """Concatenate per-row bitboards, row 0 lowest, by pairwise merging."""
+    if not row_bits:
+        return 0
+    width = cols
+    while len(row_bits) > 1:
+        merged = [row_bits[i] | (row_bits[i + 1] << width) for i in range(0, len(row_bits) - 1, 2)]
+        if len(row_bits) % 2:
+            merged.append(row_bits[-1])
+        row_bits = merged
+        width *= 2
+    return row_bits[0]
+
+
+def _read_pnm_header(data, path: str) -> Tuple[bytes, List[int], int]:
+    """Parse a PBM/PGM header: (magic, [width, height(, maxval)], data offset)."""
+    magic = bytes(data[:2])
+    if magic not in _PNM_HEADER_FIELDS:
+        raise ValueError(f"{path} is not a PBM or PGM file")
+    values = []
+    position = 2
+    while len(values) < _PNM_HEADER_FIELDS[magic]:
+        match = _PNM_FIELD.match(data, position)
+        if not match:
+            raise ValueError(f"Malformed header in {path}")
+        values.append(int(match.group(1)))
+        position = match.end()
+    # Exactly one whitespace byte separates the header from the pixels
+    return magic, values, position + 1
+
+
+def _blocked_from_pbm(data, path: str) -> Tuple[int, int, int]:
+    magic, (cols, rows), offset = _read_pnm_header(data, path)
+    if magic == b"P1":
+        digits = re.sub(rb"\s+|#[^\n]*", b"", bytes(data[offset - 1:]))
+        if len(digits) < rows * cols:
+            raise ValueError(f"{path} holds fewer than {rows * cols} pixels")
+        return rows, cols, bits_from_flags(digits[:rows * cols].translate(bytes.maketrans(b"01", b"\x00\x01")))
+    row_bytes = (cols + 7) // 8
+    if len(data) - offset < rows * row_bytes:
+        raise ValueError(f"{path} holds fewer than {rows} rows of pixels")
+    pixels = bytes(data[offset:offset + rows * row_bytes]).translate(_REVERSE_BITS)
+    if cols % 8 == 0:
+        return rows, cols, int.from_bytes(pixels, "little")
+    row_mask = (1 << cols) - 1
+    return rows, cols, _join_rows([int.from_bytes(pixels[r * row_bytes:(r + 1) * row_bytes], "little") & row_mask
+                                   for r in range(rows)], cols)
+
+
+def _blocked_from_pgm(data, path: str) -> Tuple[int, int, int]:
+    magic, (cols, rows, maxval), offset = _read_pnm_header(data, path)
+    threshold = (maxval + 1) // 2
+    size = rows * cols
+    if magic == b"P2":
+        values = [int(v) for v in re.sub(rb"#[^\n]*", b"", bytes(data[offset - 1:])).split()[:size]]
+        flags = bytes(value < threshold for value in values)
+    elif maxval < 256:
+        flags = bytes(data[offset:offset + size]).translate(bytes(value < threshold for value in range(256)))
+    else:
+        high = bytes(data[offset:offset + 2 * size:2])  # big-endian samples: high byte first
+        low = bytes(data[offset + 1:offset + 2 * size:2])
+        flags = bytes(h * 256 + l < threshold for h, l in zip(high, low))
+    if len(flags) < size:
+        raise ValueError(f"{path} holds fewer than {size} pixels")
+    return rows, cols, bits_from_flags(flags)
+
+
+def _blocked_from_npy(f, data, path: str) -> Tuple[int, int, int]:
+    descr, (rows, cols) = read_npy_header(f, path)
+    kind, itemsize = descr[1], int(descr[2:])
+    if kind not in "biu":
+        raise ValueError(f"{path} must hold a bool or integer array, not {descr}")
+    offset = f.tell()
+    size = rows * cols
+    payload = data[offset:offset + size * itemsize]
+    if len(payload) < size * itemsize:
+        raise ValueError(f"{path} is truncated")
+    # An element is non-zero when any of its bytes is: OR the per-byte bitboards
+    blocked = 0
+    for byte in range(itemsize):
+        blocked |= bits_from_flags(bytes(payload[byte::itemsize]))
+    return rows, cols, blocked
+
+
+def _blocked_from_bits(data, path: str, rows: Optional[int], cols: Optional[int]) -> Tuple[int, int, int]:
+    if rows is None or cols is None:
+        try:
+            with open(path + ".json") as f:
+                rows, cols = json.load(f)["shape"]
+        except (OSError, KeyError, ValueError):
+            raise ValueError(f"Board size of {path} unknown: give rows and cols or a {path}.json sidecar")
+    nbytes = (rows * cols + 7) // 8
+    if len(data) < nbytes:
+        raise ValueError(f"{path} holds fewer than {rows * cols} bits")
+    return rows, cols, int.from_bytes(data[:nbytes], "little") & full_board(rows, cols)
+
+
+def load_obstacle_mask(
+    path: str,
+    fmt: Optional[str] = None,
+    rows: Optional[int] = None,
+    cols: Optional[int] = None
+) -> BoardMask:
+    """
+    Load an obstacle map as a BoardMask of the open squares.
+
+    Args:
+        path: Obstacle file (see the module docstring for formats)
+        fmt: 'pbm', 'pgm', 'npy' or 'bits' (default: from the extension)
+        rows, cols: Board size of a packed bit file without a sidecar
+
+    Returns:
+        BoardMask whose playable squares are the unblocked ones
+    """
+    fmt = fmt or infer_obstacle_format(path)
+    if fmt not in OBSTACLE_FORMATS:
+        raise ValueError(f"Unknown obstacle format: {fmt}")
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if fmt == "pbm":
+                rows, cols, blocked = _blocked_from_pbm(data, path)
+            elif fmt == "pgm":
+                rows, cols, blocked = _blocked_from_pgm(data, path)
+            elif fmt == "npy":
+                rows, cols, blocked = _blocked_from_npy(f, data, path)
+            else:
+                rows, cols, blocked = _blocked_from_bits(data, path, rows, cols)
+    return BoardMask(rows, cols, full_board(rows, cols) & ~blocked)
+
+
+def save_obstacle_bits(mask: BoardMask, path: str) -> str:
+    """
+    Write the blocked squares of mask as a packed bit file plus JSON sidecar.
+
+    Returns:
+        Path of the sidecar file (path + '.json')
+    """
+    blocked = BoardMask(mask.rows, mask.cols, full_board(mask.rows, mask.cols) & ~mask.bits)
+    with open(path, "wb") as f:
+        f.write(blocked.to_bytes())
+    sidecar = path + ".json"
+    with open(sidecar, "w") as f:
+        json.dump({"shape": [mask.rows, mask.cols], "bit_order": "little", "set": "blocked"}, f, indent=2)
+    return sidecar
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+    from board_mask import generate_heatmap_masked
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A 12x10 PBM with a wall across the middle, written by hand
+        rows = ["0000000000"] * 5 + ["1111111100"] + ["0000000000"] * 6
+        path = os.path.join(tmp, "wall.pbm")
+        with open(path, "w") as f:
+            f.write("P1\n# wall\n10 12\n" + "\n".join(rows) + "\n")
+        mask = load_obstacle_mask(path)
+        print(f"{mask} from {os.path.basename(path)}; king from (0, 0):")
+        king = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        print_heatmap_with_obstacles(generate_heatmap_masked(mask, king, (0, 0)))
+
+        # A 4000x4000 packed bit file with every other square blocked
+        big = BoardMask(4000, 4000, full_board(4000, 4000) // 3)
+        bits_path = os.path.join(tmp, "big.bits")
+        save_obstacle_bits(big, bits_path)
+        started = time.perf_counter()
+        loaded = load_obstacle_mask(bits_path)
+        print(f"\nLoaded {loaded} in {time.perf_counter() - started:.3f}s")
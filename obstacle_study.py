@@ -0,0 +1,286 @@
+"""
+Monte Carlo study of piece mobility under random obstacle fields.
+
+Each trial drops obstacles uniformly at random on a fraction (the density) of
+the free squares and measures a BFS from the start square. Trials are grouped
+into batches, and each batch runs one bitboard BFS for all of its trials. The
+trial boards are stacked as lanes of a (trials, rows, cols) board, and moves
+only change the row and column, so every shift-and-mask step advances all
+trials at once. Per-trial layer sizes are popcounts of byte-aligned lanes.
+Batches run in a process pool; every batch returns running
+summaries rather than per-trial results, and only a small window of batches is
+in flight at a time, so memory use does not grow with the number of trials.
+
+Every trial draws from its own generator seeded by (seed, density, trial
+number), so the same trials run for any worker count or batch size. Batch
+summaries are merged in batch order, so at a fixed batch size the numbers are
+identical for any worker count; across batch sizes they are equal up to
+floating-point rounding, since the merge points move.
+"""
+
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bitboard import bits_from_flags, check_start, expand, full_board, iter_bits, nd_shift_table
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(bits: int) -> int:
+        return bin(bits).count("1")
+
+# Columns of the study table, in display order
+STUDY_COLUMNS = ["density", "trials", "reachable_mean", "reachable_std", "reachable_min",
+                 "distance_mean", "distance_std", "isolated"]
+
+
+class RunningStats:
+    """Streaming count, mean, variance (Welford), min and max of a series."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStats") -> None:
+        """Fold another summary into this one (Chan et al. pairwise update)."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 for fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def __repr__(self) -> str:
+        return f"RunningStats(count={self.count}, mean={self.mean:.4g}, stdev={self.stdev:.4g})"
+
+
+def trial_rng(seed: int, density: float, trial: int) -> random.Random:
+    """Generator for one trial; independent of how trials are batched."""
+    return random.Random(f"{seed}:{density!r}:{trial}")
+
+
+def random_obstacle_bits(
+    free_squares: Sequence[int],
+    density: float,
+    size: int,
+    rng: random.Random
+) -> int:
+    """Bitboard of round(density * len(free_squares)) squares sampled from free_squares."""
+    flags = bytearray(size)
+    for index in rng.sample(free_squares, round(density * len(free_squares))):
+        flags[index] = 1
+    return bits_from_flags(bytes(flags))
+
+
+def run_trial_batch(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    density: float,
+    seed: int,
+    first_trial: int,
+    count: int,
+    open_bits: Optional[int] = None
+) -> Tuple[RunningStats, RunningStats, int]:
+    """
+    Run trials first_trial .. first_trial + count - 1 at one density.
+
+    Returns:
+        (reachable fraction stats, mean distance stats, trials where the piece
+        could not move at all); the distance stats skip those isolated trials
+    """
+    board = full_board(rows, cols) if open_bits is None else open_bits
+    start = start_coord[0] * cols + start_coord[1]
+    free_squares = [index for index in iter_bits(board) if index != start]
+    # One lane per trial; padding rows (never open) make each lane whole bytes
+    lane_rows = next(n for n in range(rows, rows + 8) if n * cols % 8 == 0)
+    lane_bytes = lane_rows * cols // 8
+    lanes = []
+    open_squares = []
+    for trial in range(first_trial, first_trial + count):
+        obstacles = random_obstacle_bits(free_squares, density, rows * cols, trial_rng(seed, density, trial))
+        open_squares.append(len(free_squares) - _popcount(obstacles))
+        lanes.append((board & ~obstacles).to_bytes(lane_bytes, "little"))
+    unvisited = int.from_bytes(b"".join(lanes), "little")
+    frontier = int.from_bytes((1 << start).to_bytes(lane_bytes, "little") * count, "little")
+    unvisited &= ~frontier
+    table = nd_shift_table((count, lane_rows, cols), tuple((0, dr, dc) for dr, dc in piece_movements))
+
+    reached = [0] * count
+    total = [0] * count
+    depth = 0
+    while True:
+        frontier = expand(frontier, table) & unvisited
+        if not frontier:
+            break
+        unvisited ^= frontier
+        depth += 1
+        layer = frontier.to_bytes(count * lane_bytes, "little")
+        for lane in range(count):
+            layer_count = _popcount(int.from_bytes(layer[lane * lane_bytes:(lane + 1) * lane_bytes], "little"))
+            reached[lane] += layer_count
+            total[lane] += depth * layer_count
+
+    reachable = RunningStats()
+    distance = RunningStats()
+    isolated = 0
+    for lane in range(count):
+        reachable.add(reached[lane] / open_squares[lane] if open_squares[lane] else 1.0)
+        if reached[lane]:
+            distance.add(total[lane] / reached[lane])
+        else:
+            isolated += 1
+    return reachable, distance, isolated
+
+
+def obstacle_study(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    densities: Iterable[float],
+    trials: int,
+    start_coord: Optional[Tuple[int, int]] = None,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    batch_size: int = 200,
+    open_bits: Optional[int] = None
+) -> List[Dict]:
+    """
+    Reachable fraction and mean distance versus obstacle density.
+
+    Args:
+        rows, cols: Board size
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        densities: Obstacle densities in [0, 1], as a fraction of the free squares
+        trials: Random obstacle fields per density
+        start_coord: Starting square, never an obstacle (default: board center)
+        seed: Base seed; the same seed always gives the same study
+        workers: Worker processes (default: CPU count; 1 runs in this process)
+        batch_size: Trials per task sent to a worker
+        open_bits: Optional bitboard of playable squares (see BoardMask.bits)
+
+    Returns:
+        One dict per density with the STUDY_COLUMNS keys; reachable_* describe the
+        share of non-obstacle squares reached, distance_* the mean moves-to-reach
+        of the reached squares, isolated the share of trials with no legal move
+    """
+    if start_coord is None:
+        start_coord = (rows // 2, cols // 2)
+    check_start(rows, cols, start_coord, open_bits)
+    densities = list(densities)
+    for density in densities:
+        if not 0 <= density <= 1:
+            raise ValueError(f"Obstacle density must be between 0 and 1, got {density}")
+    if trials <= 0:
+        raise ValueError("The number of trials must be positive")
+    movements = tuple(map(tuple, piece_movements))
+
+    tasks = [(density, first, min(batch_size, trials - first))
+             for density in densities for first in range(0, trials, batch_size)]
+    summaries = {density: (RunningStats(), RunningStats(), [0]) for density in densities}
+
+    def fold(density, batch):
+        reachable, distance, isolated = summaries[density]
+        reachable.merge(batch[0])
+        distance.merge(batch[1])
+        isolated[0] += batch[2]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for density, first, count in tasks:
+            fold(density, run_trial_batch(rows, cols, movements, start_coord, density,
+                                          seed, first, count, open_bits))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep a bounded window of batches in flight and merge in submission
+            # order, so memory stays flat and results do not depend on timing
+            window = 2 * workers
+            pending = deque()
+            for density, first, count in tasks:
+                pending.append((density, executor.submit(run_trial_batch, rows, cols, movements, start_coord,
+                                                         density, seed, first, count, open_bits)))
+                if len(pending) >= window:
+                    done_density, future = pending.popleft()
+                    fold(done_density, future.result())
+            while pending:
+                done_density, future = pending.popleft()
+                fold(done_density, future.result())
+
+    report = []
+    for density in densities:
+        reachable, distance, isolated = summaries[density]
+        report.append({
+            "density": density,
+            "trials": reachable.count,
+            "reachable_mean": round(reachable.mean, 4),
+            "reachable_std": round(reachable.stdev, 4),
+            "reachable_min": round(reachable.min, 4),
+            "distance_mean": round(distance.mean, 3) if distance.count else None,
+            "distance_std": round(distance.stdev, 3) if distance.count else None,
+            "isolated": round(isolated[0] / reachable.count, 4),
+        })
+    return report
+
+
+def print_study_table(report: List[Dict]) -> None:
+    """Print the study report as an aligned table."""
+    header = f"{'density':>7}  {'trials':>6}  {'reach':>7}  {'std':>6}  {'min':>7}  " \
+             f"{'dist':>6}  {'std':>6}  {'isolated':>8}"
+    print(header)
+    print("-" * len(header))
+    for entry in report:
+        dist = "-" if entry["distance_mean"] is None else f"{entry['distance_mean']:.3f}"
+        dist_std = "-" if entry["distance_std"] is None else f"{entry['distance_std']:.3f}"
+        print(f"{entry['density']:>7.2f}  {entry['trials']:>6}  {entry['reachable_mean'] * 100:>6.1f}%  "
+              f"{entry['reachable_std'] * 100:>5.1f}%  {entry['reachable_min'] * 100:>6.1f}%  "
+              f"{dist:>6}  {dist_std:>6}  {entry['isolated'] * 100:>7.1f}%")
+
+
+def parse_densities(densities: str) -> List[float]:
+    """Parse a comma-separated density list like '0.1,0.2,0.3'."""
+    try:
+        return [float(density) for density in densities.split(",") if density.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid density list: {densities}")
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    started = time.perf_counter()
+    report = obstacle_study(8, 8, knight, [0.0, 0.1, 0.2, 0.3, 0.4, 0.5], trials=2000, seed=1)
+    print("Knight on 8x8 from (4, 4), 2000 random obstacle fields per density:\n")
+    print_study_table(report)
+    print(f"\n{time.perf_counter() - started:.1f}s")
@@ -0,0 +1,283 @@
+"""
+Level-synchronous BFS of one large board across several processes.
+
+The board is split into row stripes, one per worker process. Everything the
+search touches lives in multiprocessing.shared_memory, and workers read and
+write it in place:
+
+  distances   one int per square; each stripe has a single writer, its owner
+  frontiers   the squares first reached at the current level, stored in the
+              owner's own index range (a stripe never holds more squares
+              than it has)
+  outboxes    one buffer per (sender, owner) pair for squares that land in
+              another worker's stripe, sized by the rows a move can reach
+  counts      frontier sizes and outbox fill levels
+
+Per level, every worker expands its own frontier, claims the squares in its
+stripe and posts the others to their owners' outboxes. After a Barrier, each
+worker claims the squares posted to it and publishes its next frontier; after
+a second Barrier, all workers stop together once every frontier is empty. The
+parent process only starts the workers and waits for them.
+
+BFS distances do not depend on the order in which a level is expanded, so the
+result is identical to the serial engines.
+"""
+
+import os
+import time
+from array import array
+from multiprocessing import Barrier, Process
+from multiprocessing.shared_memory import SharedMemory
+from threading import BrokenBarrierError
+from typing import List, Optional, Sequence, Tuple
+
+from heatmap_array import HEATMAP_TYPECODE, Heatmap, compute_heatmap
+
+_COUNT_TYPECODE = "q"
+
+
+def stripe_bounds(rows: int, workers: int) -> List[Tuple[int, int]]:
+    """Split rows into at most `workers` contiguous, non-empty [start, stop) stripes."""
+    workers = max(1, min(workers, rows))
+    base, extra = divmod(rows, workers)
+    bounds = []
+    start = 0
+    for index in range(workers):
+        stop = start + base + (index < extra)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def outbox_layout(cols: int, bounds: List[Tuple[int, int]], reach: int) -> List[List[Tuple[int, int]]]:
+    """
+    (offset, capacity) of every sender -> owner outbox in one flat buffer.
+
+    A move changes the row by at most `reach`, so squares posted from one
+    stripe to another lie in the owner's rows within `reach` of the sender's.
+    Squares are posted at most once per level, which bounds each outbox by
+    that many rows of the owner's stripe.
+    """
+    layout = []
+    offset = 0
+    for sender, (sender_start, sender_stop) in enumerate(bounds):
+        row = []
+        for owner, (owner_start, owner_stop) in enumerate(bounds):
+            if owner == sender:
+                capacity = 0
+            else:
+                overlap = min(owner_stop, sender_stop + reach) - max(owner_start, sender_start - reach)
+                capacity = max(0, overlap) * cols
+            row.append((offset, capacity))
+            offset += capacity
+        layout.append(row)
+    return layout
+
+
+def _index_typecode(size: int) -> str:
+    return "i" if size < 2 ** 31 else "q"
+
+
+def _attach(name: str, typecode: str, length: int) -> Tuple[SharedMemory, memoryview]:
+    """Open a shared block as a typed memoryview of exactly `length` items."""
+    shm = SharedMemory(name=name)
+    view = shm.buf[:length * array(typecode).itemsize].cast(typecode)
+    return shm, view
+
+
+def _stripe_worker(names: Tuple[str, str, str, str], rows: int, cols: int, bounds: List[Tuple[int, int]],
+                   layout: List[List[Tuple[int, int]]], index: int,
+                   piece_movements: Sequence[Tuple[int, int]], barrier) -> None:
+    """
+    Own one stripe of the shared distance array.
+
+    Each level runs in two phases separated by barrier waits:
+      expand   walk this stripe's frontier; claim squares in the stripe,
+               post squares of other stripes to their owners' outboxes
+      claim    take the squares other workers posted here, then publish the
+               next frontier and its size
+    """
+    workers = len(bounds)
+    size = rows * cols
+    index_type = _index_typecode(size)
+    outbox_size = sum(capacity for row in layout for _, capacity in row)
+    segments = [_attach(names[0], HEATMAP_TYPECODE, size),
+                _attach(names[1], index_type, size),
+                _attach(names[2], index_type, outbox_size),
+                _attach(names[3], _COUNT_TYPECODE, workers + workers * workers)]
+    dist, frontier, outbox, counts = (view for _, view in segments)
+    try:
+        row_start, row_stop = bounds[index]
+        lo, hi = row_start * cols, row_stop * cols
+        moves = [(dr, dc, dr * cols + dc) for dr, dc in set(map(tuple, piece_movements))
+                 if (dr, dc) != (0, 0) and abs(dr) < rows and abs(dc) < cols]
+        owner_of_row = [0] * rows
+        for owner, (start, stop) in enumerate(bounds):
+            for row in range(start, stop):
+                owner_of_row[row] = owner
+        # counts[sent + owner] is how many squares this worker posted to owner
+        sent = workers + index * workers
+
+        level = 0
+        while True:
+            next_level = level + 1
+            local: List[int] = []
+            remote: List[set] = [set() for _ in bounds]
+            for square in frontier[lo:lo + counts[index]].tolist():
+                row, col = divmod(square, cols)
+                for dr, dc, delta in moves:
+                    target_row = row + dr
+                    if 0 <= target_row < rows and 0 <= col + dc < cols:
+                        target = square + delta
+                        if dist[target] != -1:
+                            continue
+                        if lo <= target < hi:
+                            dist[target] = next_level
+                            local.append(target)
+                        else:
+                            remote[owner_of_row[target_row]].add(target)
+            for owner, squares in enumerate(remote):
+                if squares:
+                    offset = layout[index][owner][0]
+                    outbox[offset:offset + len(squares)] = array(index_type, squares)
+                counts[sent + owner] = len(squares)
+            barrier.wait()
+
+            for sender in range(workers):
+                posted = counts[workers + sender * workers + index]
+                if posted:
+                    offset = layout[sender][index][0]
+                    for target in outbox[offset:offset + posted].tolist():
+                        if dist[target] == -1:
+                            dist[target] = next_level
+                            local.append(target)
+            if local:
+                frontier[lo:lo + len(local)] = array(index_type, local)
+            counts[index] = len(local)
+            barrier.wait()
+
+            if not any(counts[:workers]):
+                break
+            level = next_level
+    except BaseException:
+        # Release the other workers instead of leaving them at the barrier
+        barrier.abort()
+        raise
+    finally:
+        for shm, view in segments:
+            view.release()
+            shm.close()
+
+
+def parallel_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    workers: Optional[int] = None
+) -> Heatmap:
+    """
+    Generate one heatmap with a BFS split across worker processes.
+
+    Args:
+        rows, cols: Board size
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        start_coord: Starting position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+        workers: Worker processes, one row stripe each (default: CPU count)
+
+    Returns:
+        Heatmap identical to compute_heatmap's
+        (-1 if unreachable, -2 if obstacle)
+    """
+    if not (0 <= start_coord[0] < rows and 0 <= start_coord[1] < cols):
+        raise ValueError(f"Starting position {start_coord} is outside the {rows}x{cols} board")
+    bounds = stripe_bounds(rows, workers or os.cpu_count() or 1)
+    if len(bounds) == 1:
+        return compute_heatmap(rows, cols, piece_movements, start_coord, obstacles)
+
+    size = rows * cols
+    heatmap = Heatmap(rows, cols)
+    if obstacles:
+        for obs_row, obs_col in obstacles:
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                heatmap[obs_row, obs_col] = -2
+    start = start_coord[0] * cols + start_coord[1]
+    if heatmap[start_coord] == -2:
+        raise ValueError("Starting position is on an obstacle!")
+    heatmap[start_coord] = 0
+
+    movements = [tuple(move) for move in piece_movements]
+    reach = max((abs(dr) for dr, dc in movements), default=0)
+    layout = outbox_layout(cols, bounds, min(reach, rows - 1))
+    index_type = _index_typecode(size)
+    index_size = array(index_type).itemsize
+    count_size = array(_COUNT_TYPECODE).itemsize
+    outbox_size = sum(capacity for row in layout for _, capacity in row)
+    blocks = []
+    processes = []
+    try:
+        for nbytes in (size * heatmap.itemsize, size * index_size, outbox_size * index_size,
+                       (len(bounds) + len(bounds) ** 2) * count_size):
+            blocks.append(SharedMemory(create=True, size=max(1, nbytes)))
+        distances, frontiers, _, control = blocks
+        distances.buf[:size * heatmap.itemsize] = memoryview(heatmap).cast("B")
+        control.buf[:len(control.buf)] = bytes(len(control.buf))
+        # The start is the whole level-0 frontier, in its owner's index range
+        owner = next(i for i, (lo, hi) in enumerate(bounds) if lo <= start_coord[0] < hi)
+        offset = bounds[owner][0] * cols * index_size
+        frontiers.buf[offset:offset + index_size] = array(index_type, [start]).tobytes()
+        control.buf[owner * count_size:(owner + 1) * count_size] = array(_COUNT_TYPECODE, [1]).tobytes()
+
+        barrier = Barrier(len(bounds))
+        names = tuple(block.name for block in blocks)
+        for index in range(len(bounds)):
+            process = Process(target=_stripe_worker, daemon=True,
+                              args=(names, rows, cols, bounds, layout, index, movements, barrier))
+            process.start()
+            processes.append(process)
+        # Workers synchronise among themselves; a failed one breaks the barrier
+        while any(process.is_alive() for process in processes):
+            for process in processes:
+                process.join(timeout=0.05)
+                if process.exitcode not in (None, 0):
+                    barrier.abort()
+        if any(process.exitcode != 0 for process in processes):
+            raise RuntimeError("A parallel BFS worker failed")
+        heatmap = Heatmap.from_flat(rows, cols, bytes(distances.buf[:size * heatmap.itemsize]))
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return heatmap
+
+
+def benchmark(size: int = 1000, worker_counts: Sequence[int] = (1, 2, 4),
+              piece_movements: Optional[List[Tuple[int, int]]] = None) -> List[Tuple[int, float]]:
+    """
+    Time one size x size heatmap (a knight's by default) per worker count.
+
+    Returns:
+        List of (workers, seconds); one worker is the serial engine
+    """
+    movements = piece_movements or [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    timings = []
+    for workers in worker_counts:
+        started = time.perf_counter()
+        parallel_heatmap(size, size, movements, (0, 0), workers=workers)
+        timings.append((workers, time.perf_counter() - started))
+    return timings
+
+
+# Example usage
+if __name__ == "__main__":
+    print(f"{os.cpu_count()} CPU(s)")
+    timings = benchmark()
+    serial = timings[0][1]
+    for workers, seconds in timings:
+        print(f"{workers} worker(s): {seconds:.2f}s, speedup {serial / seconds:.2f}x")
@@ -0,0 +1,99 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from exotic_pieces import get_piece_movements
+from fairy_chess_pieces import fairy_chess_pieces
+
+# Combine all piece dictionaries
+ALL_PIECES: Dict[str, List[Tuple[int, int]]] = {}
+ALL_PIECES.update(get_piece_movements())
+ALL_PIECES.update(fairy_chess_pieces)
+
+
+def normalize_piece_name(name: str) -> str:
+    """Normalize a piece name for lookup ('Flying Ox', 'flying_ox' -> 'flying-ox')."""
+    return name.lower().replace("_", " ").replace(" ", "-")
+
+
+# Normalize piece names for case-insensitive lookup
+NORMALIZED_PIECES = {normalize_piece_name(name): name for name in ALL_PIECES.keys()}
+
+
+def match_pieces(query: str) -> List[str]:
+    """
+    Find catalogue pieces matching a user-supplied name.
+
+    An exact or normalized match wins outright; otherwise every piece whose
+    name contains the query is returned.
+
+    Returns:
+        Sorted list of matching catalogue names (empty if nothing matches)
+    """
+    piece_input = query.lower().replace("-", " ").replace("_", " ")
+    if piece_input in ALL_PIECES:
+        return [piece_input]
+    normalized_input = normalize_piece_name(piece_input)
+    if normalized_input in NORMALIZED_PIECES:
+        return [NORMALIZED_PIECES[normalized_input]]
+    return sorted(name for name in ALL_PIECES.keys()
+                  if piece_input in name.lower().replace("_", " "))
+
+
+def canonical_movements(
+    piece_movements: List[Tuple[int, int]],
+    rows: Optional[int] = None,
+    cols: Optional[int] = None
+) -> Tuple[Tuple[int, int], ...]:
+    """
+    Canonical form of a movement set: sorted distinct offsets without (0, 0).
+
+    With a board size, offsets that can never stay on a rows x cols board are
+    dropped as well, since they do not change any heatmap on that board.
+    """
+    offsets = set(tuple(move) for move in piece_movements)
+    offsets.discard((0, 0))
+    if rows is not None and cols is not None:
+        offsets = {(dr, dc) for dr, dc in offsets if abs(dr) < rows and abs(dc) < cols}
+    return tuple(sorted(offsets))
+
+
+def movement_key(piece_movements: List[Tuple[int, int]],
+                 rows: Optional[int] = None, cols: Optional[int] = None) -> str:
+    """Short stable hex digest of the canonical movement set."""
+    canonical = canonical_movements(piece_movements, rows, cols)
+    return hashlib.sha1(repr(canonical).encode("ascii")).hexdigest()[:16]
+
+
+def equivalence_index(
+    pieces: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+    rows: Optional[int] = None,
+    cols: Optional[int] = None
+) -> Dict[str, List[str]]:
+    """
+    Group pieces by canonical movement set.
+
+    Args:
+        pieces: Mapping of piece name to movements (default: ALL_PIECES)
+        rows, cols: Optional board size; offsets that cannot fit the board are ignored
+
+    Returns:
+        Mapping of movement_key to the sorted names sharing that movement set
+    """
+    pieces = ALL_PIECES if pieces is None else pieces
+    index: Dict[str, List[str]] = {}
+    for name, movements in pieces.items():
+        index.setdefault(movement_key(movements, rows, cols), []).append(name)
+    for names in index.values():
+        names.sort(key=str.lower)
+    return index
+
+
+def equivalent_pieces(piece_name: str, rows: Optional[int] = None, cols: Optional[int] = None) -> List[str]:
+    """Other catalogue pieces with exactly the same movement set as piece_name."""
+    key = movement_key(ALL_PIECES[piece_name], rows, cols)
+    return [name for name in _equivalence_index(rows, cols).get(key, []) if name != piece_name]
+
+
+@lru_cache(maxsize=32)
+def _equivalence_index(rows: Optional[int], cols: Optional[int]) -> Dict[str, List[str]]:
+    return equivalence_index(ALL_PIECES, rows, cols)
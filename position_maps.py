@@ -0,0 +1,353 @@
+"""
+Attack and mobility maps for a whole position with many pieces.
+
+A position lists pieces (catalogue movement sets on start squares, white or
+black) and optional obstacles. For every square the maps count how many
+pieces can reach it in one move, and within k moves. Pieces stay where they
+are and block each other: a slide stops on the first occupied square (which
+it attacks), and a leap may land on an occupied square but not on an obstacle.
+
+Offset lists do not say which moves slide, so each movement set is split
+into rides and leaps. The offsets i * d for i = 1, 2, ..., m along one
+primitive direction d form a ride. Everything else is a leap. Blocking
+along rides is looked up in one hopper_pieces.ScreenTables built for the
+occupancy of the whole position and shared by every piece. A moving
+piece has left its home square, so its own rides look past that square to
+the next blocker. The k-move maps come from one BFS for all pieces together. Each square keeps a
+bitmask of the pieces that reached it, and a layer passes those masks on
+to the squares reachable from it.
+
+Positions are given as JSON or as a FEN-like string:
+
+  JSON  {"size": [rows, cols], "pieces": [{"piece": "Rook", "square": "a1",
+        "side": "white"}, ...], "obstacles": ["d4", [3, 5]]}
+  FEN   ranks from the top (highest row) down, separated by '/'; a number is
+        a run of empty squares, '#' an obstacle, KQRBNP a standard piece
+        (upper case white, lower case black), [Name] a white and {Name} a
+        black catalogue piece; 'Rook+Bishop' combines movement sets
+
+Black pieces move mirrored, so forward-only pieces (pawns, lances) advance
+towards row 0.
+"""
+
+import json
+import os
+import re
+from math import gcd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from hopper_pieces import ScreenTables
+
+SIDES = ("white", "black")
+
+# Standard chess letters in FEN-like strings
+FEN_PIECES = {"k": "king", "q": "Rook+Bishop", "r": "Rook", "b": "Bishop", "n": "knight", "p": "Pawn"}
+
+_FEN_BOARD = re.compile(r"(?:\[[^\]]*\]|\{[^}]*\}|[^\s\[{])*")
+_FEN_TOKEN = re.compile(r"\d+|#|\[[^\]]+\]|\{[^}]+\}|[A-Za-z]")
+
+
+def resolve_movements(name: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """Catalogue name(s) joined by '+' -> (display name, combined offsets)."""
+    from piece_catalogue import ALL_PIECES, match_pieces
+
+    names = []
+    movements = set()
+    for part in name.split("+"):
+        matches = match_pieces(part.strip())
+        if len(matches) != 1:
+            raise ValueError(f"'{part.strip()}' matches {len(matches)} catalogue pieces")
+        names.append(matches[0])
+        movements.update(map(tuple, ALL_PIECES[matches[0]]))
+    return "+".join(names), sorted(movements)
+
+
+class PositionPiece:
+    """One piece of a position: its name, side, square and (side-oriented) offsets."""
+
+    __slots__ = ("name", "side", "square", "movements")
+
+    def __init__(self, name: str, side: str, square: Tuple[int, int], movements: Sequence[Tuple[int, int]]):
+        if side not in SIDES:
+            raise ValueError(f"Unknown side: {side}")
+        self.name = name
+        self.side = side
+        self.square = tuple(square)
+        # Black plays down the board: mirror the row offsets
+        self.movements = tuple(sorted({(dr if side == "white" else -dr, dc) for dr, dc in movements}))
+
+    def __repr__(self) -> str:
+        return f"PositionPiece({self.name!r}, {self.side!r}, {self.square})"
+
+
+class Position:
+    """A board with pieces and obstacles."""
+
+    __slots__ = ("rows", "cols", "pieces", "obstacles")
+
+    def __init__(self, rows: int, cols: int, pieces: Sequence[PositionPiece],
+                 obstacles: Optional[Sequence[Tuple[int, int]]] = None):
+        self.rows = rows
+        self.cols = cols
+        self.pieces = list(pieces)
+        self.obstacles = [tuple(square) for square in obstacles or ()]
+        occupied = set()
+        for square in [piece.square for piece in self.pieces] + self.obstacles:
+            if not (0 <= square[0] < rows and 0 <= square[1] < cols):
+                raise ValueError(f"Square {square} is outside the {rows}x{cols} board")
+            if square in occupied:
+                raise ValueError(f"Square {square} is used twice")
+            occupied.add(square)
+
+    @classmethod
+    def from_fen(cls, text: str) -> "Position":
+        """Parse the FEN-like format described in the module docstring."""
+        # Trailing FEN fields (side to move, castling, ...) are ignored
+        text = text.strip()
+        board = _FEN_BOARD.match(text).group()
+        if text[len(board):len(board) + 1].strip():
+            raise ValueError(f"Unexpected '{text[len(board):]}' in '{text}'")
+        ranks = board.split("/")
+        rows = len(ranks)
+        pieces = []
+        obstacles = []
+        widths = set()
+        for index, rank in enumerate(ranks):
+            row = rows - 1 - index
+            col = 0
+            position = 0
+            for match in _FEN_TOKEN.finditer(rank):
+                if match.start() != position:
+                    raise ValueError(f"Unexpected '{rank[position:match.start()]}' in rank '{rank}'")
+                position = match.end()
+                token = match.group()
+                if token.isdigit():
+                    col += int(token)
+                    continue
+                if token == "#":
+                    obstacles.append((row, col))
+                elif token[0] in "[{":
+                    name, movements = resolve_movements(token[1:-1])
+                    pieces.append(PositionPiece(name, "white" if token[0] == "[" else "black", (row, col), movements))
+                else:
+                    if token.lower() not in FEN_PIECES:
+                        raise ValueError(f"Unknown piece letter '{token}'")
+                    name, movements = resolve_movements(FEN_PIECES[token.lower()])
+                    pieces.append(PositionPiece(name, "white" if token.isupper() else "black", (row, col), movements))
+                col += 1
+            if position != len(rank):
+                raise ValueError(f"Unexpected '{rank[position:]}' in rank '{rank}'")
+            widths.add(col)
+        if len(widths) != 1:
+            raise ValueError(f"Ranks have different widths: {sorted(widths)}")
+        return cls(rows, widths.pop(), pieces, obstacles)
+
+    @classmethod
+    def from_json(cls, data) -> "Position":
+        """Build a position from a JSON string or an already parsed dict."""
+        # Imported here: the CLI module imports this one
+        from chess_heatmap_cli import parse_position
+
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        def square(value) -> Tuple[int, int]:
+            return parse_position(value) if isinstance(value, str) else tuple(value)
+
+        try:
+            rows, cols = data["size"]
+            pieces = []
+            for entry in data["pieces"]:
+                name, movements = resolve_movements(entry["piece"])
+                pieces.append(PositionPiece(name, entry.get("side", "white"), square(entry["square"]), movements))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid position description: {e}")
+        return cls(rows, cols, pieces, [square(value) for value in data.get("obstacles", [])])
+
+    @classmethod
+    def load(cls, source: str) -> "Position":
+        """A FEN-like string, a JSON string, or the path of a .json or text file holding either."""
+        text = source
+        if os.path.isfile(source):
+            with open(source) as f:
+                text = f.read()
+        return cls.from_json(text) if text.lstrip().startswith("{") else cls.from_fen(text)
+
+
+def split_moves(piece_movements: Sequence[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], List[Tuple[Tuple[int, int], int]]]:
+    """
+    Split offsets into leaps and rides.
+
+    Returns:
+        (leaps, rides) where rides are (primitive direction, length) pairs
+        covering the offsets d, 2d, ..., length * d
+    """
+    steps: Dict[Tuple[int, int], set] = {}
+    for dr, dc in set(map(tuple, piece_movements)):
+        if (dr, dc) == (0, 0):
+            continue
+        g = gcd(abs(dr), abs(dc))
+        steps.setdefault((dr // g, dc // g), set()).add(g)
+    leaps = []
+    rides = []
+    for direction, multiples in sorted(steps.items()):
+        length = 0
+        while length + 1 in multiples:
+            length += 1
+        if length >= 2:
+            rides.append((direction, length))
+            multiples = multiples - set(range(1, length + 1))
+        leaps.extend((direction[0] * m, direction[1] * m) for m in sorted(multiples))
+    return leaps, rides
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+def position_maps(position: Position, max_moves: int = 1) -> dict:
+    """
+    Per-square reach counts and per-piece mobility for a whole position.
+
+    Args:
+        position: Pieces and obstacles
+        max_moves: k for the "within k moves" maps
+
+    Returns:
+        Dict with:
+          one_move:  {side: grid} pieces of that side ('white', 'black', 'all')
+                     that reach each square in one move
+          within:    {side: grid} the same for 1 to max_moves moves
+          mobility:  [(piece, side, square, one-move targets, squares within k)],
+                     targets excluding squares held by the piece's own side
+          max_moves: k
+        Obstacle cells are -2 in every grid.
+    """
+    rows, cols = position.rows, position.cols
+    size = rows * cols
+    blocked = bytearray(size)
+    for row, col in position.obstacles:
+        blocked[row * cols + col] = 1
+    occupied = bytearray(blocked)
+    for piece in position.pieces:
+        occupied[piece.square[0] * cols + piece.square[1]] = 1
+
+    # One screen table for every ride direction of every piece, over the shared occupancy
+    groups = {}
+    for piece in position.pieces:
+        if piece.movements not in groups:
+            groups[piece.movements] = split_moves(piece.movements)
+    directions = sorted({direction for _, rides in groups.values() for direction, _ in rides})
+    tables = ScreenTables(rows, cols, directions, occupied)
+    direction_index = {direction: d for d, direction in enumerate(directions)}
+    # Rides depend on the mover's home square, which it has vacated; leaps do not
+    piece_keys = [(piece.movements, piece.square[0] * cols + piece.square[1] if groups[piece.movements][1] else -1)
+                  for piece in position.pieces]
+    move_cache: Dict[Tuple[Tuple[Tuple[int, int], ...], int], Dict[int, List[int]]] = {key: {} for key in piece_keys}
+
+    def landing_squares(key, square: int) -> List[int]:
+        cache = move_cache[key]
+        if square not in cache:
+            movements, home = key
+            leaps, rides = groups[movements]
+            row, col = divmod(square, cols)
+            targets = [(row + dr) * cols + col + dc for dr, dc in leaps
+                       if 0 <= row + dr < rows and 0 <= col + dc < cols
+                       and not blocked[(row + dr) * cols + col + dc]]
+            for (dr, dc), length in rides:
+                d = direction_index[(dr, dc)]
+                screen = tables.first[d][square]
+                if screen == home:
+                    screen = tables.second[d][square]
+                steps = tables.steps[d][square]
+                if screen != -1:
+                    # Stop on the first occupied square; it is attacked unless it is an obstacle
+                    steps -= tables.steps[d][screen] + blocked[screen]
+                delta = dr * cols + dc
+                targets.extend(square + delta * i for i in range(1, min(steps, length) + 1))
+            cache[square] = targets
+        return cache[square]
+
+    # Batched BFS: one bit per piece, passed on from square to square
+    frontier: Dict[int, int] = {}
+    for bit, piece in enumerate(position.pieces):
+        square = piece.square[0] * cols + piece.square[1]
+        frontier[square] = frontier.get(square, 0) | 1 << bit
+    # A piece's own start square counts as visited, never as reached
+    origin = [frontier.get(square, 0) for square in range(size)]
+    reached = list(origin)
+    first_layer = list(origin)
+    for depth in range(1, max_moves + 1):
+        layer: Dict[int, int] = {}
+        for square, bits in frontier.items():
+            # Split the bits by piece key; pieces sharing one share its landing squares
+            by_key: Dict[Tuple[Tuple[Tuple[int, int], ...], int], int] = {}
+            remaining = bits
+            while remaining:
+                low = remaining & -remaining
+                key = piece_keys[low.bit_length() - 1]
+                by_key[key] = by_key.get(key, 0) | low
+                remaining ^= low
+            for key, group_bits in by_key.items():
+                for target in landing_squares(key, square):
+                    new = group_bits & ~reached[target]
+                    if new:
+                        reached[target] |= new
+                        layer[target] = layer.get(target, 0) | new
+        if depth == 1:
+            first_layer = list(reached)
+        # Captures end a piece's journey: never move on from an occupied square
+        frontier = {square: bits for square, bits in layer.items() if not occupied[square]}
+        if not frontier:
+            break
+
+    side_masks = {side: sum(1 << bit for bit, piece in enumerate(position.pieces) if piece.side == side)
+                  for side in SIDES}
+    side_masks["all"] = (1 << len(position.pieces)) - 1
+
+    def count_grid(bits_per_square: List[int], mask: int) -> List[List[int]]:
+        cells = [-2 if blocked[s] else _popcount(bits_per_square[s] & ~origin[s] & mask) for s in range(size)]
+        return [cells[r * cols:(r + 1) * cols] for r in range(rows)]
+
+    own_squares = {side: {p.square[0] * cols + p.square[1] for p in position.pieces if p.side == side}
+                   for side in SIDES}
+    mobility = []
+    for bit, piece in enumerate(position.pieces):
+        square = piece.square[0] * cols + piece.square[1]
+        mobility.append((piece.name, piece.side, piece.square,
+                         len(set(landing_squares(piece_keys[bit], square)) - own_squares[piece.side]),
+                         sum(1 for s, bits in enumerate(reached) if (bits & ~origin[s]) >> bit & 1)))
+    return {
+        "one_move": {side: count_grid(first_layer, mask) for side, mask in side_masks.items()},
+        "within": {side: count_grid(reached, mask) for side, mask in side_masks.items()},
+        "mobility": mobility,
+        "max_moves": max_moves,
+    }
+
+
+def print_count_map(grid: List[List[int]], width: int = 3) -> None:
+    """Print a count map with '.' for squares no piece reaches and 'X' for obstacles."""
+    for row in grid:
+        print(" ".join(f"{'X' if cell == -2 else '.' if cell == 0 else cell:>{width}}" for cell in row))
+
+
+# Example usage
+if __name__ == "__main__":
+    start = Position.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+    maps = position_maps(start, max_moves=2)
+    print("Starting position, white pieces reaching each square in one move (rank 1 on top):")
+    print_count_map(maps["one_move"]["white"])
+    print("\nWithin two moves:")
+    print_count_map(maps["within"]["white"])
+
+    fairy = Position.from_json({
+        "size": [10, 10],
+        "pieces": [{"piece": "Flying Ox", "square": "a1"}, {"piece": "nightrider", "square": [4, 4]},
+                   {"piece": "Rook", "square": "e9", "side": "black"}],
+        "obstacles": ["c3", "d5"],
+    })
+    maps = position_maps(fairy)
+    print("\nFairy position, all pieces, one move:")
+    print_count_map(maps["one_move"]["all"])
+    for name, side, square, moves, _ in maps["mobility"]:
+        print(f"  {side} {name} on {square}: {moves} moves")
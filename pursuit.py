@@ -0,0 +1,266 @@
+"""
+Retrograde analysis of a pursuit: piece A hunts piece B, moving alternately.
+
+A position is (A's square, B's square, side to move). A wins by moving onto
+B's square; B may not move onto A's square and tries to delay the capture as
+long as possible, forever if it can. A side with no legal move passes (with
+allow_pass=True either side may always pass instead of moving).
+
+The solver works backwards from the capture positions, like an endgame
+tablebase. Every B-to-move position keeps a counter of its moves not yet
+known to lose. When the counter drops to zero, B is lost, and it is lost
+in as many A moves as its last move to be resolved. The positions are
+processed in order of their distance to capture, so each position is
+resolved exactly once at its optimal value. Values and counters are packed
+arrays indexed by a * squares + b.
+"""
+
+from array import array
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+from board_mask import BoardMask
+
+
+def _move_lists(rows: int, cols: int, piece_movements: Sequence[Tuple[int, int]],
+                blocked: bytearray) -> List[Tuple[int, ...]]:
+    """Landing squares of every open square (empty tuples for blocked squares)."""
+    offsets = {tuple(move) for move in piece_movements if tuple(move) != (0, 0)}
+    moves = []
+    for square in range(rows * cols):
+        row, col = divmod(square, cols)
+        if blocked[square]:
+            moves.append(())
+            continue
+        moves.append(tuple(sorted((row + dr) * cols + col + dc for dr, dc in offsets
+                                  if 0 <= row + dr < rows and 0 <= col + dc < cols
+                                  and not blocked[(row + dr) * cols + col + dc])))
+    return moves
+
+
+def _reverse(moves: List[Tuple[int, ...]]) -> List[List[int]]:
+    """For every square, the squares that can move onto it."""
+    sources: List[List[int]] = [[] for _ in moves]
+    for square, targets in enumerate(moves):
+        for target in targets:
+            sources[target].append(square)
+    return sources
+
+
+class PursuitTable:
+    """
+    Capture times for every (pursuer square, evader square, side to move).
+
+    A value v >= 1 means the pursuer captures with v more moves of its own;
+    0 marks positions that are won for the evader (or not valid positions).
+    """
+
+    __slots__ = ("rows", "cols", "blocked", "pursuer_moves", "evader_moves", "allow_pass",
+                 "pursuer_to_move", "evader_to_move")
+
+    def __init__(self, rows: int, cols: int, blocked: bytearray, pursuer_moves: List[Tuple[int, ...]],
+                 evader_moves: List[Tuple[int, ...]], allow_pass: bool,
+                 pursuer_to_move: array, evader_to_move: array):
+        self.rows = rows
+        self.cols = cols
+        self.blocked = blocked
+        self.pursuer_moves = pursuer_moves
+        self.evader_moves = evader_moves
+        self.allow_pass = allow_pass
+        self.pursuer_to_move = pursuer_to_move
+        self.evader_to_move = evader_to_move
+
+    def _index(self, square: Tuple[int, int]) -> int:
+        row, col = square
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"Square {square} is outside the {self.rows}x{self.cols} board")
+        return row * self.cols + col
+
+    def _value(self, a: int, b: int, pursuer_to_move: bool) -> int:
+        if self.blocked[a] or self.blocked[b]:
+            return -2
+        if a == b:
+            return 0
+        values = self.pursuer_to_move if pursuer_to_move else self.evader_to_move
+        return values[a * self.rows * self.cols + b] or -1
+
+    def capture_time(self, pursuer: Tuple[int, int], evader: Tuple[int, int], pursuer_to_move: bool = True) -> int:
+        """
+        Pursuer moves needed to capture with best play on both sides.
+
+        Returns -1 if the evader escapes forever, -2 if either square is
+        blocked, and 0 if both pieces stand on the same square.
+        """
+        return self._value(self._index(pursuer), self._index(evader), pursuer_to_move)
+
+    def pursuer_heatmap(self, evader: Tuple[int, int], pursuer_to_move: bool = True) -> List[List[int]]:
+        """Capture time from every pursuer start square, the evader fixed on evader."""
+        b = self._index(evader)
+        cells = [self._value(a, b, pursuer_to_move) for a in range(self.rows * self.cols)]
+        return [cells[r * self.cols:(r + 1) * self.cols] for r in range(self.rows)]
+
+    def evader_heatmap(self, pursuer: Tuple[int, int], pursuer_to_move: bool = True) -> List[List[int]]:
+        """Capture time for every evader start square, the pursuer fixed on pursuer."""
+        a = self._index(pursuer)
+        cells = [self._value(a, b, pursuer_to_move) for b in range(self.rows * self.cols)]
+        return [cells[r * self.cols:(r + 1) * self.cols] for r in range(self.rows)]
+
+    def longest_chase(self, pursuer_to_move: bool = True) -> Optional[Tuple[int, Tuple[int, int], Tuple[int, int]]]:
+        """(capture time, pursuer square, evader square) of the longest won chase, or None."""
+        values = self.pursuer_to_move if pursuer_to_move else self.evader_to_move
+        longest = max(values, default=0)
+        if not longest:
+            return None
+        a, b = divmod(values.index(longest), self.rows * self.cols)
+        return longest, divmod(a, self.cols), divmod(b, self.cols)
+
+    def principal_line(self, pursuer: Tuple[int, int], evader: Tuple[int, int],
+                       pursuer_to_move: bool = True) -> Optional[List[Tuple[Tuple[int, int], Tuple[int, int]]]]:
+        """
+        Positions (pursuer square, evader square) of one optimal chase, one per move.
+
+        The last position has both pieces on the same square. Returns None if
+        the evader escapes.
+        """
+        size = self.rows * self.cols
+        a, b = self._index(pursuer), self._index(evader)
+        value = self._value(a, b, pursuer_to_move)
+        if value < 0:
+            return None
+        line = [(a, b)]
+        turn = pursuer_to_move
+        while a != b:
+            if turn:
+                if b in self.pursuer_moves[a]:
+                    a = b
+                else:
+                    # Any move (or pass) into an evader-to-move position one capture closer
+                    options = list(self.pursuer_moves[a]) + [a]
+                    a = next(t for t in options if t != b and self.evader_to_move[t * size + b] == value - 1
+                             and (t != a or self.allow_pass or not self.pursuer_moves[a]))
+                    value -= 1
+            else:
+                # The evader delays as long as it can; every move here loses in `value`
+                options = [t for t in self.evader_moves[b] if t != a]
+                if self.allow_pass or not options:
+                    options.append(b)
+                b = max(options, key=lambda t: self.pursuer_to_move[a * size + t])
+            line.append((a, b))
+            turn = not turn
+        return [(divmod(a, self.cols), divmod(b, self.cols)) for a, b in line]
+
+
+def solve_pursuit(
+    rows: int,
+    cols: int,
+    pursuer_movements: List[Tuple[int, int]],
+    evader_movements: List[Tuple[int, int]],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    allow_pass: bool = False,
+    mask: Optional[BoardMask] = None
+) -> PursuitTable:
+    """
+    Solve the pursuit game for every pair of start squares.
+
+    Args:
+        rows, cols: Board size
+        pursuer_movements: Offsets of the hunting piece (it captures by landing on the evader)
+        evader_movements: Offsets of the hunted piece
+        obstacles: Optional list of (row, col) tuples neither piece may land on
+        allow_pass: Let either side skip a move (a side without legal moves always passes)
+        mask: Optional board geometry; its holes are blocked like obstacles
+
+    Returns:
+        PursuitTable of capture times for both sides to move
+    """
+    size = rows * cols
+    if mask is not None:
+        mask.check_size(rows, cols)
+        blocked = mask.blocked_flags(obstacles)
+    else:
+        blocked = bytearray(size)
+        for obs_row, obs_col in obstacles or ():
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                blocked[obs_row * cols + obs_col] = 1
+    pursuer_moves = _move_lists(rows, cols, pursuer_movements, blocked)
+    evader_moves = _move_lists(rows, cols, evader_movements, blocked)
+    pursuer_sources = _reverse(pursuer_moves)
+    evader_sources = _reverse(evader_moves)
+    evader_targets = [set(targets) for targets in evader_moves]
+
+    pursuer_to_move = array("H", [0]) * (size * size)
+    evader_to_move = array("H", [0]) * (size * size)
+    # Evader moves from each evader-to-move position not yet known to lose
+    max_moves = max(map(len, evader_moves), default=0) + 1
+    remaining = bytearray(size * size) if max_moves < 256 else array("H", [0]) * (size * size)
+
+    def evader_can_pass(a: int, b: int) -> bool:
+        return allow_pass or len(evader_moves[b]) == (a in evader_targets[b])
+
+    queue = deque()
+    for a in range(size):
+        if blocked[a]:
+            continue
+        captures = set(pursuer_moves[a])
+        for b in range(size):
+            if blocked[b] or b == a:
+                continue
+            index = a * size + b
+            legal = len(evader_moves[b]) - (a in evader_targets[b])
+            remaining[index] = legal + (allow_pass or legal == 0)
+            if b in captures:
+                pursuer_to_move[index] = 1
+                queue.append((a, b, True))
+
+    while queue:
+        a, b, pursuer_turn = queue.popleft()
+        if pursuer_turn:
+            # Evader-to-move positions that lead here: the evader came from a source of b, or passed
+            value = pursuer_to_move[a * size + b]
+            sources = [s for s in evader_sources[b] if s != a]
+            if evader_can_pass(a, b):
+                sources.append(b)
+            for source in sources:
+                index = a * size + source
+                if not evader_to_move[index]:
+                    remaining[index] -= 1
+                    if not remaining[index]:
+                        evader_to_move[index] = value
+                        queue.append((a, source, False))
+        else:
+            # Pursuer-to-move positions that lead here: the pursuer came from a source of a, or passed
+            value = evader_to_move[a * size + b] + 1
+            sources = [s for s in pursuer_sources[a] if s != b]
+            if allow_pass or not pursuer_moves[a]:
+                sources.append(a)
+            for source in sources:
+                index = source * size + b
+                if not pursuer_to_move[index]:
+                    pursuer_to_move[index] = value
+                    queue.append((source, b, True))
+
+    return PursuitTable(rows, cols, blocked, pursuer_moves, evader_moves, allow_pass,
+                        pursuer_to_move, evader_to_move)
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+    from piece_catalogue import ALL_PIECES
+
+    started = time.perf_counter()
+    table = solve_pursuit(8, 8, ALL_PIECES["knight"], ALL_PIECES["king"])
+    print(f"Knight hunting a king on 8x8, solved in {time.perf_counter() - started:.2f}s")
+    print("Capture time from every knight square, king on (3, 3), knight to move:")
+    print_heatmap_with_obstacles(table.pursuer_heatmap((3, 3)))
+
+    started = time.perf_counter()
+    table = solve_pursuit(12, 12, ALL_PIECES["chancellor"], ALL_PIECES["king"], [(5, 5), (6, 6)])
+    longest = table.longest_chase()
+    print(f"\nChancellor hunting a king on 12x12 with two obstacles, "
+          f"solved in {time.perf_counter() - started:.2f}s")
+    if longest:
+        moves, hunter, king = longest
+        print(f"Longest chase: {moves} moves, chancellor on {hunter}, king on {king}")
+        print(" -> ".join(f"{a}/{b}" for a, b in table.principal_line(hunter, king)))
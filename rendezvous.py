@@ -0,0 +1,119 @@
+"""
+Earliest meeting square for two pieces.
+
+Both pieces move once per turn and may wait on a square they have reached, so
+they can meet on a square s at time max(dA(s), dB(s)). The two BFS searches
+advance one layer at a time in lockstep; after layer t, a square reached by
+both pieces proves a meeting at time t, and no earlier meeting exists because
+every earlier layer was already checked. The searches stop there instead of
+exploring the whole board twice.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from board_mask import BoardMask
+
+
+def _reconstruct(parent: List[int], square: int, cols: int) -> List[Tuple[int, int]]:
+    """Follow parent links back to the start (parent -1), as in visualize_path."""
+    path = []
+    while square != -1:
+        path.append(divmod(square, cols))
+        square = parent[square]
+    return path[::-1]
+
+
+def find_rendezvous(
+    rows: int,
+    cols: int,
+    movements_a: List[Tuple[int, int]],
+    start_a: Tuple[int, int],
+    movements_b: List[Tuple[int, int]],
+    start_b: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    mask: Optional[BoardMask] = None
+) -> Optional[Dict]:
+    """
+    Find where and when two pieces can meet soonest.
+
+    Args:
+        rows, cols: Board size
+        movements_a, start_a: Movement set and starting square of the first piece
+        movements_b, start_b: Movement set and starting square of the second piece
+        obstacles: Optional list of (row, col) tuples neither piece may land on
+        mask: Optional board geometry; its holes are blocked like obstacles
+
+    Returns:
+        Dict with
+          square: the meeting square (ties: fewest total moves, then row-major)
+          time: number of turns until both pieces stand on it
+          path_a, path_b: each piece's shortest path to the square, start first;
+                          the piece with the shorter path waits there
+        or None if the pieces can never meet.
+    """
+    size = rows * cols
+    if mask is not None:
+        mask.check_size(rows, cols)
+        blocked = mask.blocked_flags(obstacles)
+    else:
+        blocked = bytearray(size)
+        for obs_row, obs_col in obstacles or ():
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                blocked[obs_row * cols + obs_col] = 1
+
+    searches = []
+    for movements, start in ((movements_a, start_a), (movements_b, start_b)):
+        if not (0 <= start[0] < rows and 0 <= start[1] < cols):
+            raise ValueError(f"Starting position {start} is outside the {rows}x{cols} board")
+        square = start[0] * cols + start[1]
+        if blocked[square]:
+            raise ValueError("Starting position is on an obstacle!")
+        moves = [(dr, dc, dr * cols + dc) for dr, dc in set(map(tuple, movements)) if (dr, dc) != (0, 0)]
+        dist = [-1] * size
+        dist[square] = 0
+        searches.append((moves, dist, [-1] * size, [square]))
+
+    (_, dist_a, parent_a, _), (_, dist_b, parent_b, _) = searches
+    candidates = [square for square in searches[1][3] if dist_a[square] != -1]
+    time = 0
+    while not candidates:
+        time += 1
+        advanced = False
+        for index, (moves, dist, parent, frontier) in enumerate(searches):
+            other = searches[1 - index][1]
+            layer = []
+            for square in frontier:
+                row, col = divmod(square, cols)
+                for dr, dc, delta in moves:
+                    if 0 <= row + dr < rows and 0 <= col + dc < cols:
+                        target = square + delta
+                        if dist[target] == -1 and not blocked[target]:
+                            dist[target] = time
+                            parent[target] = square
+                            layer.append(target)
+                            if other[target] != -1:
+                                candidates.append(target)
+            frontier[:] = layer
+            advanced = advanced or bool(layer)
+        if not advanced:
+            return None
+
+    best = min(candidates, key=lambda square: (dist_a[square] + dist_b[square], square))
+    return {
+        "square": divmod(best, cols),
+        "time": time,
+        "path_a": _reconstruct(parent_a, best, cols),
+        "path_b": _reconstruct(parent_b, best, cols),
+    }
+
+
+# Example usage
+if __name__ == "__main__":
+    from piece_catalogue import ALL_PIECES
+
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+    ox = ALL_PIECES["Flying Ox"]
+    result = find_rendezvous(8, 8, knight, (0, 1), ox, (7, 7), obstacles=[(4, 4), (3, 3)])
+    print(f"Knight from b1 and flying ox from h8 meet at {result['square']} in {result['time']} moves each")
+    print("Knight:", " -> ".join(f"({r},{c})" for r, c in result["path_a"]))
+    print("Flying ox:", " -> ".join(f"({r},{c})" for r, c in result["path_b"]))
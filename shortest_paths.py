@@ -0,0 +1,205 @@
+"""
+Shortest-path counts and the all-shortest-paths DAG, from one BFS pass.
+
+While the BFS assigns distances it also counts, for every square, how many
+distinct shortest move sequences reach it (Python ints, so counts never
+overflow), and records which offsets lead into the square from a predecessor
+one move closer to the start. Those predecessor sets are stored as one flat
+bytearray of bitmasks, one bit per distinct offset, which is enough to sample
+a uniformly random shortest path or to enumerate them all without recursion.
+"""
+
+import random
+from collections import deque
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+class ShortestPathDAG:
+    """
+    Distances, shortest-path counts and predecessor bitmasks of one BFS.
+
+    Bit i of square s's mask (stride bytes starting at s * stride) is set when
+    s - offsets[i] is a shortest-path predecessor of s.
+    """
+
+    __slots__ = ("rows", "cols", "start", "offsets", "dist", "counts", "pred", "stride")
+
+    def __init__(self, rows: int, cols: int, start: Tuple[int, int], offsets: Sequence[Tuple[int, int]],
+                 dist: List[int], counts: List[int], pred: bytearray, stride: int):
+        self.rows = rows
+        self.cols = cols
+        self.start = start
+        self.offsets = tuple(offsets)
+        self.dist = dist
+        self.counts = counts
+        self.pred = pred
+        self.stride = stride
+
+    def _index(self, square: Tuple[int, int]) -> int:
+        row, col = square
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"Square {square} is outside the {self.rows}x{self.cols} board")
+        return row * self.cols + col
+
+    def distance(self, square: Tuple[int, int]) -> int:
+        """Moves to reach square (-1 if unreachable, -2 if obstacle)."""
+        return self.dist[self._index(square)]
+
+    def count(self, square: Tuple[int, int]) -> int:
+        """Number of distinct shortest move sequences from the start to square."""
+        return self.counts[self._index(square)]
+
+    def predecessors(self, square: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Squares one move closer to the start on some shortest path to square."""
+        return [divmod(p, self.cols) for p in self._predecessors(self._index(square))]
+
+    def _predecessors(self, index: int) -> List[int]:
+        base = index * self.stride
+        mask = int.from_bytes(self.pred[base:base + self.stride], "little")
+        result = []
+        bit = 0
+        while mask:
+            if mask & 1:
+                dr, dc = self.offsets[bit]
+                result.append(index - dr * self.cols - dc)
+            mask >>= 1
+            bit += 1
+        return result
+
+    def heatmap(self) -> List[List[int]]:
+        """Distances as a list-of-lists heatmap."""
+        return [self.dist[r * self.cols:(r + 1) * self.cols] for r in range(self.rows)]
+
+    def count_grid(self) -> List[List[int]]:
+        """Shortest-path counts per square (0 where unreachable or blocked)."""
+        return [self.counts[r * self.cols:(r + 1) * self.cols] for r in range(self.rows)]
+
+    def sample_path(self, target: Tuple[int, int], rng: Optional[random.Random] = None
+                    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        A shortest path to target drawn uniformly from all of them.
+
+        Walks back from target, choosing each predecessor with probability
+        proportional to its own path count. Returns None if target is unreachable.
+        """
+        rng = rng or random
+        index = self._index(target)
+        if self.dist[index] < 0:
+            return None
+        path = [index]
+        while self.dist[index]:
+            preds = self._predecessors(index)
+            pick = rng.randrange(self.counts[index])
+            for pred in preds:
+                pick -= self.counts[pred]
+                if pick < 0:
+                    index = pred
+                    break
+            path.append(index)
+        return [divmod(square, self.cols) for square in reversed(path)]
+
+    def iter_paths(self, target: Tuple[int, int]) -> Iterator[List[Tuple[int, int]]]:
+        """
+        Enumerate every shortest path to target, start first.
+
+        Uses an explicit stack over the DAG, so memory is bounded by the path
+        length rather than the number of paths; there are count(target) of them.
+        """
+        index = self._index(target)
+        if self.dist[index] < 0:
+            return
+        if self.dist[index] == 0:
+            yield [tuple(target)]
+            return
+        # path holds squares from target back; stack[i] the untried predecessors of path[i]
+        path = [index]
+        stack = [self._predecessors(index)]
+        while stack:
+            if not stack[-1]:
+                stack.pop()
+                path.pop()
+                continue
+            square = stack[-1].pop()
+            path.append(square)
+            if self.dist[square] == 0:
+                yield [divmod(s, self.cols) for s in reversed(path)]
+                path.pop()
+            else:
+                stack.append(self._predecessors(square))
+
+
+def shortest_path_dag(
+    rows: int,
+    cols: int,
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None
+) -> ShortestPathDAG:
+    """
+    Run one BFS that records distances, shortest-path counts and predecessors.
+
+    Args:
+        rows, cols: Board size
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        start_coord: Starting position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+
+    Returns:
+        ShortestPathDAG; its distances equal generate_heatmap_with_obstacles'
+    """
+    offsets = sorted({tuple(move) for move in piece_movements
+                      if tuple(move) != (0, 0) and abs(move[0]) < rows and abs(move[1]) < cols})
+    stride = max(1, (len(offsets) + 7) // 8)
+    size = rows * cols
+    dist = [-1] * size
+    if obstacles:
+        for obs_row, obs_col in obstacles:
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                dist[obs_row * cols + obs_col] = -2
+    if not (0 <= start_coord[0] < rows and 0 <= start_coord[1] < cols):
+        raise ValueError(f"Starting position {start_coord} is outside the {rows}x{cols} board")
+    start = start_coord[0] * cols + start_coord[1]
+    if dist[start] == -2:
+        raise ValueError("Starting position is on an obstacle!")
+
+    counts = [0] * size
+    pred = bytearray(size * stride)
+    # (dr, dc, flat delta, byte position of the offset's bit, bit value)
+    moves = [(dr, dc, dr * cols + dc, bit >> 3, 1 << (bit & 7)) for bit, (dr, dc) in enumerate(offsets)]
+    dist[start] = 0
+    counts[start] = 1
+    queue = deque([start])
+    while queue:
+        square = queue.popleft()
+        row, col = divmod(square, cols)
+        next_distance = dist[square] + 1
+        paths = counts[square]
+        for dr, dc, delta, byte, bit in moves:
+            if 0 <= row + dr < rows and 0 <= col + dc < cols:
+                target = square + delta
+                if dist[target] == -1:
+                    dist[target] = next_distance
+                    queue.append(target)
+                elif dist[target] != next_distance:
+                    continue
+                counts[target] += paths
+                pred[target * stride + byte] |= bit
+    return ShortestPathDAG(rows, cols, tuple(start_coord), offsets, dist, counts, pred, stride)
+
+
+# Example usage
+if __name__ == "__main__":
+    knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+
+    dag = shortest_path_dag(8, 8, knight, (0, 0))
+    print("Knight from (0, 0): number of shortest paths to each square")
+    for row in dag.count_grid():
+        print(" ".join(f"{count:>4}" for count in row))
+    print(f"\nAll {dag.count((7, 7))} shortest paths to (7, 7):")
+    for path in dag.iter_paths((7, 7)):
+        print("  " + " -> ".join(f"({r},{c})" for r, c in path))
+
+    king = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    dag = shortest_path_dag(64, 64, king, (0, 0))
+    print(f"\nKing on 64x64, shortest paths to (63, 40): {dag.count((63, 40))}")
+    print("A uniformly random one:", dag.sample_path((63, 40), random.Random(1))[:6], "...")
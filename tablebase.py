@@ -0,0 +1,205 @@
+"""
+Precomputed distance tablebases for obstacle-free boards.
+
+A tablebase file stores, for every distinct movement set of the catalogue and
+every board size it was built for, the heatmap from every start square. Files
+are memory-mapped, so a lookup is a slice of the mapped file.
+
+File layout (all integers little-endian):
+  magic      b"CHTB"
+  version    uint16
+  reserved   uint16
+  index_len  uint32   length of the JSON index that follows
+  index      JSON     {"entries": [{"rows", "cols", "key", "names", "offset", "max_distance"}]}
+  padding    up to a 64-byte boundary
+  data       int8 distances (-1 = unreachable); an entry holds rows*cols heatmaps,
+             one per start square in row-major order, each rows*cols cells row-major
+"""
+
+import json
+import mmap
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bitboard import iter_bitboard_layers, iter_bits
+from heatmap_array import Heatmap
+from piece_catalogue import ALL_PIECES, canonical_movements, movement_key
+
+TABLEBASE_MAGIC = b"CHTB"
+TABLEBASE_VERSION = 1
+HEADER_SIZE = 12
+DATA_ALIGNMENT = 64
+
+# Board sizes built by default
+STANDARD_BOARDS = [(8, 8), (9, 9), (10, 9), (12, 12), (16, 16)]
+
+# Environment variable naming a tablebase file for the CLI to load
+TABLEBASE_ENV = "CHESS_HEATMAP_TABLEBASE"
+
+
+def _all_starts_table(rows: int, cols: int, piece_movements: Sequence[Tuple[int, int]]) -> Tuple[bytearray, int]:
+    """Distances from every start square as int8 bytes, plus the largest distance seen."""
+    cells = rows * cols
+    table = bytearray(b"\xff" * (cells * cells))  # 0xff is -1 as int8
+    max_distance = 0
+    for start in range(cells):
+        base = start * cells
+        for distance, layer in enumerate(iter_bitboard_layers(rows, cols, piece_movements, divmod(start, cols))):
+            for index in iter_bits(layer):
+                table[base + index] = distance
+            max_distance = max(max_distance, distance)
+    if max_distance > 127:
+        raise ValueError(f"Distances on a {rows}x{cols} board do not fit the tablebase format")
+    return table, max_distance
+
+
+def build_tablebase(
+    path: str,
+    board_sizes: Iterable[Tuple[int, int]] = STANDARD_BOARDS,
+    pieces: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+    verbose: bool = False
+) -> int:
+    """
+    Build a tablebase file for the given pieces (default: the whole catalogue).
+
+    Pieces whose movement sets are identical on a board share one entry.
+
+    Returns:
+        Number of entries written
+    """
+    pieces = ALL_PIECES if pieces is None else pieces
+    entries = []
+    tables = []
+    offset = 0
+    for rows, cols in board_sizes:
+        by_key: Dict[str, dict] = {}
+        for name, movements in pieces.items():
+            key = movement_key(movements, rows, cols)
+            if key in by_key:
+                by_key[key]["names"].append(name)
+                continue
+            table, max_distance = _all_starts_table(rows, cols, canonical_movements(movements, rows, cols))
+            entry = {"rows": rows, "cols": cols, "key": key, "names": [name],
+                     "offset": offset, "max_distance": max_distance}
+            by_key[key] = entry
+            entries.append(entry)
+            tables.append(table)
+            offset += len(table)
+        if verbose:
+            print(f"  {rows}x{cols}: {len(by_key)} distinct movement sets")
+
+    index = json.dumps({"entries": entries}, separators=(",", ":")).encode("utf-8")
+    data_start = HEADER_SIZE + len(index)
+    padding = -data_start % DATA_ALIGNMENT
+    with open(path, "wb") as f:
+        f.write(TABLEBASE_MAGIC)
+        f.write(TABLEBASE_VERSION.to_bytes(2, "little"))
+        f.write(b"\x00\x00")
+        f.write(len(index).to_bytes(4, "little"))
+        f.write(index)
+        f.write(b"\x00" * padding)
+        for table in tables:
+            f.write(table)
+    return len(entries)
+
+
+class TableBase:
+    """Read-only, memory-mapped tablebase file."""
+
+    __slots__ = ("path", "entries", "_file", "_mmap", "_data_start", "_offsets")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = self._file.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or header[:4] != TABLEBASE_MAGIC:
+                raise ValueError(f"{path} is not a tablebase file")
+            version = int.from_bytes(header[4:6], "little")
+            if version != TABLEBASE_VERSION:
+                raise ValueError(f"Unsupported tablebase version {version} (expected {TABLEBASE_VERSION})")
+            index_len = int.from_bytes(header[8:12], "little")
+            self.entries = json.loads(self._file.read(index_len).decode("utf-8"))["entries"]
+            data_start = HEADER_SIZE + index_len
+            self._data_start = data_start + (-data_start % DATA_ALIGNMENT)
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._offsets = {(e["rows"], e["cols"], e["key"]): self._data_start + e["offset"]
+                         for e in self.entries}
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "TableBase":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def boards(self) -> List[Tuple[int, int]]:
+        return sorted({(e["rows"], e["cols"]) for e in self.entries})
+
+    def _cell_offset(self, piece_movements, rows, cols, start_coord) -> Optional[int]:
+        base = self._offsets.get((rows, cols, _cached_key(tuple(map(tuple, piece_movements)), rows, cols)))
+        if base is None or not (0 <= start_coord[0] < rows and 0 <= start_coord[1] < cols):
+            return None
+        cells = rows * cols
+        return base + (start_coord[0] * cols + start_coord[1]) * cells
+
+    def lookup_view(self, piece_movements: List[Tuple[int, int]], rows: int, cols: int,
+                    start_coord: Tuple[int, int]) -> Optional[memoryview]:
+        """
+        Zero-copy view of the heatmap as signed bytes, shape (rows, cols).
+
+        Returns None if the movement set or board size is not in the tablebase.
+        Release the view before closing the tablebase.
+        """
+        offset = self._cell_offset(piece_movements, rows, cols, start_coord)
+        if offset is None:
+            return None
+        return memoryview(self._mmap)[offset:offset + rows * cols].cast("b", (rows, cols))
+
+    def lookup(self, piece_movements: List[Tuple[int, int]], rows: int, cols: int,
+               start_coord: Tuple[int, int]) -> Optional[List[List[int]]]:
+        """Heatmap as a fresh list of lists, or None if not in the tablebase."""
+        view = self.lookup_view(piece_movements, rows, cols, start_coord)
+        if view is None:
+            return None
+        with view:
+            return view.tolist()
+
+    def lookup_heatmap(self, piece_movements: List[Tuple[int, int]], rows: int, cols: int,
+                       start_coord: Tuple[int, int]) -> Optional[Heatmap]:
+        """Heatmap as a flat heatmap_array.Heatmap, or None if not in the tablebase."""
+        offset = self._cell_offset(piece_movements, rows, cols, start_coord)
+        if offset is None:
+            return None
+        with memoryview(self._mmap)[offset:offset + rows * cols] as view, view.cast("b") as cells:
+            return Heatmap.from_flat(rows, cols, cells.tolist())
+
+
+@lru_cache(maxsize=4096)
+def _cached_key(piece_movements: Tuple[Tuple[int, int], ...], rows: int, cols: int) -> str:
+    return movement_key(piece_movements, rows, cols)
+
+
+def open_default_tablebase() -> Optional[TableBase]:
+    """Open the tablebase named by $CHESS_HEATMAP_TABLEBASE, if set."""
+    path = os.environ.get(TABLEBASE_ENV)
+    return TableBase(path) if path else None
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import time
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "pieces.chtb"
+    started = time.perf_counter()
+    print(f"Building {target}...")
+    count = build_tablebase(target, verbose=True)
+    print(f"{count} entries, {os.path.getsize(target) / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
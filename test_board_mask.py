@@ -0,0 +1,93 @@
+import random
+import unittest
+from bitboard import bitboard_heatmap
+from board_mask import BoardMask, generate_heatmap_masked, xiangqi_palace_mask
+from heatmap import generate_heatmap, iter_heatmap_layers
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from exotic_pieces import get_piece_movements
+from pursuit import solve_pursuit
+from rendezvous import find_rendezvous
+from route_planner import RoutePlanner
+from timed_obstacles import patrol_schedule
+from weighted_heatmap import generate_weighted_heatmap, slide_distance_cost
+
+class TestBoardMask(unittest.TestCase):
+    
+    def test_bitboard_matches_deque_bfs(self):
+        """Test the bitboard engine against the reference BFS on random boards"""
+        rng = random.Random(7)
+        pieces = get_piece_movements()
+        for name in ["knight", "king", "shogi_lance", "nightrider", "xiangqi_soldier_promoted"]:
+            for _ in range(5):
+                rows, cols = rng.randint(1, 12), rng.randint(1, 12)
+                grid = [[0] * cols for _ in range(rows)]
+                start = (rng.randrange(rows), rng.randrange(cols))
+                obstacles = [(rng.randrange(rows), rng.randrange(cols)) for _ in range(rows * cols // 5)]
+                obstacles = [o for o in obstacles if o != start]
+                expected = generate_heatmap_with_obstacles(grid, pieces[name], start, obstacles)
+                mask = BoardMask.from_obstacles(rows, cols, obstacles)
+                self.assertEqual(bitboard_heatmap(rows, cols, pieces[name], start, mask.bits), expected)
+                self.assertEqual(generate_heatmap_with_obstacles(grid, pieces[name], start, mask=mask), expected)
+                if not obstacles:
+                    self.assertEqual(bitboard_heatmap(rows, cols, pieces[name], start),
+                                     generate_heatmap(grid, pieces[name], start))
+                    
+    def test_palace_confines_general(self):
+        """Test xiangqi general restricted to its palace"""
+        general = get_piece_movements()["xiangqi_general"]
+        heatmap = generate_heatmap_masked(xiangqi_palace_mask(), general, (0, 4))
+        self.assertEqual(heatmap[2][3], 3)
+        self.assertEqual(heatmap[0][2], -2)  # Outside the palace
+        self.assertEqual(heatmap[8][4], -1)  # Other palace, never reachable
+        self.assertEqual(sum(1 for row in heatmap for cell in row if cell >= 0), 9)
+        
+    def test_masks_from_strings_and_bytes(self):
+        """Test text and bit-packed mask representations"""
+        mask = BoardMask.from_strings(["..#", "#..", "..."])
+        self.assertEqual((mask.rows, mask.cols, mask.count()), (3, 3, 7))
+        self.assertEqual(mask.holes(), [(0, 2), (1, 0)])
+        self.assertEqual(BoardMask.from_bytes(3, 3, mask.to_bytes()), mask)
+        self.assertEqual(mask.to_strings(), ["..#", "#..", "..."])
+        self.assertEqual(mask.nearest_open(1, 0), (0, 0))
+        with self.assertRaises(ValueError):
+            BoardMask.from_strings(["..", "..."])
+            
+    def test_searches_accept_masks(self):
+        """Test every search that takes a mask matches passing its holes as obstacles"""
+        pieces = get_piece_movements()
+        knight, king = pieces["knight"], pieces["king"]
+        mask = BoardMask.from_strings(["......", ".#....", "...#..", "#.....", "....#."])
+        obstacles = [(0, 5)]
+        blocked = obstacles + mask.holes()
+        grid = [[0] * 6 for _ in range(5)]
+        
+        expected = list(iter_heatmap_layers(grid, knight, (0, 0), blocked, 3))
+        layers = list(iter_heatmap_layers(None, knight, (0, 0), obstacles, 3, mask=mask))
+        self.assertEqual([(d, sorted(squares)) for d, squares in layers],
+                         [(d, sorted(squares)) for d, squares in expected])
+        with self.assertRaises(ValueError):
+            list(iter_heatmap_layers(None, knight, (1, 1), mask=mask))
+        
+        self.assertEqual(generate_weighted_heatmap(None, knight, (0, 0), obstacles, slide_distance_cost, mask=mask),
+                         generate_weighted_heatmap(grid, knight, (0, 0), blocked, slide_distance_cost))
+        self.assertEqual(solve_pursuit(5, 6, knight, king, obstacles, mask=mask).pursuer_heatmap((4, 5)),
+                         solve_pursuit(5, 6, knight, king, blocked).pursuer_heatmap((4, 5)))
+        self.assertEqual(find_rendezvous(5, 6, knight, (0, 0), king, (4, 5), obstacles, mask),
+                         find_rendezvous(5, 6, knight, (0, 0), king, (4, 5), blocked))
+        self.assertEqual(RoutePlanner(5, 6, knight, obstacles, mask).plan((0, 0), [(4, 5), (2, 2)]).path,
+                         RoutePlanner(5, 6, knight, blocked).plan((0, 0), [(4, 5), (2, 2)]).path)
+        self.assertEqual(patrol_schedule(5, 6, [[(2, 0), (2, 1)]], obstacles, mask),
+                         patrol_schedule(5, 6, [[(2, 0), (2, 1)]], blocked))
+        self.assertEqual(list(mask.blocked_flags(obstacles)),
+                         [int((r, c) in blocked) for r in range(5) for c in range(6)])
+        with self.assertRaises(ValueError):
+            RoutePlanner(6, 6, knight, mask=mask)
+            
+    def test_start_on_hole_rejected(self):
+        mask = BoardMask.from_strings(["#."])
+        with self.assertRaises(ValueError):
+            generate_heatmap_masked(mask, [(0, 1)], (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import test_env  # noqa: F401 (pins the engine cost model path)
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+import engine_dispatch
+from engine_dispatch import (ENGINES, SEARCH_ENGINES, CostModel, QueryShape, _least_squares, choose_engine,
+                             dispatch_heatmap, last_choice, load_cost_model, run_engine, set_cost_model,
+                             set_engine_debug, use_engine)
+from exotic_pieces import get_piece_movements
+from heatmap import generate_heatmap, use_tablebase
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from tablebase import TableBase, build_tablebase
+
+
+class TestEngineDispatch(unittest.TestCase):
+    
+    def setUp(self):
+        self.movements = get_piece_movements()
+        self.saved_model = engine_dispatch._model
+        set_cost_model(CostModel())
+        
+    def tearDown(self):
+        use_engine(None)
+        use_tablebase(None)
+        set_engine_debug(False)
+        set_cost_model(self.saved_model)
+        
+    def test_engines_agree(self):
+        """Test every search engine gives the same heatmap"""
+        rng = random.Random(2)
+        squares = [(r, c) for r in range(9) for c in range(7)]
+        for name, movements in self.movements.items():
+            start, *obstacles = rng.sample(squares, rng.randint(1, 15))
+            with self.subTest(piece=name):
+                results = [run_engine(engine, 9, 7, movements, start, obstacles) for engine in SEARCH_ENGINES]
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(results[0], results[2])
+                
+    def test_forced_engine(self):
+        """Test use_engine overrides the cost model and is reported"""
+        grid = [[0] * 8 for _ in range(8)]
+        expected = generate_heatmap(grid, self.movements["knight"], (0, 0))
+        for engine in SEARCH_ENGINES:
+            use_engine(engine)
+            self.assertEqual(generate_heatmap_with_obstacles(grid, self.movements["knight"], (0, 0)), expected)
+            self.assertEqual(last_choice().engine, engine)
+        with self.assertRaises(ValueError):
+            use_engine("teleport")
+        use_engine("lookup")
+        with self.assertRaises(ValueError):
+            generate_heatmap(grid, self.movements["knight"], (0, 0))
+            
+    def test_choice_follows_cost_model(self):
+        """Test the engine with the lowest estimate is chosen"""
+        model = CostModel({"lookup": [1.0, 0.0], "deque": [0.0, 1e-6], "frontier": [0.0, 2e-6],
+                           "bitboard": [0.0, 1e-6, 0.0]})
+        set_cost_model(model)
+        # Many long-range offsets, few layers: bitboard
+        choice = choose_engine(64, 64, self.movements["amazon"])
+        self.assertEqual(choice.engine, "bitboard")
+        self.assertEqual(set(choice.estimates), set(SEARCH_ENGINES))
+        self.assertIn("64x64", choice.reason)
+        # One short offset, many layers: deque
+        self.assertEqual(choose_engine(64, 64, [(0, 1)]).engine, "deque")
+        # Lookup only competes for obstacle-free queries it can answer
+        self.assertNotIn("lookup", choose_engine(8, 8, [(0, 1)], lookup_available=True, obstacles=[(1, 1)]).estimates)
+        self.assertIn("lookup", choose_engine(8, 8, [(0, 1)], lookup_available=True).estimates)
+        
+    def test_query_features(self):
+        """Test offsets, reach and density of a query"""
+        query = QueryShape(10, 10, [(0, 1), (0, 1), (0, 0), (0, 12), (3, -2)], [(1, 1), (1, 1), (2, 2)])
+        self.assertEqual((query.offsets, query.reach, query.obstacles), (2, 3, 2))
+        self.assertAlmostEqual(query.density, 0.02)
+        for engine in ENGINES:
+            self.assertEqual(len(query.features(engine)), len(engine_dispatch.DEFAULT_COEFFICIENTS[engine]))
+            
+    def test_tablebase_lookup(self):
+        """Test tablebase hits use the lookup engine and misses fall back to a search"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tb.chtb")
+            build_tablebase(path, [(6, 6)], {"knight": self.movements["knight"]})
+            set_cost_model(CostModel({"lookup": [0.0, 0.0], "deque": [1.0, 0.0], "frontier": [2.0, 0.0],
+                                      "bitboard": [3.0, 0.0, 0.0]}))
+            with TableBase(path) as tb:
+                use_tablebase(tb)
+                expected = run_engine("deque", 6, 6, self.movements["knight"], (2, 3))
+                self.assertEqual(dispatch_heatmap(6, 6, self.movements["knight"], (2, 3)), expected)
+                self.assertEqual(last_choice().engine, "lookup")
+                dispatch_heatmap(7, 7, self.movements["knight"], (2, 3))
+                self.assertEqual(last_choice().engine, "deque")
+                self.assertIn("no entry", last_choice().reason)
+                use_tablebase(None)
+                
+    def test_debug_report(self):
+        """Test the debug flag reports the engine and the reason"""
+        set_engine_debug(True)
+        output = io.StringIO()
+        with contextlib.redirect_stderr(output):
+            dispatch_heatmap(8, 8, self.movements["king"], (0, 0))
+        self.assertIn(f"[engine] {last_choice().engine}:", output.getvalue())
+        self.assertIn("estimate", output.getvalue())
+        
+    def test_least_squares(self):
+        """Test the fit recovers exact coefficients and drops negative ones"""
+        samples = [[1.0, x, x * x] for x in range(1, 8)]
+        times = [2.0 + 3.0 * x + 0.5 * x * x for x in range(1, 8)]
+        for got, expected in zip(_least_squares(samples, times), [2.0, 3.0, 0.5]):
+            self.assertAlmostEqual(got, expected, places=6)
+        self.assertEqual(_least_squares([[1.0, x] for x in range(1, 5)], [5.0 - x for x in range(1, 5)])[1], 0.0)
+        
+    def test_cost_model_storage(self):
+        """Test calibrated models round-trip through JSON and stale ones are rejected"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sub", "model.json")
+            model = CostModel({"lookup": [1, 2], "deque": [3, 4], "frontier": [5, 6], "bitboard": [7, 8, 9]})
+            model.save(path)
+            loaded = load_cost_model(path, calibrate_missing=False)
+            self.assertTrue(loaded.calibrated)
+            self.assertEqual(loaded.coefficients, model.coefficients)
+            with open(path) as f:
+                data = json.load(f)
+            data["version"] = 0
+            with open(path, "w") as f:
+                json.dump(data, f)
+            self.assertFalse(load_cost_model(path, calibrate_missing=False).calibrated)
+            
+    def test_calibrate(self):
+        """Test the micro-benchmark fits non-negative coefficients for every engine"""
+        model = engine_dispatch.calibrate(repeats=1)
+        self.assertTrue(model.calibrated)
+        for engine in ENGINES:
+            self.assertEqual(len(model.coefficients[engine]), len(engine_dispatch.DEFAULT_COEFFICIENTS[engine]))
+            self.assertTrue(all(c >= 0 for c in model.coefficients[engine]))
+            self.assertGreater(sum(model.coefficients[engine]), 0)
+        
+    def test_no_implicit_calibration(self):
+        """Test a first query uses the defaults without benchmarking or writing a model"""
+        path = engine_dispatch.default_cost_model_path()
+        self.assertFalse(path.startswith(os.path.expanduser(os.path.join("~", ".cache"))))
+        saved_calibrate = engine_dispatch.calibrate
+        engine_dispatch.calibrate = None  # any call would fail
+        try:
+            set_cost_model(None)
+            generate_heatmap([[0] * 6 for _ in range(6)], self.movements["knight"], (0, 0))
+        finally:
+            engine_dispatch.calibrate = saved_calibrate
+        self.assertFalse(engine_dispatch._model.calibrated)
+        self.assertFalse(os.path.exists(path))
+        
+    def test_calibrate_and_save(self):
+        """Test explicit calibration stores the model and uses it"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            model = engine_dispatch.calibrate_and_save(path, repeats=1)
+            self.assertIs(engine_dispatch._model, model)
+            self.assertTrue(load_cost_model(path).calibrated)
+
+
+if __name__ == "__main__":
+    unittest.main()
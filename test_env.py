@@ -0,0 +1,12 @@
+"""
+Test setup for the calibration tests, imported first by their module.
+
+Points the engine cost model at a path inside a private temporary directory,
+so calibrating in tests never reads or writes ~/.cache/chess_heatmap.
+"""
+
+import os
+import tempfile
+
+_directory = tempfile.TemporaryDirectory(prefix="chess_heatmap_tests_")
+os.environ["CHESS_HEATMAP_COST_MODEL"] = os.path.join(_directory.name, "cost_model.json")
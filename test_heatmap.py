@@ -1,5 +1,5 @@
 import unittest
-from heatmap import generate_heatmap, print_heatmap
+from heatmap import generate_heatmap, iter_heatmap_layers, print_heatmap
 
 class TestHeatmapGenerator(unittest.TestCase):
     
@@ -85,6 +85,38 @@ class TestHeatmapGenerator(unittest.TestCase):
         self.assertEqual(heatmap[0][2], 1)  # 2 up
         self.assertEqual(heatmap[1][1], 2)  # Diagonal
 
+    def test_layers_match_heatmap(self):
+        """Test streamed BFS layers reproduce the full heatmap"""
+        grid = [[0] * 8 for _ in range(8)]
+        knight_moves = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+        heatmap = generate_heatmap(grid, knight_moves, (0, 0))
+        
+        seen = 0
+        for distance, squares in iter_heatmap_layers(grid, knight_moves, (0, 0)):
+            for row, col in squares:
+                self.assertEqual(heatmap[row][col], distance)
+            seen += len(squares)
+        self.assertEqual(seen, 64)
+        
+    def test_layers_max_moves(self):
+        """Test the max_moves cutoff and obstacles in the layer generator"""
+        grid = [[0] * 8 for _ in range(8)]
+        king_moves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        layers = list(iter_heatmap_layers(grid, king_moves, (0, 0), obstacles=[(1, 1)], max_moves=2))
+        
+        self.assertEqual([distance for distance, _ in layers], [0, 1, 2])
+        self.assertEqual(sorted(layers[1][1]), [(0, 1), (1, 0)])
+        self.assertNotIn((1, 1), layers[2][1])
+        
+    def test_layers_stop_early(self):
+        """Test callers can stop after the first layer containing a target"""
+        grid = [[0] * 50 for _ in range(50)]
+        wazir_moves = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        for distance, squares in iter_heatmap_layers(grid, wazir_moves, (0, 0)):
+            if (2, 3) in squares:
+                break
+        self.assertEqual(distance, 5)
+
 
 def run_visual_tests():
     """Run visual tests to see the heatmaps"""
@@ -0,0 +1,54 @@
+import pickle
+import unittest
+from heatmap import generate_heatmap
+from heatmap_array import Heatmap, compute_heatmap
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+
+class TestHeatmapArray(unittest.TestCase):
+    
+    def setUp(self):
+        self.knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+        self.king = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+        
+    def test_matches_list_engines(self):
+        """Test compute_heatmap equals the list-of-lists engines"""
+        grid = [[0] * 7 for _ in range(5)]
+        for movements in (self.knight, self.king):
+            self.assertEqual(compute_heatmap(5, 7, movements, (1, 2)),
+                             generate_heatmap(grid, movements, (1, 2)))
+            obstacles = [(0, 0), (2, 2), (3, 4)]
+            self.assertEqual(compute_heatmap(5, 7, movements, (1, 2), obstacles).tolist(),
+                             generate_heatmap_with_obstacles(grid, movements, (1, 2), obstacles))
+            
+    def test_row_access_and_buffer(self):
+        """Test row views share memory with the flat buffer"""
+        heatmap = compute_heatmap(3, 4, self.king, (0, 0))
+        self.assertEqual(len(heatmap), 3)
+        self.assertEqual(heatmap[2][3], 3)
+        self.assertEqual(heatmap[2, 3], 3)
+        heatmap[1][1] = 9
+        self.assertEqual(heatmap[1, 1], 9)
+        view = heatmap.view2d()
+        self.assertEqual(view.shape, (3, 4))
+        self.assertEqual(view[1, 1], 9)
+        self.assertEqual(memoryview(heatmap).nbytes, 12 * heatmap.itemsize)
+        
+    def test_aggregates(self):
+        """Test reachable count, max distance and histogram"""
+        heatmap = compute_heatmap(8, 8, self.knight, (0, 0), [(1, 2)])
+        flat = [cell for row in heatmap.tolist() for cell in row]
+        self.assertEqual(heatmap.reachable_count(), sum(1 for cell in flat if cell >= 0))
+        self.assertEqual(heatmap.max_distance(), max(flat))
+        histogram = heatmap.histogram()
+        self.assertEqual(sum(histogram), heatmap.reachable_count())
+        self.assertEqual(histogram[0], 1)
+        
+    def test_round_trips(self):
+        """Test pickling and list conversion keep shape and values"""
+        heatmap = compute_heatmap(4, 6, self.knight, (3, 5))
+        self.assertEqual(pickle.loads(pickle.dumps(heatmap)), heatmap)
+        self.assertEqual(Heatmap.from_rows(heatmap.tolist()), heatmap)
+        self.assertEqual(pickle.loads(pickle.dumps(heatmap)).shape, (4, 6))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from heatmap import generate_heatmap
+from heatmap_export import export_npy, load_npy, export_raw, load_raw, export_csv, export_heatmap
+
+class TestHeatmapExport(unittest.TestCase):
+    
+    def setUp(self):
+        grid = [[0] * 6 for _ in range(5)]
+        knight_moves = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+        self.heatmap = generate_heatmap(grid, knight_moves, (0, 0))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+        
+    def test_npy_round_trip(self):
+        """Test .npy header is 64-byte aligned and data reads back"""
+        for dtype in ("int8", "int16", "int32", "int64"):
+            path = self.path(f"knight_{dtype}.npy")
+            export_npy(self.heatmap, path, dtype)
+            with open(path, "rb") as f:
+                data = f.read()
+            header_len = int.from_bytes(data[8:10], "little")
+            self.assertEqual((10 + header_len) % 64, 0)
+            self.assertEqual(load_npy(path), self.heatmap)
+            
+    def test_raw_round_trip(self):
+        """Test raw binary export with JSON sidecar"""
+        path = self.path("knight.bin")
+        sidecar = export_raw(self.heatmap, path, "int16")
+        self.assertTrue(os.path.exists(sidecar))
+        self.assertEqual(os.path.getsize(path), 5 * 6 * 2)
+        self.assertEqual(load_raw(path), self.heatmap)
+        
+    def test_csv_export(self):
+        """Test CSV export writes one line per board row"""
+        path = self.path("knight.csv")
+        export_csv(self.heatmap, path)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[0].split(","), [str(cell) for cell in self.heatmap[0]])
+        
+    def test_format_inferred_from_extension(self):
+        """Test export_heatmap picks the format from the file name"""
+        export_heatmap(self.heatmap, self.path("a.npy"))
+        self.assertEqual(load_npy(self.path("a.npy")), self.heatmap)
+        with self.assertRaises(ValueError):
+            export_heatmap(self.heatmap, self.path("a.txt"), "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from heatmap import generate_heatmap
+from heatmap_server import HeatmapServer, LatencyHistogram, parse_address
+
+async def http_get(port, target):
+    """Issue a GET request to the local server and return (status, json body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, body = response.split(b"\r\n\r\n", 1)
+    status = int(head.split(b" ")[1])
+    return status, json.loads(body)
+
+
+class TestHeatmapServer(unittest.TestCase):
+    
+    def run_with_server(self, scenario, executor=None):
+        async def runner():
+            server = HeatmapServer(port=0, executor=executor or ThreadPoolExecutor(2))
+            await server.start()
+            try:
+                return await scenario(server)
+            finally:
+                await server.close()
+        return asyncio.run(runner())
+        
+    def test_heatmap_endpoint(self):
+        """Test heatmap endpoint matches generate_heatmap"""
+        async def scenario(server):
+            return await http_get(server.port, "/heatmap?piece=knight&size=6&position=0,0")
+        status, body = self.run_with_server(scenario)
+        
+        grid = [[0] * 6 for _ in range(6)]
+        knight_moves = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+        self.assertEqual(status, 200)
+        self.assertEqual(body["heatmap"], generate_heatmap(grid, knight_moves, (0, 0)))
+        self.assertEqual(body["reachable"], 36)
+        
+    def test_path_and_errors(self):
+        """Test path endpoint and error statuses"""
+        async def scenario(server):
+            path = await http_get(server.port, "/path?piece=king&start=a1&target=c3")
+            unknown = await http_get(server.port, "/heatmap?piece=nosuchpiece")
+            missing = await http_get(server.port, "/path?piece=king&start=a1")
+            route = await http_get(server.port, "/nowhere")
+            return path, unknown, missing, route
+        path, unknown, missing, route = self.run_with_server(scenario)
+        
+        self.assertEqual(path[0], 200)
+        self.assertEqual(path[1]["moves"], 2)
+        self.assertEqual(path[1]["path"][0], [0, 0])
+        self.assertEqual(unknown[0], 404)
+        self.assertEqual(missing[0], 400)
+        self.assertEqual(route[0], 404)
+        
+    def test_identical_requests_are_coalesced(self):
+        """Test concurrent identical requests share one computation"""
+        gate = threading.Event()
+        executor = ThreadPoolExecutor(1)
+        executor.submit(gate.wait)  # Occupy the only worker until all requests arrived
+        
+        async def scenario(server):
+            target = "/heatmap?piece=amazon&size=10&position=3,3"
+            requests = [asyncio.ensure_future(http_get(server.port, target)) for _ in range(4)]
+            for _ in range(200):
+                if server.stats["coalesced"] == 3:
+                    break
+                await asyncio.sleep(0.01)
+            gate.set()
+            results = await asyncio.gather(*requests)
+            _, metrics = await http_get(server.port, "/metrics")
+            return results, metrics
+        results, metrics = self.run_with_server(scenario, executor)
+        
+        self.assertEqual(metrics["stats"]["computations"], 1)
+        self.assertEqual(metrics["stats"]["coalesced"], 3)
+        self.assertTrue(all(body == results[0][1] for _, body in results))
+        self.assertEqual(metrics["latency"]["/heatmap"]["count"], 4)
+        
+    def test_latency_histogram(self):
+        """Test latency observations land in the right buckets"""
+        hist = LatencyHistogram()
+        hist.observe(0.0005)
+        hist.observe(0.003)
+        hist.observe(60)
+        snapshot = hist.snapshot()
+        self.assertEqual(snapshot["count"], 3)
+        self.assertEqual(snapshot["buckets"]["le_1ms"], 1)
+        self.assertEqual(snapshot["buckets"]["le_5ms"], 1)
+        self.assertEqual(snapshot["buckets"]["inf"], 1)
+        
+    def test_parse_address(self):
+        self.assertEqual(parse_address("0.0.0.0:9000"), ("0.0.0.0", 9000))
+        self.assertEqual(parse_address("9000"), ("127.0.0.1", 9000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import random
+import unittest
+from board_mask import xiangqi_palace_mask
+from heatmap_with_obstacles import generate_heatmap_with_obstacles, generate_reverse_heatmap
+from exotic_pieces import get_piece_movements
+
+class TestReverseHeatmap(unittest.TestCase):
+    
+    def setUp(self):
+        movements = get_piece_movements()
+        self.asymmetric = [movements[name] for name in ["shogi_lance", "shogi_knight", "xiangqi_soldier"]]
+        
+    def brute_force(self, grid, movements, target, obstacles):
+        """Distance-to-target by one forward search per start square"""
+        rows, cols = len(grid), len(grid[0])
+        blocked = set(obstacles)
+        result = [[-2 if (r, c) in blocked else -1 for c in range(cols)] for r in range(rows)]
+        for r in range(rows):
+            for c in range(cols):
+                if (r, c) not in blocked:
+                    result[r][c] = generate_heatmap_with_obstacles(grid, movements, (r, c), obstacles)[target[0]][target[1]]
+        return result
+        
+    def test_matches_forward_searches(self):
+        """Test one reverse BFS equals a forward BFS from every square"""
+        rng = random.Random(7)
+        grid = [[0] * 6 for _ in range(7)]
+        for movements in self.asymmetric:
+            obstacles = rng.sample([(r, c) for r in range(7) for c in range(6) if (r, c) != (3, 2)], 6)
+            self.assertEqual(generate_reverse_heatmap(grid, movements, (3, 2), obstacles),
+                             self.brute_force(grid, movements, (3, 2), obstacles))
+            
+    def test_differs_from_forward_for_lance(self):
+        grid = [[0] * 5 for _ in range(5)]
+        lance = self.asymmetric[0]
+        reverse = generate_reverse_heatmap(grid, lance, (4, 2))
+        forward = generate_heatmap_with_obstacles(grid, lance, (4, 2))
+        self.assertEqual(reverse[0][2], 1)
+        self.assertEqual(forward[0][2], -1)
+        
+    def test_mask_and_target_on_obstacle(self):
+        general = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        heatmap = generate_reverse_heatmap(None, general, (0, 3), mask=xiangqi_palace_mask())
+        self.assertEqual(heatmap[2][5], 4)
+        with self.assertRaises(ValueError):
+            generate_reverse_heatmap([[0] * 4 for _ in range(4)], general, (1, 1), [(1, 1)])
+
+if __name__ == "__main__":
+    unittest.main()
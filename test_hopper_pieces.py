@@ -0,0 +1,113 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from heatmap_with_obstacles import generate_heatmap_with_obstacles, generate_reverse_heatmap
+from hopper_pieces import HOPPER_PIECES, ScreenTables, capture_squares, generate_hopper_heatmap
+from board_mask import BoardMask
+import chess_heatmap_cli
+
+def walk_ray(rows, cols, blocked, row, col, dr, dc):
+    """Squares along a ray, walked one at a time"""
+    squares = []
+    row, col = row + dr, col + dc
+    while 0 <= row < rows and 0 <= col < cols:
+        squares.append((row, col, (row, col) in blocked))
+        row, col = row + dr, col + dc
+    return squares
+
+class TestHopperPieces(unittest.TestCase):
+    
+    def setUp(self):
+        self.rng = random.Random(11)
+        
+    def random_board(self, rows, cols, count):
+        squares = [(r, c) for r in range(rows) for c in range(cols)]
+        return self.rng.sample(squares, count)
+        
+    def test_tables_match_ray_walks(self):
+        """Test screen tables and move lists against walking each ray"""
+        rows, cols = 7, 9
+        for _ in range(10):
+            obstacles = self.random_board(rows, cols, 12)
+            blocked = set(obstacles)
+            tables = ScreenTables.build(rows, cols, HOPPER_PIECES["grasshopper"].directions, obstacles)
+            rook_tables = ScreenTables.build(rows, cols, HOPPER_PIECES["xiangqi_cannon"].directions, obstacles)
+            for row in range(rows):
+                for col in range(cols):
+                    hops, slides, captures = set(), set(), set()
+                    for dr, dc in tables.directions:
+                        ray = walk_ray(rows, cols, blocked, row, col, dr, dc)
+                        screens = [i for i, (_, _, b) in enumerate(ray) if b]
+                        if screens and screens[0] + 1 < len(ray) and not ray[screens[0] + 1][2]:
+                            hops.add(ray[screens[0] + 1][:2])
+                        if dr == 0 or dc == 0:
+                            stop = screens[0] if screens else len(ray)
+                            slides.update(square[:2] for square in ray[:stop])
+                            if len(screens) > 1:
+                                captures.add(ray[screens[1]][:2])
+                    square = row * cols + col
+                    self.assertEqual({divmod(s, cols) for s in tables.moves("grasshopper", square)}, hops)
+                    self.assertEqual({divmod(s, cols) for s in rook_tables.moves("cannon", square)}, slides)
+                    self.assertEqual(set(capture_squares(rows, cols, HOPPER_PIECES["xiangqi_cannon"],
+                                                         (row, col), obstacles)), captures)
+                    
+    def test_grasshopper_needs_screens(self):
+        grasshopper = HOPPER_PIECES["grasshopper"]
+        heatmap = generate_hopper_heatmap(5, 5, grasshopper, (0, 0))
+        self.assertEqual(sum(1 for row in heatmap for cell in row if cell >= 0), 1)
+        heatmap = generate_hopper_heatmap(5, 5, grasshopper, (0, 0), [(0, 3)])
+        self.assertEqual(heatmap[0][4], 1)
+        self.assertEqual(heatmap[0][3], -2)
+        
+    def test_cannon_stops_at_first_blocker(self):
+        grid = [[0] * 9 for _ in range(10)]
+        heatmap = generate_heatmap_with_obstacles(grid, HOPPER_PIECES["xiangqi_cannon"], (0, 0), [(0, 3)])
+        self.assertEqual(heatmap[0][2], 1)
+        self.assertEqual(heatmap[0][4], 3)  # around the blocker, never over it
+        self.assertEqual(capture_squares(10, 9, HOPPER_PIECES["xiangqi_cannon"], (0, 0), [(0, 3), (0, 7)]),
+                         [(0, 7)])
+        with self.assertRaises(ValueError):
+            generate_reverse_heatmap(grid, HOPPER_PIECES["xiangqi_cannon"], (0, 0))
+    
+    def run_cli(self, *argv):
+        """Rows of the heatmap the CLI prints"""
+        saved = sys.argv
+        sys.argv = ["chess_heatmap_cli.py", *argv, "--no-legend"]
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                chess_heatmap_cli.main()
+        finally:
+            sys.argv = saved
+        return [line.split() for line in output.getvalue().splitlines() if line.startswith("  ")]
+        
+    def test_mask_holes_are_screens(self):
+        """Test holes act as screens with or without explicit obstacles, in the library and the CLI"""
+        mask = BoardMask.from_strings([".....", ".....", "..#..", ".....", "....."])
+        cannon = HOPPER_PIECES["xiangqi_cannon"]
+        heatmap = generate_heatmap_with_obstacles(None, cannon, (2, 0), mask=mask)
+        self.assertEqual(heatmap[2], [0, 1, -2, 3, 3])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "board.txt")
+            with open(path, "w") as f:
+                f.write(".....\n.....\n..#..\n.....\n.....\n")
+            holes_only = self.run_cli("xiangqi_cannon", "--board", path, "-p", "2,0")
+            with_obstacle = self.run_cli("xiangqi_cannon", "--board", path, "-p", "2,0", "-o", "4,4")
+        self.assertEqual(holes_only[2], ["0", "1", "X", "3", "3"])
+        # An unrelated obstacle changes only its own square
+        self.assertEqual(with_obstacle[2], holes_only[2])
+        self.assertEqual(with_obstacle[4][:4], holes_only[4][:4])
+        
+    def test_open_board_uses_plain_offsets(self):
+        """Test screen rules only switch on when the board has screens"""
+        self.assertIsNone(chess_heatmap_cli.screen_movement("xiangqi_cannon", None, BoardMask.full(5, 5)))
+        self.assertIsNone(chess_heatmap_cli.screen_movement("xiangqi_cannon", None, None))
+        self.assertIs(chess_heatmap_cli.screen_movement("xiangqi_cannon", [(1, 1)], None),
+                      HOPPER_PIECES["xiangqi_cannon"])
+
+if __name__ == "__main__":
+    unittest.main()
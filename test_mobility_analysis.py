@@ -0,0 +1,54 @@
+import unittest
+from heatmap import generate_heatmap
+from mobility_analysis import piece_mobility, mobility_report, parse_board_sizes
+from exotic_pieces import get_piece_movements
+
+def brute_force_mobility(rows, cols, movements):
+    """Reference metrics from one generate_heatmap call per start square."""
+    grid = [[0] * cols for _ in range(rows)]
+    distances = []
+    eccentricity = []
+    for r in range(rows):
+        for c in range(cols):
+            cells = [cell for row in generate_heatmap(grid, movements, (r, c)) for cell in row]
+            distances.extend(cell for cell in cells if cell > 0)
+            eccentricity.append(max(cells))
+    return sum(distances) / len(distances), max(distances), len(distances), eccentricity
+
+
+class TestMobilityAnalysis(unittest.TestCase):
+    
+    def test_matches_brute_force(self):
+        """Test bitboard aggregation against per-heatmap loops"""
+        pieces = get_piece_movements()
+        for name in ["knight", "shogi_gold", "xiangqi_elephant", "shogi_lance"]:
+            rows, cols = 6, 7
+            metrics = piece_mobility(rows, cols, pieces[name])
+            mean, longest, reachable, eccentricity = brute_force_mobility(rows, cols, pieces[name])
+            self.assertAlmostEqual(metrics["mean_moves"], mean)
+            self.assertEqual(metrics["max_moves"], longest)
+            self.assertAlmostEqual(metrics["reachable_fraction"], reachable / (42 * 41))
+            self.assertEqual([cell for row in metrics["eccentricity"] for cell in row], eccentricity)
+            
+    def test_diameter_only_when_connected(self):
+        pieces = get_piece_movements()
+        self.assertEqual(piece_mobility(8, 8, pieces["king"])["diameter"], 7)
+        self.assertIsNone(piece_mobility(8, 8, pieces["xiangqi_elephant"])["diameter"])
+        
+    def test_report_sorting(self):
+        """Test report rows and sort order"""
+        pieces = get_piece_movements()
+        subset = {name: pieces[name] for name in ["king", "knight", "wazir"]}
+        report = mobility_report(subset, [(8, 8)], sort_by="mean_moves", descending=True)
+        self.assertEqual([entry["piece"] for entry in report], ["wazir", "king", "knight"])
+        with self.assertRaises(ValueError):
+            mobility_report(subset, [(8, 8)], sort_by="colour")
+            
+    def test_parse_board_sizes(self):
+        self.assertEqual(parse_board_sizes("8, 9,10x9"), [(8, 8), (9, 9), (10, 9)])
+        with self.assertRaises(ValueError):
+            parse_board_sizes("8,x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import itertools
+import random
+import unittest
+from collections import deque
+from bitboard import box_bits, nd_shift_table, shift_table
+from exotic_pieces import get_nd_piece_movements, get_piece_movements
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from nd_board import flat_index, iter_slices, nd_heatmap, parse_coord, parse_shape, unflatten
+
+
+def reference_heatmap(shape, movements, start, obstacles):
+    """Plain tuple-based BFS over an N-D board"""
+    dist = {square: -1 for square in itertools.product(*(range(n) for n in shape))}
+    for obstacle in obstacles:
+        dist[obstacle] = -2
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        square = queue.popleft()
+        for move in movements:
+            target = tuple(x + d for x, d in zip(square, move))
+            if dist.get(target) == -1:
+                dist[target] = dist[square] + 1
+                queue.append(target)
+    return [dist[square] for square in sorted(dist)]
+
+
+class TestNDBoard(unittest.TestCase):
+    
+    def test_2d_matches_existing_engine(self):
+        """Test a 2-D shape gives the ordinary obstacle heatmap"""
+        grid = [[0] * 9 for _ in range(7)]
+        obstacles = [(2, 3), (4, 4), (0, 6)]
+        for name, movements in get_piece_movements().items():
+            with self.subTest(piece=name):
+                expected = generate_heatmap_with_obstacles(grid, movements, (3, 1), obstacles)
+                heatmap = nd_heatmap((7, 9), movements, (3, 1), obstacles)
+                self.assertEqual(list(heatmap), [cell for row in expected for cell in row])
+                
+    def test_3d_and_4d_match_reference(self):
+        """Test N-D heatmaps against a plain BFS over coordinate tuples"""
+        rng = random.Random(11)
+        for shape in [(5, 5, 5), (3, 4, 6), (3, 3, 4, 2)]:
+            pieces = get_nd_piece_movements(len(shape), reach=max(shape) - 1)
+            squares = list(itertools.product(*(range(n) for n in shape)))
+            for name in ["knight", "king", "bishop", "unicorn", "camel", "nightrider"]:
+                start, *obstacles = rng.sample(squares, 8)
+                with self.subTest(shape=shape, piece=name):
+                    self.assertEqual(list(nd_heatmap(shape, pieces[name], start, obstacles)),
+                                     reference_heatmap(shape, pieces[name], start, obstacles))
+                    
+    def test_max_moves(self):
+        """Test depth-limited N-D heatmaps stop after K moves"""
+        king = get_nd_piece_movements(3)["king"]
+        heatmap = nd_heatmap((7, 7, 7), king, (0, 0, 0), max_moves=2)
+        self.assertEqual(max(heatmap), 2)
+        self.assertEqual(sum(1 for cell in heatmap if cell >= 0), 27)
+        
+    def test_2d_catalogue_matches(self):
+        """Test the N-D catalogue in two dimensions equals the 2-D one"""
+        flat = get_piece_movements()
+        for name, movements in get_nd_piece_movements(2).items():
+            if name in flat:
+                with self.subTest(piece=name):
+                    self.assertEqual(set(movements), set(flat[name]))
+                    
+    def test_3d_catalogue(self):
+        """Test move counts of the Raumschach pieces"""
+        pieces = get_nd_piece_movements(3, reach=4)
+        self.assertEqual(len(pieces["knight"]), 24)
+        self.assertEqual(len(pieces["king"]), 26)
+        self.assertEqual(len(pieces["rook"]), 6 * 4)
+        self.assertEqual(len(pieces["bishop"]), 12 * 4)
+        self.assertEqual(len(pieces["unicorn"]), 8 * 4)
+        self.assertEqual(set(pieces["queen"]), set(pieces["rook"] + pieces["bishop"] + pieces["unicorn"]))
+        
+    def test_shift_tables(self):
+        """Test the 2-D shift table is the two-axis N-D table"""
+        knight = tuple(get_piece_movements()["knight"])
+        self.assertEqual(shift_table(6, 8, knight), nd_shift_table((6, 8), knight))
+        self.assertEqual(box_bits((3, 4), [(1, 3), (0, 2)]), 0b0011 << 4 | 0b0011 << 8)
+        self.assertEqual(box_bits((2, 2, 2), [(0, 2), (1, 2), (1, 2)]), 1 << 3 | 1 << 7)
+        self.assertEqual(box_bits((3, 3), [(2, 2), (0, 3)]), 0)
+        with self.assertRaises(ValueError):
+            nd_shift_table((3, 3, 3), ((1, 0),))
+            
+    def test_coordinates(self):
+        """Test flat indices, slices and parsing"""
+        self.assertEqual(flat_index((5, 5, 5), (1, 2, 3)), 38)
+        self.assertEqual(unflatten((5, 5, 5), 38), (1, 2, 3))
+        self.assertEqual(parse_shape("5x5x5"), (5, 5, 5))
+        self.assertEqual(parse_coord("1,2,3,0", 4), (1, 2, 3, 0))
+        slices = list(iter_slices(list(range(12)), (3, 2, 2)))
+        self.assertEqual(slices[1], ((1,), [[4, 5], [6, 7]]))
+        for bad in ["5x0x5", "5xx5", "a"]:
+            with self.assertRaises(ValueError):
+                parse_shape(bad)
+        with self.assertRaises(ValueError):
+            parse_coord("1,2", 3)
+        with self.assertRaises(ValueError):
+            nd_heatmap((3, 3, 3), [(1, 0, 0)], (3, 0, 0))
+        with self.assertRaises(ValueError):
+            nd_heatmap((3, 3, 3), [(1, 0, 0)], (0, 0, 0), [(0, 0, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+import unittest
+from board_mask import BoardMask
+from heatmap_export import export_npy
+from obstacle_files import load_obstacle_mask, save_obstacle_bits
+
+class TestObstacleFiles(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = random.Random(8)
+        self.rows, self.cols = 7, 13
+        self.blocked = set(rng.sample([(r, c) for r in range(self.rows) for c in range(self.cols)], 30))
+        self.expected = BoardMask.from_obstacles(self.rows, self.cols, self.blocked)
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+    
+    def grid(self, blocked_value, open_value):
+        return [[blocked_value if (r, c) in self.blocked else open_value for c in range(self.cols)]
+                for r in range(self.rows)]
+        
+    def test_pbm_binary_and_ascii(self):
+        rows = []
+        for row in self.grid(1, 0):
+            bits = "".join(map(str, row)).ljust((self.cols + 7) // 8 * 8, "0")
+            rows.append(int(bits, 2).to_bytes(len(bits) // 8, "big"))
+        with open(self.path("map.pbm"), "wb") as f:
+            f.write(b"P4\n# comment\n%d %d\n" % (self.cols, self.rows) + b"".join(rows))
+        self.assertEqual(load_obstacle_mask(self.path("map.pbm")), self.expected)
+        
+        text = "\n".join(" ".join(map(str, row)) for row in self.grid(1, 0))
+        with open(self.path("ascii.pbm"), "w") as f:
+            f.write(f"P1\n{self.cols} {self.rows}\n{text}\n")
+        self.assertEqual(load_obstacle_mask(self.path("ascii.pbm")), self.expected)
+        
+    def test_pgm_depths(self):
+        with open(self.path("map.pgm"), "wb") as f:
+            f.write(b"P5 %d %d 255\n" % (self.cols, self.rows) + bytes(v for row in self.grid(20, 230) for v in row))
+        self.assertEqual(load_obstacle_mask(self.path("map.pgm")), self.expected)
+        with open(self.path("deep.pgm"), "wb") as f:
+            f.write(b"P5 %d %d 65535\n" % (self.cols, self.rows) +
+                    b"".join(v.to_bytes(2, "big") for row in self.grid(300, 40000) for v in row))
+        self.assertEqual(load_obstacle_mask(self.path("deep.pgm")), self.expected)
+        with open(self.path("ascii.pgm"), "w") as f:
+            f.write(f"P2\n{self.cols} {self.rows}\n15\n" +
+                    "\n".join(" ".join(map(str, row)) for row in self.grid(0, 15)))
+        self.assertEqual(load_obstacle_mask(self.path("ascii.pgm")), self.expected)
+        
+    def test_npy_arrays(self):
+        for dtype, value in (("int8", 1), ("int32", 256), ("int64", -1)):
+            export_npy(self.grid(value, 0), self.path("map.npy"), dtype)
+            self.assertEqual(load_obstacle_mask(self.path("map.npy")), self.expected)
+            
+    def test_packed_bits(self):
+        save_obstacle_bits(self.expected, self.path("map.bits"))
+        self.assertEqual(load_obstacle_mask(self.path("map.bits")), self.expected)
+        os.remove(self.path("map.bits.json"))
+        with self.assertRaises(ValueError):
+            load_obstacle_mask(self.path("map.bits"))
+        self.assertEqual(load_obstacle_mask(self.path("map.bits"), rows=self.rows, cols=self.cols), self.expected)
+
+if __name__ == "__main__":
+    unittest.main()
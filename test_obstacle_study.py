@@ -0,0 +1,78 @@
+import statistics
+import unittest
+from bitboard import full_board, iter_bits
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from obstacle_study import (RunningStats, obstacle_study, random_obstacle_bits, run_trial_batch,
+                            trial_rng)
+
+class TestObstacleStudy(unittest.TestCase):
+    
+    def setUp(self):
+        self.knight = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+        
+    def test_running_stats_merge(self):
+        """Test merged summaries equal one summary over all values"""
+        values = [0.5, 2.0, 3.25, 7.0, 1.5, 4.0, 9.5]
+        whole, left, right = RunningStats(), RunningStats(), RunningStats()
+        for value in values:
+            whole.add(value)
+        for value in values[:3]:
+            left.add(value)
+        for value in values[3:]:
+            right.add(value)
+        left.merge(right)
+        for stats in (whole, left):
+            self.assertEqual(stats.count, len(values))
+            self.assertAlmostEqual(stats.mean, statistics.mean(values))
+            self.assertAlmostEqual(stats.variance, statistics.variance(values))
+            self.assertEqual((stats.min, stats.max), (0.5, 9.5))
+            
+    def test_trials_match_heatmaps(self):
+        """Test a batch summarizes the same fields as generate_heatmap_with_obstacles"""
+        rows, cols, start, density = 6, 7, (2, 3), 0.3
+        free = [i for i in iter_bits(full_board(rows, cols)) if i != 2 * cols + 3]
+        grid = [[0] * cols for _ in range(rows)]
+        fractions = []
+        for trial in range(20):
+            bits = random_obstacle_bits(free, density, rows * cols, trial_rng(5, density, trial))
+            obstacles = [divmod(i, cols) for i in iter_bits(bits)]
+            heatmap = generate_heatmap_with_obstacles(grid, self.knight, start, obstacles)
+            reached = sum(1 for row in heatmap for cell in row if cell > 0)
+            fractions.append(reached / (len(free) - len(obstacles)))
+        reachable, _, _ = run_trial_batch(rows, cols, self.knight, start, density, 5, 0, 20)
+        self.assertAlmostEqual(reachable.mean, statistics.mean(fractions))
+        
+    def test_stacked_batch_matches_single_trials(self):
+        """Test one BFS over a batch of stacked boards summarizes each trial as if run alone"""
+        rook = [(d, 0) for d in range(-6, 7) if d] + [(0, d) for d in range(-6, 7) if d]
+        open_bits = full_board(5, 7) & ~(1 << 10) & ~(1 << 31)
+        for movements in (self.knight, rook):
+            batch = run_trial_batch(5, 7, movements, (2, 2), 0.35, 3, 4, 30, open_bits)
+            merged = (RunningStats(), RunningStats(), 0)
+            for trial in range(4, 34):
+                single = run_trial_batch(5, 7, movements, (2, 2), 0.35, 3, trial, 1, open_bits)
+                merged[0].merge(single[0])
+                merged[1].merge(single[1])
+                merged = merged[:2] + (merged[2] + single[2],)
+            self.assertEqual(batch[2], merged[2])
+            for stats, expected in zip(batch[:2], merged[:2]):
+                self.assertEqual((stats.count, stats.min, stats.max), (expected.count, expected.min, expected.max))
+                self.assertAlmostEqual(stats.mean, expected.mean)
+        
+    def test_reproducible_across_workers_and_batches(self):
+        serial = obstacle_study(8, 8, self.knight, [0.1, 0.4], 120, seed=9, workers=1, batch_size=120)
+        batched = obstacle_study(8, 8, self.knight, [0.1, 0.4], 120, seed=9, workers=1, batch_size=25)
+        pooled = obstacle_study(8, 8, self.knight, [0.1, 0.4], 120, seed=9, workers=2, batch_size=25)
+        # Identical across worker counts at a fixed batch size, equal up to rounding across batch sizes
+        self.assertEqual(batched, pooled)
+        for a, b in zip(serial, batched):
+            self.assertEqual(a["trials"], 120)
+            self.assertAlmostEqual(a["reachable_mean"], b["reachable_mean"], places=3)
+        self.assertNotEqual(serial, obstacle_study(8, 8, self.knight, [0.1, 0.4], 120, seed=10, workers=1))
+        
+    def test_rejects_bad_densities(self):
+        with self.assertRaises(ValueError):
+            obstacle_study(8, 8, self.knight, [1.5], 10, workers=1)
+
+if __name__ == "__main__":
+    unittest.main()
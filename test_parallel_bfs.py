@@ -0,0 +1,61 @@
+import os
+import random
+import unittest
+from heatmap_array import compute_heatmap
+from parallel_bfs import benchmark, outbox_layout, parallel_heatmap, stripe_bounds
+from exotic_pieces import get_piece_movements
+
+class TestParallelBFS(unittest.TestCase):
+    
+    def test_stripes_cover_rows(self):
+        for rows, workers in [(10, 3), (4, 8), (7, 7), (1, 4)]:
+            bounds = stripe_bounds(rows, workers)
+            self.assertEqual(bounds[0][0], 0)
+            self.assertEqual(bounds[-1][1], rows)
+            self.assertTrue(all(a[1] == b[0] for a, b in zip(bounds, bounds[1:])))
+            self.assertTrue(all(start < stop for start, stop in bounds))
+            
+    def test_identical_to_serial_engine(self):
+        """Test stripes of every width give exactly the serial heatmap"""
+        rng = random.Random(4)
+        movements = get_piece_movements()
+        rows, cols = 23, 17
+        squares = [(r, c) for r in range(rows) for c in range(cols) if (r, c) != (11, 3)]
+        for name in ["knight", "shogi_lance", "nightrider", "xiangqi_soldier_promoted"]:
+            obstacles = rng.sample(squares, 60)
+            expected = compute_heatmap(rows, cols, movements[name], (11, 3), obstacles)
+            for workers in (2, 5):
+                self.assertEqual(parallel_heatmap(rows, cols, movements[name], (11, 3), obstacles, workers),
+                                 expected)
+                
+    def test_outboxes_cover_reachable_rows(self):
+        bounds = stripe_bounds(10, 3)
+        layout = outbox_layout(5, bounds, 2)
+        self.assertEqual([[capacity for _, capacity in row] for row in layout],
+                         [[0, 10, 0], [10, 0, 10], [0, 10, 0]])
+        offsets = [offset for row in layout for offset, _ in row]
+        self.assertEqual(offsets, sorted(offsets))
+        # Long riders may post anywhere in another stripe
+        layout = outbox_layout(5, bounds, 9)
+        self.assertEqual(layout[0][2][1], 15)
+
+    def test_long_riders_cross_several_stripes(self):
+        rook = [(d, 0) for d in range(-39, 40)] + [(0, d) for d in range(-39, 40)]
+        expected = compute_heatmap(40, 3, rook, (0, 1), [(1, 0)])
+        self.assertEqual(parallel_heatmap(40, 3, rook, (0, 1), [(1, 0)], workers=8), expected)
+
+    def test_start_on_obstacle(self):
+        with self.assertRaises(ValueError):
+            parallel_heatmap(8, 8, [(1, 0)], (2, 2), [(2, 2)], workers=2)
+
+    @unittest.skipIf((os.cpu_count() or 1) < 2, "needs more than one core")
+    def test_speedup_on_several_cores(self):
+        """Test two workers beat the serial engine (best of two runs each)"""
+        best = {}
+        for _ in range(2):
+            for workers, seconds in benchmark(600, (1, 2)):
+                best[workers] = min(seconds, best.get(workers, seconds))
+        self.assertLess(best[2], best[1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from piece_catalogue import (ALL_PIECES, canonical_movements, equivalence_index,
+                             equivalent_pieces, match_pieces, movement_key)
+
+class TestPieceCatalogue(unittest.TestCase):
+    
+    def test_match_pieces(self):
+        """Test exact, normalized and partial name lookup"""
+        self.assertEqual(match_pieces("knight"), ["knight"])
+        self.assertEqual(match_pieces("flying-ox"), ["Flying Ox"])
+        self.assertEqual(match_pieces("xiangqi_horse"), ["xiangqi_horse"])
+        self.assertIn("Blue Dragon", match_pieces("dragon"))
+        self.assertEqual(match_pieces("no such piece"), [])
+        
+    def test_canonical_movements(self):
+        """Test duplicates, (0, 0) and off-board offsets are dropped"""
+        moves = [(0, 1), (0, 0), (0, 1), (5, 0), (-1, 0)]
+        self.assertEqual(canonical_movements(moves), ((-1, 0), (0, 1), (5, 0)))
+        self.assertEqual(canonical_movements(moves, 4, 4), ((-1, 0), (0, 1)))
+        self.assertEqual(movement_key(moves), movement_key(list(reversed(moves))))
+        
+    def test_equivalent_pieces(self):
+        """Test the catalogue aliases named in the piece notes"""
+        self.assertEqual(equivalent_pieces("knight"), ["Cavalryman", "xiangqi_horse"])
+        self.assertIn("Angry Boar", equivalent_pieces("xiangqi_general"))
+        self.assertIn("Cat Sword", equivalent_pieces("xiangqi_advisor"))
+        
+    def test_equivalence_index_covers_catalogue(self):
+        index = equivalence_index()
+        self.assertEqual(sum(len(names) for names in index.values()), len(ALL_PIECES))
+        self.assertLess(len(index), len(ALL_PIECES))
+        # On a tiny board long-range offsets vanish and more pieces coincide
+        self.assertLessEqual(len(equivalence_index(rows=3, cols=3)), len(index))
+
+
+if __name__ == "__main__":
+    unittest.main()
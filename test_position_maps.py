@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from math import gcd
+from position_maps import Position, PositionPiece, position_maps, split_moves
+from piece_catalogue import ALL_PIECES
+
+
+def reference_reach(position, piece, max_moves):
+    """Per-piece BFS, walking every sliding offset square by square"""
+    rows, cols = position.rows, position.cols
+    obstacles = set(position.obstacles)
+    # The mover has left its start square; only the other pieces block it
+    occupied = obstacles | {p.square for p in position.pieces if p is not piece}
+    offsets = set(piece.movements)
+
+    def moves(square):
+        targets = set()
+        for dr, dc in offsets - {(0, 0)}:
+            row, col = square[0] + dr, square[1] + dc
+            if not (0 <= row < rows and 0 <= col < cols) or (row, col) in obstacles:
+                continue
+            g = gcd(abs(dr), abs(dc))
+            step = (dr // g, dc // g)
+            if all((step[0] * i, step[1] * i) in offsets for i in range(1, g)):
+                path = [(square[0] + step[0] * i, square[1] + step[1] * i) for i in range(1, g)]
+                if any(p in occupied for p in path):
+                    continue
+            targets.add((row, col))
+        return targets
+
+    distances = {piece.square: 0}
+    frontier = [piece.square]
+    for depth in range(1, max_moves + 1):
+        layer = []
+        for square in frontier:
+            for target in moves(square):
+                if target not in distances:
+                    distances[target] = depth
+                    layer.append(target)
+        frontier = [square for square in layer if square not in occupied]
+    del distances[piece.square]
+    return distances
+
+
+class TestPositionMaps(unittest.TestCase):
+
+    def test_split_moves(self):
+        leaps, rides = split_moves(ALL_PIECES["knight"])
+        self.assertEqual(sorted(leaps), sorted(ALL_PIECES["knight"]))
+        self.assertEqual(rides, [])
+        leaps, rides = split_moves(ALL_PIECES["Rook"])
+        self.assertEqual(leaps, [])
+        self.assertEqual(sorted(rides), [((-1, 0), 8), ((0, -1), 8), ((0, 1), 8), ((1, 0), 8)])
+        # A gap turns the far offsets into leaps
+        leaps, rides = split_moves([(0, 1), (0, 2), (0, 4)])
+        self.assertEqual((leaps, rides), ([(0, 4)], [((0, 1), 2)]))
+
+    def test_fen_starting_position(self):
+        position = Position.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        self.assertEqual((position.rows, position.cols, len(position.pieces)), (8, 8, 32))
+        maps = position_maps(position)
+        white = maps["one_move"]["white"]
+        # d2 is covered by the queen, king, bishop and knight
+        self.assertEqual(white[1][3], 4)
+        self.assertEqual(white[2], [2, 1, 2, 1, 1, 2, 1, 2])
+        self.assertEqual(maps["one_move"]["black"][5], [2, 1, 2, 1, 1, 2, 1, 2])
+        self.assertTrue(all(cell == 0 for cell in white[4]))
+        mobility = {(name, square): moves for name, _, square, moves, _ in maps["mobility"]}
+        # Squares of the piece's own side do not count towards its mobility
+        self.assertEqual(mobility["knight", (0, 1)], 2)
+        self.assertEqual(mobility["Rook", (0, 0)], 0)
+
+    def test_fen_catalogue_pieces_and_obstacles(self):
+        position = Position.from_fen("4k3/8/8/3#4/8/8/8/R3K2[Flying Ox]")
+        self.assertEqual(position.obstacles, [(4, 3)])
+        self.assertEqual([p.name for p in position.pieces], ["king", "Rook", "king", "Flying Ox"])
+        self.assertEqual(position.pieces[0].side, "black")
+        self.assertEqual(position.pieces[3].square, (0, 7))
+        combined = Position.from_fen("{Rook+Bishop}")
+        self.assertEqual(combined.pieces[0].side, "black")
+        self.assertEqual(len(combined.pieces[0].movements),
+                         len(set(ALL_PIECES["Rook"]) | set(ALL_PIECES["Bishop"])))
+
+    def test_invalid_fen(self):
+        for text in ("8/7", "4x3", "[No Such Piece]", "4[Rook"):
+            with self.assertRaises(ValueError):
+                Position.from_fen(text)
+
+    def test_json_and_load(self):
+        data = {"size": [6, 6],
+                "pieces": [{"piece": "knight", "square": "a1"}, {"piece": "Rook", "square": [3, 3], "side": "black"}],
+                "obstacles": ["b2"]}
+        position = Position.from_json(json.dumps(data))
+        self.assertEqual([p.square for p in position.pieces], [(0, 0), (3, 3)])
+        self.assertEqual(position.obstacles, [(1, 1)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "position.json")
+            with open(path, "w") as f:
+                json.dump(data, f)
+            self.assertEqual(position_maps(Position.load(path)), position_maps(position))
+        with self.assertRaises(ValueError):
+            Position.from_json({"size": [4, 4], "pieces": [{"piece": "king", "square": [4, 0]}]})
+        with self.assertRaises(ValueError):
+            Position.from_json({"size": [4, 4], "pieces": [{"piece": "king", "square": "a1"}],
+                                "obstacles": ["a1"]})
+
+    def test_black_moves_down(self):
+        position = Position(4, 1, [PositionPiece("Pawn", "black", (3, 0), ALL_PIECES["Pawn"])])
+        maps = position_maps(position, max_moves=3)
+        self.assertEqual(maps["within"]["black"], [[1], [1], [1], [0]])
+        self.assertEqual(maps["one_move"]["all"], [[0], [0], [1], [0]])
+
+    def test_sliders_stop_on_pieces(self):
+        rook = PositionPiece("Rook", "white", (0, 0), ALL_PIECES["Rook"])
+        blocker = PositionPiece("king", "black", (0, 3), ALL_PIECES["king"])
+        maps = position_maps(Position(1, 6, [rook, blocker], [(0, 5)]))
+        self.assertEqual(maps["one_move"]["white"], [[0, 1, 1, 1, 0, -2]])
+        self.assertEqual(maps["one_move"]["black"], [[0, 0, 1, 0, 1, -2]])
+        # The captured square ends the journey: the rook never gets past the king
+        maps = position_maps(Position(1, 6, [rook, blocker]), max_moves=3)
+        self.assertEqual(maps["within"]["white"], [[0, 1, 1, 1, 0, 0]])
+
+    def test_slides_cross_the_vacated_start_square(self):
+        rook = PositionPiece("Rook", "white", (1, 2), ALL_PIECES["Rook"])
+        position = Position(3, 5, [rook], [(0, 0)])
+        maps = position_maps(position, max_moves=2)
+        self.assertEqual(maps["within"]["white"], [[-2, 1, 1, 1, 1], [1, 1, 0, 1, 1], [1, 1, 1, 1, 1]])
+        reached = {(r, c) for r, row in enumerate(maps["within"]["white"]) for c, cell in enumerate(row) if cell > 0}
+        self.assertEqual(reached, set(reference_reach(position, rook, 2)))
+
+    def test_matches_reference(self):
+        rng = random.Random(7)
+        names = ["Rook", "Bishop", "knight", "king", "nightrider", "Pawn", "Flying Ox", "amazon"]
+        for _ in range(15):
+            rows, cols = rng.randint(3, 8), rng.randint(3, 8)
+            squares = rng.sample([(r, c) for r in range(rows) for c in range(cols)], 7)
+            pieces = [PositionPiece(name, rng.choice(("white", "black")), square, ALL_PIECES[name])
+                      for name, square in zip(rng.sample(names, 5), squares)]
+            position = Position(rows, cols, pieces, squares[5:])
+            for max_moves in (1, 3):
+                maps = position_maps(position, max_moves)
+                expected = [[-2 if (r, c) in position.obstacles else 0 for c in range(cols)] for r in range(rows)]
+                first = [row[:] for row in expected]
+                for piece in pieces:
+                    for (r, c), depth in reference_reach(position, piece, max_moves).items():
+                        expected[r][c] += 1
+                        first[r][c] += depth == 1
+                self.assertEqual(maps["within"]["all"], expected)
+                self.assertEqual(maps["one_move"]["all"], first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import random
+import unittest
+from pursuit import solve_pursuit
+from exotic_pieces import get_piece_movements
+
+
+def reference_values(rows, cols, pursuer, evader, obstacles, allow_pass):
+    """Value iteration: win[k] holds the positions the pursuer wins within k of its moves"""
+    squares = [(r, c) for r in range(rows) for c in range(cols) if (r, c) not in obstacles]
+    open_squares = set(squares)
+    
+    def moves(square, offsets):
+        return {(square[0] + dr, square[1] + dc) for dr, dc in offsets
+                if (dr, dc) != (0, 0) and (square[0] + dr, square[1] + dc) in open_squares}
+    
+    pursuer_value = {}
+    evader_value = {}
+    positions = [(a, b) for a in squares for b in squares if a != b]
+    for k in range(1, 2 * len(positions) + 2):
+        changed = False
+        for a, b in positions:
+            if (a, b) in pursuer_value:
+                continue
+            options = moves(a, pursuer)
+            if allow_pass or not options:
+                options.add(a)
+            if b in options or any(evader_value.get((t, b), k) < k for t in options if t != b):
+                pursuer_value[a, b] = k
+                changed = True
+        for a, b in positions:
+            if (a, b) in evader_value:
+                continue
+            options = moves(b, evader) - {a}
+            if allow_pass or not options:
+                options.add(b)
+            if all((a, t) in pursuer_value for t in options):
+                evader_value[a, b] = max(pursuer_value[a, t] for t in options)
+                changed = True
+        if not changed:
+            break
+    return pursuer_value, evader_value
+
+
+class TestPursuit(unittest.TestCase):
+    
+    def setUp(self):
+        self.movements = get_piece_movements()
+        
+    def test_matches_value_iteration(self):
+        """Test capture times against plain value iteration on small boards"""
+        rng = random.Random(8)
+        names = ["knight", "king", "wazir", "ferz", "chancellor", "shogi_gold", "xiangqi_horse", "dabbaba"]
+        for trial in range(16):
+            rows, cols = rng.randint(2, 4), rng.randint(2, 5)
+            hunter, prey = rng.choice(names), rng.choice(names)
+            cells = [(r, c) for r in range(rows) for c in range(cols)]
+            obstacles = rng.sample(cells, rng.randint(0, 2))
+            allow_pass = trial % 3 == 0
+            table = solve_pursuit(rows, cols, self.movements[hunter], self.movements[prey], obstacles, allow_pass)
+            pursuer_value, evader_value = reference_values(rows, cols, self.movements[hunter],
+                                                           self.movements[prey], set(obstacles), allow_pass)
+            with self.subTest(trial=trial, hunter=hunter, prey=prey):
+                for a in cells:
+                    for b in cells:
+                        if a == b or a in obstacles or b in obstacles:
+                            continue
+                        self.assertEqual(table.capture_time(a, b), pursuer_value.get((a, b), -1))
+                        self.assertEqual(table.capture_time(a, b, pursuer_to_move=False),
+                                         evader_value.get((a, b), -1))
+                        
+    def test_knight_never_catches_king(self):
+        """Test a king escapes a knight forever on an open board"""
+        table = solve_pursuit(8, 8, self.movements["knight"], self.movements["king"])
+        heatmap = table.pursuer_heatmap((3, 3))
+        self.assertEqual(heatmap[3][3], 0)
+        self.assertEqual(heatmap[1][2], 1)
+        self.assertEqual(heatmap[0][0], -1)
+        self.assertEqual(table.longest_chase()[0], 1)
+        
+    def test_principal_line(self):
+        """Test optimal lines are legal, alternate and end in a capture"""
+        table = solve_pursuit(8, 8, self.movements["chancellor"], self.movements["king"], [(3, 3)])
+        moves, hunter, king = table.longest_chase()
+        self.assertGreater(moves, 2)
+        line = table.principal_line(hunter, king)
+        self.assertEqual(len(line), 2 * moves)
+        self.assertEqual(line[-1][0], line[-1][1])
+        for i, ((a1, b1), (a2, b2)) in enumerate(zip(line, line[1:])):
+            mover, still, offsets = (a1, a2, "chancellor") if i % 2 == 0 else (b1, b2, "king")
+            self.assertIn((still[0] - mover[0], still[1] - mover[1]), self.movements[offsets])
+            self.assertNotIn(still, [(3, 3)])
+        self.assertIsNone(solve_pursuit(8, 8, self.movements["knight"], self.movements["king"]).principal_line((0, 0), (4, 4)))
+        
+    def test_heatmaps_and_blocked_squares(self):
+        """Test heatmaps mark obstacles, the fixed square and both sides to move"""
+        table = solve_pursuit(5, 5, self.movements["chancellor"], self.movements["wazir"], [(0, 4)])
+        heatmap = table.evader_heatmap((2, 2))
+        self.assertEqual(heatmap[0][4], -2)
+        self.assertEqual(heatmap[2][2], 0)
+        self.assertEqual(heatmap[2][4], 1)
+        self.assertEqual(table.capture_time((2, 2), (0, 4)), -2)
+        evader_first = table.evader_heatmap((2, 2), pursuer_to_move=False)
+        self.assertTrue(all(cell == -2 or cell >= 0 for row in evader_first for cell in row))
+        with self.assertRaises(ValueError):
+            table.capture_time((5, 0), (0, 0))
+            
+    def test_twelve_by_twelve(self):
+        """Test a 12x12 board is solved with two bytes per position and side"""
+        table = solve_pursuit(12, 12, self.movements["amazon"], self.movements["king"])
+        self.assertEqual(table.pursuer_to_move.itemsize, 2)
+        self.assertEqual(len(table.pursuer_to_move), 144 * 144)
+        self.assertEqual(table.pursuer_heatmap((5, 5))[0][1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
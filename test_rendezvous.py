@@ -0,0 +1,51 @@
+import random
+import unittest
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from rendezvous import find_rendezvous
+from exotic_pieces import get_piece_movements
+
+class TestRendezvous(unittest.TestCase):
+    
+    def setUp(self):
+        self.movements = get_piece_movements()
+        
+    def check_path(self, path, movements, start, end, obstacles):
+        self.assertEqual(path[0], start)
+        self.assertEqual(path[-1], end)
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            self.assertIn((r2 - r1, c2 - c1), movements)
+            self.assertNotIn((r2, c2), obstacles)
+            
+    def test_matches_two_heatmaps(self):
+        """Test the meeting time equals min over squares of max(dA, dB)"""
+        rng = random.Random(3)
+        names = ["knight", "king", "shogi_lance", "xiangqi_horse", "camel"]
+        grid = [[0] * 9 for _ in range(7)]
+        squares = [(r, c) for r in range(7) for c in range(9)]
+        for _ in range(30):
+            a, b = rng.sample(names, 2)
+            start_a, start_b, *obstacles = rng.sample(squares, 10)
+            heat_a = generate_heatmap_with_obstacles(grid, self.movements[a], start_a, obstacles)
+            heat_b = generate_heatmap_with_obstacles(grid, self.movements[b], start_b, obstacles)
+            times = [max(heat_a[r][c], heat_b[r][c]) for r, c in squares
+                     if heat_a[r][c] >= 0 and heat_b[r][c] >= 0]
+            result = find_rendezvous(7, 9, self.movements[a], start_a, self.movements[b], start_b, obstacles)
+            if not times:
+                self.assertIsNone(result)
+                continue
+            self.assertEqual(result["time"], min(times))
+            square = result["square"]
+            self.check_path(result["path_a"], self.movements[a], start_a, square, obstacles)
+            self.check_path(result["path_b"], self.movements[b], start_b, square, obstacles)
+            self.assertEqual(len(result["path_a"]) - 1, heat_a[square[0]][square[1]])
+            self.assertEqual(len(result["path_b"]) - 1, heat_b[square[0]][square[1]])
+            
+    def test_same_square_and_obstacle_start(self):
+        king = self.movements["king"]
+        result = find_rendezvous(4, 4, king, (1, 1), king, (1, 1))
+        self.assertEqual((result["square"], result["time"]), ((1, 1), 0))
+        with self.assertRaises(ValueError):
+            find_rendezvous(4, 4, king, (1, 1), king, (2, 2), [(2, 2)])
+
+if __name__ == "__main__":
+    unittest.main()
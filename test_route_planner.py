@@ -0,0 +1,102 @@
+import random
+import unittest
+from itertools import permutations
+from route_planner import (RoutePlanner, held_karp, nearest_neighbour, plan_route, route_cost,
+                           two_opt)
+from piece_catalogue import ALL_PIECES
+
+
+class TestRoutePlanner(unittest.TestCase):
+
+    def assert_valid_route(self, route, movements, start, waypoints, obstacles=()):
+        path = route.path
+        self.assertEqual(path[0], start)
+        self.assertEqual(len(path) - 1, route.moves)
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            self.assertIn((r2 - r1, c2 - c1), movements)
+            self.assertNotIn((r2, c2), obstacles)
+        self.assertEqual(set(route.order), set(waypoints))
+        self.assertTrue(set(waypoints) <= set(path))
+
+    def test_held_karp_matches_brute_force(self):
+        rng = random.Random(11)
+        for _ in range(30):
+            n = rng.randint(1, 6)
+            matrix = [[0 if a == b else rng.randint(1, 9) for b in range(n + 1)] for a in range(n + 1)]
+            for closed in (False, True):
+                best = min(route_cost(matrix, order, closed) for order in permutations(range(1, n + 1)))
+                order = held_karp(matrix, closed)
+                self.assertEqual(sorted(order), list(range(1, n + 1)))
+                self.assertEqual(route_cost(matrix, order, closed), best)
+
+    def test_two_opt_never_worse(self):
+        rng = random.Random(5)
+        for _ in range(20):
+            n = rng.randint(2, 25)
+            matrix = [[0 if a == b else rng.randint(1, 20) for b in range(n + 1)] for a in range(n + 1)]
+            for closed in (False, True):
+                greedy = nearest_neighbour(matrix)
+                improved = two_opt(matrix, greedy, closed)
+                self.assertEqual(sorted(improved), list(range(1, n + 1)))
+                self.assertLessEqual(route_cost(matrix, improved, closed), route_cost(matrix, greedy, closed))
+
+    def test_knight_route(self):
+        knight = ALL_PIECES["knight"]
+        obstacles = [(2, 2), (5, 5)]
+        waypoints = [(7, 7), (0, 7), (7, 0), (3, 4)]
+        route = plan_route(8, 8, knight, (0, 1), waypoints, obstacles)
+        self.assertTrue(route.exact)
+        self.assert_valid_route(route, knight, (0, 1), waypoints, obstacles)
+        planner = RoutePlanner(8, 8, knight, obstacles)
+        best = min(sum(planner.distance(a, b) for a, b in zip(((0, 1),) + order, order))
+                   for order in permutations(waypoints))
+        self.assertEqual(route.moves, best)
+
+    def test_return_to_start(self):
+        king = ALL_PIECES["king"]
+        route = plan_route(5, 5, king, (0, 0), [(0, 4), (4, 4), (4, 0)], return_to_start=True)
+        self.assertEqual(route.moves, 16)
+        self.assertEqual(route.path[-1], (0, 0))
+        self.assert_valid_route(route, king, (0, 0), [(0, 4), (4, 4), (4, 0)])
+
+    def test_heuristic_beyond_exact_limit(self):
+        knight = ALL_PIECES["knight"]
+        rng = random.Random(2)
+        waypoints = rng.sample([(r, c) for r in range(10) for c in range(10)], 20)
+        planner = RoutePlanner(10, 10, knight)
+        route = planner.plan((0, 0), waypoints)
+        self.assertFalse(route.exact)
+        self.assert_valid_route(route, knight, (0, 0), waypoints)
+        # Forced heuristic on a small instance is no better than the exact answer
+        few = waypoints[:6]
+        self.assertGreaterEqual(planner.plan((0, 0), few, exact_limit=0).moves, planner.plan((0, 0), few).moves)
+
+    def test_asymmetric_and_unreachable(self):
+        pawn = ALL_PIECES["Pawn"]
+        route = plan_route(6, 1, pawn, (0, 0), [(4, 0), (2, 0)])
+        self.assertEqual((route.order, route.moves), ([(2, 0), (4, 0)], 4))
+        self.assertIsNone(plan_route(6, 1, pawn, (3, 0), [(1, 0)]))
+        self.assertIsNone(plan_route(6, 1, pawn, (0, 0), [(4, 0)], return_to_start=True))
+
+    def test_edge_cases(self):
+        king = ALL_PIECES["king"]
+        route = plan_route(4, 4, king, (0, 0), [])
+        self.assertEqual((route.moves, route.path), (0, [(0, 0)]))
+        route = plan_route(4, 4, king, (0, 0), [(0, 0), (2, 2), (2, 2)])
+        self.assertEqual((route.order, route.moves), ([(0, 0), (2, 2)], 2))
+        with self.assertRaises(ValueError):
+            plan_route(4, 4, king, (0, 0), [(1, 1)], obstacles=[(1, 1)])
+        with self.assertRaises(ValueError):
+            plan_route(4, 4, king, (0, 0), [(4, 4)])
+
+    def test_trees_are_cached(self):
+        planner = RoutePlanner(8, 8, ALL_PIECES["knight"])
+        planner.plan((0, 0), [(7, 7), (3, 3)])
+        trees = dict(planner._trees)
+        planner.plan((0, 0), [(3, 3), (7, 7)], return_to_start=True)
+        self.assertEqual(len(planner._trees), 3)
+        self.assertTrue(all(planner._trees[source] is tree for source, tree in trees.items()))
+
+
+if __name__ == "__main__":
+    unittest.main()
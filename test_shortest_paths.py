@@ -0,0 +1,65 @@
+import random
+import unittest
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from shortest_paths import shortest_path_dag
+from exotic_pieces import get_piece_movements
+
+class TestShortestPaths(unittest.TestCase):
+    
+    def setUp(self):
+        self.movements = get_piece_movements()
+        
+    def brute_force_count(self, heatmap, movements, target):
+        """Count shortest paths by recursion over the distance map"""
+        rows, cols = len(heatmap), len(heatmap[0])
+        row, col = target
+        if heatmap[row][col] == 0:
+            return 1
+        total = 0
+        for dr, dc in set(movements):
+            pr, pc = row - dr, col - dc
+            if 0 <= pr < rows and 0 <= pc < cols and heatmap[pr][pc] == heatmap[row][col] - 1:
+                total += self.brute_force_count(heatmap, movements, (pr, pc))
+        return total
+        
+    def test_counts_and_distances(self):
+        """Test counts against recursive enumeration and distances against the BFS"""
+        rng = random.Random(2)
+        grid = [[0] * 6 for _ in range(6)]
+        for name in ["knight", "king", "shogi_lance", "camel"]:
+            obstacles = rng.sample([(r, c) for r in range(6) for c in range(6) if (r, c) != (0, 0)], 5)
+            heatmap = generate_heatmap_with_obstacles(grid, self.movements[name], (0, 0), obstacles)
+            dag = shortest_path_dag(6, 6, self.movements[name], (0, 0), obstacles)
+            self.assertEqual(dag.heatmap(), heatmap)
+            for r in range(6):
+                for c in range(6):
+                    expected = self.brute_force_count(heatmap, self.movements[name], (r, c)) if heatmap[r][c] >= 0 else 0
+                    self.assertEqual(dag.count((r, c)), expected)
+                    
+    def test_enumerate_and_sample(self):
+        knight = self.movements["knight"]
+        dag = shortest_path_dag(8, 8, knight, (0, 0))
+        paths = list(dag.iter_paths((7, 7)))
+        self.assertEqual(len(paths), dag.count((7, 7)))
+        self.assertEqual(len(set(map(tuple, paths))), len(paths))
+        for path in paths:
+            self.assertEqual(path[0], (0, 0))
+            self.assertEqual(len(path) - 1, dag.distance((7, 7)))
+            for (r1, c1), (r2, c2) in zip(path, path[1:]):
+                self.assertIn((r2 - r1, c2 - c1), knight)
+        rng = random.Random(0)
+        seen = {tuple(dag.sample_path((7, 7), rng)) for _ in range(3000)}
+        self.assertTrue(seen <= set(map(tuple, paths)))
+        self.assertEqual(len(seen), len(paths))
+        self.assertEqual(list(dag.iter_paths((0, 0))), [[(0, 0)]])
+        
+    def test_big_counts_on_sliders(self):
+        """Test counts on a large king board without enumerating paths"""
+        king = self.movements["king"]
+        dag = shortest_path_dag(40, 40, king, (0, 0))
+        self.assertGreater(dag.count((39, 20)), 2 ** 40)
+        self.assertEqual(dag.count((39, 39)), 1)
+        self.assertEqual(len(dag.predecessors((1, 0))), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+import heatmap
+from heatmap import generate_heatmap
+from heatmap_array import compute_heatmap
+from tablebase import TableBase, build_tablebase
+from exotic_pieces import get_piece_movements
+
+class TestTableBase(unittest.TestCase):
+    
+    def setUp(self):
+        movements = get_piece_movements()
+        self.pieces = {name: movements[name] for name in
+                       ["knight", "xiangqi_horse", "king", "shogi_lance", "nightrider"]}
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "test.chtb")
+        self.count = build_tablebase(self.path, [(5, 5), (6, 4)], self.pieces)
+        
+    def tearDown(self):
+        heatmap.use_tablebase(None)
+        self.tmpdir.cleanup()
+        
+    def test_lookup_matches_search(self):
+        """Test every stored heatmap equals a fresh BFS"""
+        with TableBase(self.path) as tb:
+            for rows, cols in tb.boards():
+                grid = [[0] * cols for _ in range(rows)]
+                for movements in self.pieces.values():
+                    for start in [(0, 0), (rows - 1, cols - 2), (2, 1)]:
+                        self.assertEqual(tb.lookup(movements, rows, cols, start),
+                                         generate_heatmap(grid, movements, start))
+                                         
+    def test_equivalent_pieces_share_entries(self):
+        """Test knight and xiangqi horse are stored once per board"""
+        self.assertEqual(self.count, 8)
+        with TableBase(self.path) as tb:
+            names = [e["names"] for e in tb.entries if e["rows"] == 5]
+            self.assertIn(["knight", "xiangqi_horse"], names)
+            
+    def test_zero_copy_view_and_misses(self):
+        with TableBase(self.path) as tb:
+            view = tb.lookup_view(self.pieces["king"], 5, 5, (0, 0))
+            self.assertEqual(view.shape, (5, 5))
+            self.assertEqual(view[4, 4], 4)
+            view.release()
+            self.assertIsNone(tb.lookup(self.pieces["king"], 7, 7, (0, 0)))
+            self.assertIsNone(tb.lookup([(3, 3)], 5, 5, (0, 0)))
+            
+    def test_generate_heatmap_uses_tablebase(self):
+        """Test generate_heatmap answers from an installed tablebase"""
+        grid = [[0] * 5 for _ in range(5)]
+        expected = generate_heatmap(grid, self.pieces["knight"], (2, 2))
+        tb = TableBase(self.path)
+        heatmap.use_tablebase(tb)
+        try:
+            self.assertEqual(generate_heatmap(grid, self.pieces["knight"], (2, 2)), expected)
+            self.assertEqual(compute_heatmap(5, 5, self.pieces["knight"], (2, 2)), expected)
+            self.assertEqual(tb.lookup_heatmap(self.pieces["knight"], 5, 5, (2, 2)), expected)
+        finally:
+            heatmap.use_tablebase(None)
+            tb.close()
+            
+    def test_rejects_other_files(self):
+        bogus = os.path.join(self.tmpdir.name, "bogus.chtb")
+        with open(bogus, "wb") as f:
+            f.write(b"not a tablebase at all")
+        with self.assertRaises(ValueError):
+            TableBase(bogus)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import random
+import unittest
+from collections import deque
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from timed_obstacles import (generate_timed_heatmap, iter_reachable_sets, patrol_schedule,
+                             schedule_from_obstacles)
+from exotic_pieces import get_piece_movements
+
+
+def reference_heatmap(rows, cols, movements, start, schedule, wait=True):
+    """Plain BFS over (square, turn mod period) states"""
+    period = len(schedule)
+    blocked = lambda r, c, t: schedule[t % period] >> (r * cols + c) & 1
+    best = [[-1] * cols for _ in range(rows)]
+    seen = {(start, 0)}
+    queue = deque([(start, 0)])
+    while queue:
+        (r, c), t = queue.popleft()
+        if best[r][c] == -1:
+            best[r][c] = t
+        steps = list(movements) + ([(0, 0)] if wait else [])
+        for dr, dc in steps:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and not blocked(nr, nc, t + 1):
+                state = ((nr, nc), (t + 1) % period)
+                if state not in seen:
+                    seen.add(state)
+                    queue.append(((nr, nc), t + 1))
+    for r in range(rows):
+        for c in range(cols):
+            if all(blocked(r, c, t) for t in range(period)):
+                best[r][c] = -2
+    return best
+
+
+class TestTimedObstacles(unittest.TestCase):
+    
+    def setUp(self):
+        self.movements = get_piece_movements()
+        
+    def test_static_schedule_matches_static_heatmap(self):
+        """Test a one-turn schedule gives the ordinary obstacle heatmap"""
+        obstacles = [(2, 2), (3, 4), (5, 1)]
+        grid = [[0] * 8 for _ in range(8)]
+        schedule = schedule_from_obstacles(8, 8, [obstacles])
+        for name in ["knight", "chancellor", "king"]:
+            with self.subTest(piece=name):
+                expected = generate_heatmap_with_obstacles(grid, self.movements[name], (0, 0), obstacles)
+                self.assertEqual(generate_timed_heatmap(8, 8, self.movements[name], (0, 0), schedule),
+                                 expected)
+                
+    def test_matches_space_time_reference(self):
+        """Test random periodic schedules against a plain space-time BFS"""
+        rng = random.Random(5)
+        squares = [(r, c) for r in range(6) for c in range(7)]
+        for trial in range(40):
+            name = rng.choice(["knight", "king", "amazon", "shogi_lance", "xiangqi_horse"])
+            turns = [rng.sample(squares, rng.randint(0, 12)) for _ in range(rng.randint(1, 5))]
+            schedule = schedule_from_obstacles(6, 7, turns)
+            start = rng.choice([s for s in squares if s not in turns[0]])
+            wait = rng.random() < 0.7
+            with self.subTest(trial=trial):
+                self.assertEqual(
+                    generate_timed_heatmap(6, 7, self.movements[name], start, schedule, wait=wait),
+                    reference_heatmap(6, 7, self.movements[name], start, schedule, wait))
+                
+    def test_gate_opens_periodically(self):
+        """Test the piece waits for a gate in a wall"""
+        wall = [(2, c) for c in range(4)]
+        schedule = schedule_from_obstacles(5, 5, [wall + [(2, 4)]] * 4 + [wall])
+        heatmap = generate_timed_heatmap(5, 5, self.movements["king"], (0, 0), schedule)
+        self.assertEqual(heatmap[2][4], 4)
+        self.assertEqual(heatmap[4][0], 8)
+        self.assertEqual(heatmap[2][0], -2)
+        # Without waiting the king still shuffles around until the gate opens
+        self.assertEqual(generate_timed_heatmap(5, 5, self.movements["king"], (0, 0), schedule, wait=False)[2][4], 4)
+        
+    def test_non_periodic_schedule_keeps_last_turn(self):
+        """Test a finite schedule ends with its last obstacle set"""
+        schedule = schedule_from_obstacles(1, 5, [[(0, 1)], [(0, 1)], []])
+        heatmap = generate_timed_heatmap(1, 5, self.movements["king"], (0, 0), schedule, periodic=False)
+        self.assertEqual(heatmap, [[0, 2, 3, 4, 5]])
+        periodic = generate_timed_heatmap(1, 5, self.movements["king"], (0, 0), schedule)
+        self.assertEqual(periodic, [[0, 2, 3, 4, 5]])
+        
+    def test_stops_when_states_repeat(self):
+        """Test the search ends long before the horizon once the sets repeat"""
+        guard = [(1, c) for c in range(6)]
+        schedule = patrol_schedule(3, 6, [guard])
+        turns = [turn for turn, _ in iter_reachable_sets(3, 6, self.movements["king"], (0, 0),
+                                                         schedule, horizon=10 ** 6)]
+        self.assertLess(turns[-1], 30)
+        
+    def test_stops_on_cycles_longer_than_the_period(self):
+        """Test a knight that may not wait, alternating between colour classes, stops early"""
+        knight = self.movements["knight"]
+        turns = [turn for turn, _ in iter_reachable_sets(60, 60, knight, (0, 0), [0], wait=False)]
+        self.assertLess(turns[-1], 100)
+        # Stopping early misses nothing: a fixed long horizon gives the same heatmap
+        schedule = patrol_schedule(7, 7, [[(3, 0), (3, 1), (3, 2)]])
+        early = generate_timed_heatmap(7, 7, knight, (0, 0), schedule, wait=False)
+        self.assertEqual(early, reference_heatmap(7, 7, knight, (0, 0), schedule, wait=False))
+        
+    def test_patrol_schedule(self):
+        """Test patrol schedules cycle with the lcm of the route lengths"""
+        schedule = patrol_schedule(4, 4, [[(0, 0), (0, 1)], [(3, 0), (3, 1), (3, 2)]], [(2, 2)])
+        self.assertEqual(len(schedule), 6)
+        self.assertEqual(schedule[0], 1 | 1 << 12 | 1 << 10)
+        self.assertEqual(schedule[5], 1 << 1 | 1 << 14 | 1 << 10)
+        
+    def test_trapped_piece(self):
+        """Test a piece with nowhere to go stops the search"""
+        schedule = schedule_from_obstacles(1, 3, [[], [(0, 0), (0, 1)]])
+        heatmap = generate_timed_heatmap(1, 3, self.movements["king"], (0, 0), schedule)
+        self.assertEqual(heatmap, [[0, -1, -1]])
+        
+    def test_invalid_input(self):
+        """Test blocked starts and empty schedules are rejected"""
+        with self.assertRaises(ValueError):
+            generate_timed_heatmap(3, 3, self.movements["king"], (0, 0), schedule_from_obstacles(3, 3, [[(0, 0)]]))
+        with self.assertRaises(ValueError):
+            generate_timed_heatmap(3, 3, self.movements["king"], (0, 0), [])
+        with self.assertRaises(ValueError):
+            patrol_schedule(3, 3, [[]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import random
+import sys
+import unittest
+from heatmap_with_obstacles import generate_heatmap_with_obstacles
+from weighted_heatmap import generate_weighted_heatmap, slide_distance_cost, offset_penalty
+from exotic_pieces import get_piece_movements
+import chess_heatmap_cli
+
+class TestWeightedHeatmap(unittest.TestCase):
+    
+    def setUp(self):
+        self.pieces = get_piece_movements()
+        
+    def test_unit_costs_match_bfs(self):
+        """Test unit move costs reproduce the unweighted heatmap"""
+        grid = [[0] * 9 for _ in range(9)]
+        obstacles = [(2, 3), (4, 4), (6, 1)]
+        for name in ["knight", "shogi_silver", "chancellor"]:
+            expected = generate_heatmap_with_obstacles(grid, self.pieces[name], (0, 0), obstacles)
+            for engine in ("auto", "zero_one", "dial", "heap"):
+                heatmap = generate_weighted_heatmap(grid, self.pieces[name], (0, 0), obstacles, engine=engine)
+                self.assertEqual(heatmap, expected)
+                
+    def test_engines_agree_on_random_weights(self):
+        """Test bucket queue and heap give identical costs"""
+        rng = random.Random(3)
+        grid = [[0] * 10 for _ in range(10)]
+        terrain = [[rng.randint(0, 4) for _ in range(10)] for _ in range(10)]
+        for name in ["king", "archbishop"]:
+            costs = {move: rng.randint(0, 5) for move in self.pieces[name]}
+            dial = generate_weighted_heatmap(grid, self.pieces[name], (5, 5), move_cost=costs,
+                                             square_cost=terrain, engine="dial")
+            heap = generate_weighted_heatmap(grid, self.pieces[name], (5, 5), move_cost=costs,
+                                             square_cost=terrain, engine="heap")
+            self.assertEqual(dial, heap)
+            
+    def test_zero_one_costs(self):
+        """Test 0-1 BFS with free orthogonal steps"""
+        grid = [[0] * 5 for _ in range(5)]
+        costs = offset_penalty({(0, 1): 0, (0, -1): 0}, default=1)
+        heatmap = generate_weighted_heatmap(grid, self.pieces["wazir"], (0, 0), move_cost=costs)
+        self.assertEqual(heatmap[0], [0, 0, 0, 0, 0])
+        self.assertEqual(heatmap[4], [4, 4, 4, 4, 4])
+        
+    def test_slide_distance_cost(self):
+        """Test rook paying per square travelled equals Manhattan distance"""
+        grid = [[0] * 8 for _ in range(8)]
+        rook = [(i, 0) for i in range(-7, 8) if i != 0] + [(0, i) for i in range(-7, 8) if i != 0]
+        heatmap = generate_weighted_heatmap(grid, rook, (3, 3), move_cost=slide_distance_cost)
+        for r in range(8):
+            for c in range(8):
+                self.assertEqual(heatmap[r][c], abs(r - 3) + abs(c - 3))
+                
+    def test_cli_rejects_max_moves_with_square_costs(self):
+        """Test the CLI refuses a depth limit on a square-cost heatmap instead of ignoring one"""
+        saved = sys.argv
+        sys.argv = ["chess_heatmap_cli.py", "Rook", "--size", "8", "--max-moves", "2", "--move-cost", "squares"]
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output), self.assertRaises(SystemExit):
+                chess_heatmap_cli.main()
+        finally:
+            sys.argv = saved
+        self.assertIn("--max-moves cannot be combined with --move-cost squares", output.getvalue())
+        
+    def test_float_and_invalid_costs(self):
+        grid = [[0] * 4 for _ in range(4)]
+        heatmap = generate_weighted_heatmap(grid, [(0, 1)], (0, 0), move_cost={(0, 1): 0.5})
+        self.assertEqual(heatmap[0], [0, 0.5, 1.0, 1.5])
+        with self.assertRaises(ValueError):
+            generate_weighted_heatmap(grid, [(0, 1)], (0, 0), move_cost={(0, 1): -1})
+        with self.assertRaises(ValueError):
+            generate_weighted_heatmap(grid, [(0, 1)], (0, 0), move_cost={(0, 1): 0.5}, engine="dial")
+
+
+if __name__ == "__main__":
+    unittest.main()
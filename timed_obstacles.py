@@ -0,0 +1,190 @@
+"""
+Earliest-arrival heatmaps with obstacles that change from turn to turn.
+
+A schedule gives the blocked squares at every turn as a bitboard (see
+bitboard.py). The search is a BFS over (square, turn): the set of squares the
+piece can occupy at turn t is one bitboard, and the next turn's set is one
+shift-and-mask expansion of it, plus the squares where the piece may wait,
+minus whatever is blocked at turn t + 1.
+
+When the schedule repeats with period P, the reachable set at turn t + 1 is
+fully determined by the set at turn t and t mod P, so the (phase, set) states
+eventually cycle. A ring buffer of the last P sets stops the search as soon as
+a set equals the one P turns earlier, which is the common case of a set that
+stops growing. Cycles of other lengths (a knight that may not wait alternates
+between two colour classes) are caught by Brent's cycle detection, which keeps
+one saved state. Memory stays at P + 1 bitboards no matter how long the
+horizon is.
+"""
+
+from math import gcd
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from bitboard import expand, full_board, iter_bits, shift_table, square_bit
+from board_mask import BoardMask
+
+def schedule_from_obstacles(rows: int, cols: int,
+                            turns: Sequence[Sequence[Tuple[int, int]]]) -> List[int]:
+    """Blocked-square bitboards from one list of (row, col) obstacles per turn."""
+    schedule = []
+    for obstacles in turns:
+        blocked = 0
+        for row, col in obstacles:
+            if 0 <= row < rows and 0 <= col < cols:
+                blocked |= square_bit(cols, row, col)
+        schedule.append(blocked)
+    return schedule
+
+
+def patrol_schedule(rows: int, cols: int, routes: Sequence[Sequence[Tuple[int, int]]],
+                    static_obstacles: Optional[Sequence[Tuple[int, int]]] = None,
+                    mask: Optional[BoardMask] = None) -> List[int]:
+    """
+    Periodic schedule of patrolling blockers.
+
+    Each route is a cyclic list of squares; its blocker stands on route[t % len(route)]
+    at turn t. The schedule length is the least common multiple of the route lengths.
+    The holes of mask, if given, are blocked on every turn like static_obstacles.
+    """
+    period = 1
+    for route in routes:
+        if not route:
+            raise ValueError("A patrol route needs at least one square")
+        period = period * len(route) // gcd(period, len(route))
+    static = schedule_from_obstacles(rows, cols, [static_obstacles or []])[0]
+    if mask is not None:
+        mask.check_size(rows, cols)
+        static |= full_board(rows, cols) & ~mask.bits
+    return [static | schedule_from_obstacles(rows, cols, [[route[t % len(route)] for route in routes]])[0]
+            for t in range(period)]
+
+
+def iter_reachable_sets(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    schedule: Sequence[int],
+    periodic: bool = True,
+    wait: bool = True,
+    horizon: Optional[int] = None
+) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (turn, bitboard of squares the piece can occupy at that turn).
+
+    Args:
+        rows, cols: Board size
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        start_coord: Starting position at turn 0
+        schedule: Blocked-square bitboard per turn
+        periodic: Repeat the schedule forever; otherwise its last entry stays in force
+        wait: Whether the piece may stay on its square for a turn
+        horizon: Last turn to explore (default: enough turns to visit every
+                 (square, schedule phase) state, so no arrival is missed)
+
+    Stops when the (schedule phase, reachable set) states start repeating, in a
+    cycle of any length, when the piece has nowhere to be, or at the horizon.
+    """
+    if not schedule:
+        raise ValueError("The schedule needs at least one turn")
+    board = full_board(rows, cols)
+    length = len(schedule)
+    period = length if periodic else 1
+    prefix = 0 if periodic else length - 1  # turns before the schedule starts repeating
+
+    def open_at(turn: int) -> int:
+        index = turn % length if periodic else min(turn, length - 1)
+        return board & ~schedule[index]
+
+    if horizon is None:
+        horizon = prefix + period * (rows * cols + 1)
+    table = shift_table(rows, cols, tuple(tuple(m) for m in piece_movements))
+    reachable = square_bit(cols, *start_coord)
+    if not reachable & open_at(0):
+        raise ValueError("Starting position is blocked at turn 0!")
+
+    # From turn `prefix` on, (phase, reachable) evolves deterministically, so the
+    # states end in a cycle. The ring catches cycles whose length divides the
+    # period; Brent's saved state catches any length. Either way, every state of
+    # the cycle has been yielded by the time one comes round again.
+    ring: List[Optional[int]] = [None] * period
+    saved: Optional[Tuple[int, int]] = None
+    power = steps = 1
+    turn = 0
+    while True:
+        yield turn, reachable
+        if turn >= prefix:
+            slot = (turn - prefix) % period
+            state = (slot, reachable)
+            if ring[slot] == reachable or state == saved:
+                return  # The states repeat: nothing new can happen
+            ring[slot] = reachable
+            if saved is None or steps == power:
+                saved = state
+                power *= 2
+                steps = 0
+            steps += 1
+        if not reachable or turn >= horizon:
+            return
+        moved = expand(reachable, table)
+        if wait:
+            moved |= reachable
+        turn += 1
+        reachable = moved & open_at(turn)
+
+
+def generate_timed_heatmap(
+    rows: int,
+    cols: int,
+    piece_movements: Sequence[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    schedule: Sequence[int],
+    periodic: bool = True,
+    wait: bool = True,
+    horizon: Optional[int] = None
+) -> List[List[int]]:
+    """
+    Earliest turn at which the piece can stand on each square.
+
+    See iter_reachable_sets for the arguments.
+
+    Returns:
+        Heatmap of earliest arrival turns (-1 if never reached, -2 if the square
+        is blocked at every turn of the schedule)
+    """
+    board = full_board(rows, cols)
+    always_blocked = board
+    for blocked in schedule:
+        always_blocked &= blocked
+    flat = [-1] * (rows * cols)
+    for index in iter_bits(always_blocked):
+        flat[index] = -2
+
+    seen = 0
+    target = board & ~always_blocked
+    for turn, reachable in iter_reachable_sets(rows, cols, piece_movements, start_coord,
+                                               schedule, periodic, wait, horizon):
+        arrivals = reachable & ~seen
+        if arrivals:
+            for index in iter_bits(arrivals):
+                flat[index] = turn
+            seen |= arrivals
+            if seen == target:
+                break
+    return [flat[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+# Example usage
+if __name__ == "__main__":
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+
+    king = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    # A wall with a gate at (3, 7) that is open only on every fourth turn
+    wall = [(3, c) for c in range(7)]
+    schedule = schedule_from_obstacles(8, 8, [wall + [(3, 7)]] * 3 + [wall])
+    print("King from (0, 0); row 3 is a wall whose gate at (3, 7) opens every 4th turn:")
+    print_heatmap_with_obstacles(generate_timed_heatmap(8, 8, king, (0, 0), schedule))
+
+    guards = patrol_schedule(8, 8, [[(4, c) for c in range(8)] + [(4, c) for c in range(6, 0, -1)]])
+    print("\nKing from (0, 0) with a guard patrolling row 4:")
+    print_heatmap_with_obstacles(generate_timed_heatmap(8, 8, king, (0, 0), guards))
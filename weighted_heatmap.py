@@ -0,0 +1,199 @@
+import heapq
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from board_mask import BoardMask
+
+# Largest integer move cost handled by the bucket queue; heavier moves use a binary heap
+DIAL_MAX_WEIGHT = 64
+
+MoveCost = Union[Callable[[int, int], float], Dict[Tuple[int, int], float]]
+
+
+def slide_distance_cost(dr: int, dc: int) -> int:
+    """Move cost equal to the number of squares travelled (a rook move of 5 costs 5)."""
+    return max(abs(dr), abs(dc))
+
+
+def offset_penalty(penalties: Dict[Tuple[int, int], int], default: int = 1) -> Callable[[int, int], int]:
+    """Move cost from a per-offset table, falling back to default for other offsets."""
+    def cost(dr: int, dc: int) -> int:
+        return penalties.get((dr, dc), default)
+    return cost
+
+
+def _edge_table(piece_movements, move_cost, cols):
+    """Distinct offsets as (dr, dc, flat delta, cost)."""
+    edges = []
+    seen = set()
+    for dr, dc in piece_movements:
+        if (dr, dc) == (0, 0) or (dr, dc) in seen:
+            continue
+        seen.add((dr, dc))
+        if move_cost is None:
+            cost = 1
+        elif callable(move_cost):
+            cost = move_cost(dr, dc)
+        else:
+            cost = move_cost.get((dr, dc), 1)
+        if cost < 0:
+            raise ValueError(f"Negative move cost {cost} for offset {(dr, dc)}")
+        edges.append((dr, dc, dr * cols + dc, cost))
+    return edges
+
+
+def _choose_engine(max_weight, integral: bool) -> str:
+    if not integral:
+        return "heap"
+    if max_weight <= 1:
+        return "zero_one"
+    if max_weight <= DIAL_MAX_WEIGHT:
+        return "dial"
+    return "heap"
+
+
+def generate_weighted_heatmap(
+    grid: List[List[int]],
+    piece_movements: List[Tuple[int, int]],
+    start_coord: Tuple[int, int],
+    obstacles: Optional[List[Tuple[int, int]]] = None,
+    move_cost: Optional[MoveCost] = None,
+    square_cost: Optional[List[List[float]]] = None,
+    engine: str = "auto",
+    mask: Optional[BoardMask] = None
+) -> List[List[float]]:
+    """
+    Generate a heatmap of minimum total move cost instead of minimum move count.
+
+    The cost of a move is move_cost(row_offset, col_offset) plus the
+    square_cost of the square it lands on. Small integer costs are solved with
+    a 0-1 BFS or a bucket queue (Dial's algorithm); other costs use a binary heap.
+
+    Args:
+        grid: NxM grid (list of lists)
+        piece_movements: List of (row_offset, col_offset) tuples representing valid moves
+        start_coord: Starting position as (row, col) tuple
+        obstacles: Optional list of (row, col) tuples representing blocked cells
+        move_cost: Callable (row_offset, col_offset) -> cost, or a dict keyed by offset
+                   (missing offsets cost 1). Default: every move costs 1
+        square_cost: Optional NxM grid with the cost of entering each square
+        engine: 'auto', 'zero_one', 'dial' or 'heap'
+        mask: Optional board geometry; the board size comes from the mask and
+              its holes are blocked like obstacles
+
+    Returns:
+        Heatmap where each cell contains the minimum cost to reach it
+        (-1 if unreachable, -2 if obstacle)
+    """
+    rows, cols = (mask.rows, mask.cols) if mask is not None else (len(grid), len(grid[0]))
+    size = rows * cols
+    edges = _edge_table(piece_movements, move_cost, cols)
+
+    entry = [0] * size
+    if square_cost is not None:
+        entry = [cell for row in square_cost for cell in row]
+        if len(entry) != size:
+            raise ValueError("square_cost must have the same shape as the grid")
+        if any(cell < 0 for cell in entry):
+            raise ValueError("square_cost must not be negative")
+
+    dist: List[float] = [-1] * size
+    if mask is not None:
+        for index, flag in enumerate(mask.blocked_flags(obstacles)):
+            if flag:
+                dist[index] = -2
+    elif obstacles:
+        for obs_row, obs_col in obstacles:
+            if 0 <= obs_row < rows and 0 <= obs_col < cols:
+                dist[obs_row * cols + obs_col] = -2
+    start = start_coord[0] * cols + start_coord[1]
+    if dist[start] == -2:
+        raise ValueError("Starting position is on an obstacle!")
+
+    costs = [cost for _, _, _, cost in edges] + entry
+    integral = all(isinstance(cost, int) for cost in costs)
+    max_weight = max((cost for _, _, _, cost in edges), default=0) + max(entry, default=0)
+    if engine == "auto":
+        engine = _choose_engine(max_weight, integral)
+    if engine not in ("zero_one", "dial", "heap"):
+        raise ValueError(f"Unknown engine: {engine}")
+    if engine == "zero_one" and max_weight > 1:
+        raise ValueError("The 0-1 BFS engine needs move costs of 0 or 1")
+    if engine == "dial" and not integral:
+        raise ValueError("The bucket queue engine needs integer move costs")
+
+    # best[i] is the best cost found so far; dist[i] is set once i is settled
+    best: List[float] = [float("inf")] * size
+    best[start] = 0
+
+    def relax(u: int):
+        """Yield (v, new_cost) for every improving move out of settled square u."""
+        r, c = divmod(u, cols)
+        base = best[u]
+        for dr, dc, delta, cost in edges:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                v = u + delta
+                if dist[v] == -1:
+                    new_cost = base + cost + entry[v]
+                    if new_cost < best[v]:
+                        best[v] = new_cost
+                        yield v, new_cost
+
+    if engine == "zero_one":
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            if dist[u] != -1:
+                continue
+            dist[u] = best[u]
+            for v, new_cost in relax(u):
+                if new_cost == best[u]:
+                    queue.appendleft(v)
+                else:
+                    queue.append(v)
+    elif engine == "dial":
+        width = max_weight + 1
+        buckets: List[List[int]] = [[] for _ in range(width)]
+        buckets[0].append(start)
+        pending, current = 1, 0
+        while pending:
+            bucket = buckets[current % width]
+            while bucket:
+                u = bucket.pop()
+                pending -= 1
+                if dist[u] != -1 or best[u] != current:
+                    continue
+                dist[u] = current
+                for v, new_cost in relax(u):
+                    buckets[new_cost % width].append(v)
+                    pending += 1
+            current += 1
+    else:
+        heap = [(0, start)]
+        while heap:
+            cost, u = heapq.heappop(heap)
+            if dist[u] != -1 or cost != best[u]:
+                continue
+            dist[u] = cost
+            for v, new_cost in relax(u):
+                heapq.heappush(heap, (new_cost, v))
+
+    return [dist[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+# Example usage
+if __name__ == "__main__":
+    from heatmap_with_obstacles import print_heatmap_with_obstacles
+
+    grid = [[0] * 8 for _ in range(8)]
+    rook = [(i, 0) for i in range(-7, 8) if i != 0] + [(0, i) for i in range(-7, 8) if i != 0]
+
+    print("Rook, cost = squares travelled, from (0, 0):")
+    print_heatmap_with_obstacles(generate_weighted_heatmap(grid, rook, (0, 0), move_cost=slide_distance_cost))
+
+    # Swamp in the middle of the board: entering it costs 3 extra
+    swamp = [[3 if 2 <= r <= 5 and 2 <= c <= 5 else 0 for c in range(8)] for r in range(8)]
+    king = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    print("\nKing crossing a swamp, from (0, 0):")
+    print_heatmap_with_obstacles(generate_weighted_heatmap(grid, king, (0, 0), square_cost=swamp))